@@ -45,27 +45,61 @@ WHERE id NOT IN (
 );
 
 
+-- ETL watermark: one row per S3 object already processed (created by the Lambda if missing) --
+
+CREATE TABLE IF NOT EXISTS etl_object_state (
+    s3_key TEXT PRIMARY KEY,
+    etag TEXT NOT NULL,
+    last_modified TIMESTAMPTZ NOT NULL,
+    processed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Objects processed in the last day --
+
+SELECT s3_key, last_modified, processed_at
+FROM etl_object_state
+WHERE processed_at >= now() - INTERVAL '1 day'
+ORDER BY processed_at DESC;
+
+
+-- Time-bucket rollups written by the Lambda (created by the Lambda if missing) --
+-- Average = lux_sum / reading_count, variance = lux_sum_sq / reading_count - average^2 --
+
+CREATE TABLE IF NOT EXISTS lux_rollup_minute (
+    bucket TIMESTAMPTZ PRIMARY KEY,
+    reading_count BIGINT NOT NULL,
+    lux_sum DOUBLE PRECISION NOT NULL,
+    lux_min DOUBLE PRECISION NOT NULL,
+    lux_max DOUBLE PRECISION NOT NULL,
+    lux_sum_sq DOUBLE PRECISION NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS lux_rollup_hour (LIKE lux_rollup_minute INCLUDING ALL);
+
+-- Lets the daily summary table below read only the latest day --
+
+CREATE INDEX IF NOT EXISTS lux_file_summary_date_created_idx
+ON lux_file_summary (file_date, created_at);
+
+
 --Grafana Dashboard Queries--
+-- Each query is a range scan on a bucket or file_date index. MAX(bucket) is answered from the end of the primary key index. --
 
 --Today's Min Lux Recorded--
-SELECT MIN(min_lux) AS min_lux
-FROM lux_file_summary
-WHERE file_date = (
-  SELECT MAX(file_date) FROM lux_file_summary
-);
+SELECT MIN(lux_min) AS min_lux
+FROM lux_rollup_hour
+WHERE bucket >= (SELECT date_trunc('day', MAX(bucket)) FROM lux_rollup_hour);
 
 --Today's Max Lux Recorded--
-SELECT MIN(min_lux) AS min_lux
-FROM lux_file_summary
-WHERE file_date = (
-  SELECT MAX(file_date) FROM lux_file_summary
-);
+SELECT MAX(lux_max) AS max_lux
+FROM lux_rollup_hour
+WHERE bucket >= (SELECT date_trunc('day', MAX(bucket)) FROM lux_rollup_hour);
 
 
 --Total Records Today--
-SELECT SUM(record_count) AS total_records
-FROM lux_file_summary
-WHERE file_date = (SELECT MAX(file_date) FROM lux_file_summary);
+SELECT SUM(reading_count) AS total_records
+FROM lux_rollup_hour
+WHERE bucket >= (SELECT date_trunc('day', MAX(bucket)) FROM lux_rollup_hour);
 
 
 --Daily Summary Table--
@@ -83,29 +117,32 @@ ORDER BY created_at DESC;
 --Min Lux Over Time--
 
 SELECT
-  created_at AS time,
-  min_lux
-FROM lux_file_summary
-ORDER BY created_at;
+  bucket AS time,
+  lux_min AS min_lux
+FROM lux_rollup_minute
+WHERE $__timeFilter(bucket)
+ORDER BY bucket;
 
 --Max Lux Over Time--
 SELECT
-  created_at AS time,
-  max_lux
-FROM lux_file_summary
-ORDER BY created_at;
+  bucket AS time,
+  lux_max AS max_lux
+FROM lux_rollup_minute
+WHERE $__timeFilter(bucket)
+ORDER BY bucket;
 
 --Average Lux Over Time--
 SELECT
-  created_at AS time,
-  avg_lux
-FROM lux_file_summary
-ORDER BY created_at;
+  bucket AS time,
+  lux_sum / reading_count AS avg_lux
+FROM lux_rollup_minute
+WHERE $__timeFilter(bucket)
+ORDER BY bucket;
 
 --Latest Average Lux Reading--
 SELECT
-  created_at AS time,
-  avg_lux
-FROM lux_file_summary
-ORDER BY created_at DESC
+  bucket AS time,
+  lux_sum / reading_count AS avg_lux
+FROM lux_rollup_minute
+ORDER BY bucket DESC
 LIMIT 1
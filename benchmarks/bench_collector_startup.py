@@ -0,0 +1,60 @@
+# benchmarks/bench_collector_startup.py
+"""Startup time and resident memory of the headless collector vs. the dashboard.
+
+Each case runs in a fresh interpreter: it imports its entry point, builds the
+collector or the (offscreen) SensorDashboard, and reports the elapsed time
+and peak RSS. No broker or serial port is needed.
+
+Run with: python benchmarks/bench_collector_startup.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+PROBE = """
+import resource, sys, time
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(f"{{elapsed:.3f}} {{rss_kb}} {{int('PyQt5' in sys.modules)}} {{int('matplotlib' in sys.modules)}}")
+"""
+
+COLLECTOR = """
+import collector
+args = collector.parse_args(["--no-s3", "--no-adafruit", "--logs-dir", {logs!r}])
+collector.build_collector(args)
+"""
+
+DASHBOARD = """
+from PyQt5.QtWidgets import QApplication
+app = QApplication([])
+from ui.layout import SensorDashboard
+window = SensorDashboard()
+"""
+
+
+def measure(body, repeats=3):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", PYTHONPATH=SRC)
+    runs = []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(body=body)], env=env,
+                             capture_output=True, text=True, check=True).stdout.split()[-4:]
+        runs.append((float(out[0]), int(out[1]) / 1024, out[2] == "1", out[3] == "1"))
+    return min(runs)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as logs:
+        cases = [("collector", COLLECTOR.format(logs=logs)), ("dashboard", DASHBOARD)]
+        print(f"{'entry point':<12}{'startup s':>12}{'peak RSS MB':>14}{'PyQt5':>8}{'mpl':>6}")
+        for name, body in cases:
+            elapsed, rss_mb, qt, mpl = measure(body)
+            print(f"{name:<12}{elapsed:>12.3f}{rss_mb:>14.1f}{'yes' if qt else 'no':>8}{'yes' if mpl else 'no':>6}")
+
+
+if __name__ == "__main__":
+    main()
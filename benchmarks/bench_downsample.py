@@ -0,0 +1,67 @@
+# benchmarks/bench_downsample.py
+"""Frame cost of plotting a long session: every sample vs. the min/max pyramid.
+
+Run with: python benchmarks/bench_downsample.py [samples]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from core.session_store import SessionStore
+from core.downsample import MinMaxPyramid
+
+
+def build_store(samples):
+    store = SessionStore()
+    lux = 300.0 + 50.0 * np.sin(np.arange(samples) / 500.0)
+    for i in range(samples):
+        store.append(i * 10, i * 10_000_000, lux[i])
+    return store
+
+
+def frame_time(canvas, line, x, y, frames=5):
+    line.set_data(x, y)
+    line.axes.set_xlim(x[0], x[-1])
+    line.axes.set_ylim(y.min() - 1, y.max() + 1)
+    start = time.perf_counter()
+    for _ in range(frames):
+        canvas.draw()
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    store = build_store(samples)
+    figure = Figure(figsize=(10, 4), dpi=100)
+    canvas = FigureCanvasAgg(figure)
+    ax = figure.add_subplot(111)
+    line, = ax.plot([], [])
+    max_points = 2 * int(ax.bbox.width)
+
+    _, epoch, lux = store.columns()
+    print(f"{samples} samples, {max_points} points on screen")
+    print(f"  all samples: {frame_time(canvas, line, epoch / 1e6, lux):8.1f} ms/frame")
+
+    pyramid = MinMaxPyramid(store)
+    start = time.perf_counter()
+    pyramid.update()
+    print(f"  pyramid build: {(time.perf_counter() - start) * 1000:6.1f} ms (incremental afterwards)")
+
+    for label, lo, hi in (("full session", None, None), ("zoom 1%", epoch[samples // 2], epoch[samples // 2 + samples // 100])):
+        start = time.perf_counter()
+        x, y = pyramid.query(lo, hi, max_points)
+        query_ms = (time.perf_counter() - start) * 1000
+        draw_ms = frame_time(canvas, line, x / 1e6, y)
+        print(f"  {label:>12}: query {query_ms:6.2f} ms + draw {draw_ms:6.1f} ms ({len(x)} points)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# benchmarks/bench_export.py
+"""Time spent in Export for a long session: full CSV write vs streamed finalize.
+
+The same readings go through a StreamRegistry with and without `spool_dir`
+in drain-sized batches, then export_streams is timed. With spooling the rows
+are already on disk, so Export only waits for the last batch, appends the
+summary and renames the file. A real recording is paced by the drain
+timer, so the writer is given a moment to catch up before Export is timed.
+
+Run with: python benchmarks/bench_export.py [samples]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from core.streams import StreamRegistry, export_streams
+
+ORIGIN = 1745100000.0
+
+
+def record(registry, n, batch_size=1000):
+    for start in range(0, n, batch_size):
+        registry.ingest([(ORIGIN + i / 100, "sensor", (i % 5000) * 0.37)
+                         for i in range(start, min(start + batch_size, n))], ORIGIN)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as logs_dir:
+        for name, spool_dir in [("full write", None), ("streamed", logs_dir)]:
+            registry = StreamRegistry(window=500, spool_dir=spool_dir)
+            start = time.perf_counter()
+            record(registry, n)
+            recording = time.perf_counter() - start
+            time.sleep(2.0 if spool_dir else 0)
+            start = time.perf_counter()
+            (path,), _ = export_streams(registry, logs_dir, timestamp=name.replace(" ", "_"))
+            export = time.perf_counter() - start
+            print(f"{name:<12} ingest {recording:6.2f} s   export {export * 1000:8.1f} ms"
+                  f"   ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
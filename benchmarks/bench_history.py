@@ -0,0 +1,69 @@
+# benchmarks/bench_history.py
+"""Write throughput, disk use and window query latency of the history store.
+
+Fills a HistoryStore with several days of readings (10 Hz by default) in
+drain-sized batches, flushing every 10 s of data as the dashboard does, then
+times `query` (about 2000 points, as the History view asks for) over windows
+from ten minutes to the whole range, and a raw `range` load of one hour.
+
+Run with: python benchmarks/bench_history.py [days] [rate_hz]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from core.history import HistoryStore
+from core.session_store import NS_PER_SEC
+
+
+def fill(store, days, start_s, rate_hz):
+    n = int(days * 86400 * rate_hz)
+    lux = np.round(np.abs(300 + np.cumsum(np.random.default_rng(1).normal(0, 0.5, n))), 2).tolist()
+    per_flush = 10 * rate_hz
+    for i in range(0, n, per_flush):
+        store.append_many([(start_s + k / rate_hz, "sensor", lux[k]) for k in range(i, min(i + per_flush, n))])
+        store.flush()
+    return n
+
+
+def best_ms(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    days = float(sys.argv[1]) if len(sys.argv) > 1 else 7
+    rate_hz = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    end_s = int(time.time())
+    start_s = end_s - int(days * 86400)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(os.path.join(tmp, "history.sqlite3"))
+        began = time.perf_counter()
+        n = fill(store, days, start_s, rate_hz)
+        elapsed = time.perf_counter() - began
+        store.compact(min_age_s=0)
+        size = store.size_bytes()
+        print(f"{n} readings written in {elapsed:.1f} s ({n / elapsed:,.0f}/s), "
+              f"{size / 1e6:.1f} MB ({size / n:.2f} B/reading)")
+        end_ns = end_s * NS_PER_SEC
+        for label, span in [("10 min", 600), ("1 h", 3600), ("16 h", 16 * 3600), ("24 h", 86400), (f"{days:g} days", days * 86400)]:
+            start_ns = end_ns - int(span * NS_PER_SEC)
+            ms = best_ms(lambda: store.query("sensor", start_ns, end_ns, 2000))
+            print(f"query {label:<10}{ms:>8.1f} ms")
+        hour = end_ns - 3600 * NS_PER_SEC
+        print(f"range 1 h raw {best_ms(lambda: store.range('sensor', hour, end_ns)):>7.1f} ms "
+              f"({len(store.range('sensor', hour, end_ns)[0])} readings)")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/bench_lambda_etl.py
+"""Old row-by-row Lambda ETL vs. the streaming, vectorized one.
+
+Parses 1,000 synthetic exports, then writes their summaries to a SQLite stand-in
+for RDS: one INSERT + commit per file vs. one batched statement and commit.
+
+Run with: python benchmarks/bench_lambda_etl.py [files] [rows_per_file]
+"""
+import csv
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from io import StringIO
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.join(ROOT, "lambda_postgres_etl"))
+
+import lambda_function
+from core.data_logger import write_summary_csv
+
+CREATE_TABLE = """
+    CREATE TABLE lux_file_summary (
+        filename TEXT PRIMARY KEY, file_date TEXT, record_count INTEGER,
+        min_lux REAL, max_lux REAL, avg_lux REAL
+    )
+"""
+INSERT = """
+    INSERT INTO lux_file_summary (filename, file_date, record_count, min_lux, max_lux, avg_lux)
+    VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (filename) DO NOTHING
+"""
+
+
+def make_exports(files, rows, tmp_dir):
+    exports = {}
+    path = os.path.join(tmp_dir, "export.csv")
+    for n in range(files):
+        session = [(i * 10, "2025-04-20 00:00:00", round(random.uniform(0, 1000), 2)) for i in range(rows)]
+        write_summary_csv(path, session)
+        with open(path, "rb") as f:
+            exports[f"2025/04/20/lux_data_2025-04-20_{n:06d}.csv"] = f.read()
+    return exports
+
+
+def legacy_parse(content):
+    reader = csv.reader(StringIO(content.decode("utf-8")))
+    next(reader, None)
+    data = []
+    for row in reader:
+        if len(row) == 3 and row[0].isdigit():
+            try:
+                data.append(float(row[2]))
+            except ValueError:
+                continue
+    if not data:
+        return None
+    return len(data), min(data), max(data), sum(data) / len(data)
+
+
+def streaming_parse(content):
+    chunks = (content[i:i + lambda_function.READ_CHUNK_SIZE]
+              for i in range(0, len(content), lambda_function.READ_CHUNK_SIZE))
+    return lambda_function.summarize_csv_stream(chunks)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        exports = make_exports(files, rows, tmp_dir)
+        print(f"{files} files x {rows} rows")
+
+        for name, parse in (("legacy csv.reader", legacy_parse), ("streaming numpy", streaming_parse)):
+            summaries, elapsed = timed(lambda: {key: parse(body) for key, body in exports.items()})
+            print(f"parse  {name:>20}: {elapsed:7.3f} s")
+        records = [(key, "2025-04-20", *summary) for key, summary in summaries.items()]
+
+        def per_file(conn):
+            for record in records:
+                conn.execute(INSERT, record)
+                conn.commit()
+
+        def batched(conn):
+            conn.executemany(INSERT, records)
+            conn.commit()
+
+        for name, write in (("insert+commit/file", per_file), ("one batch+commit", batched)):
+            db_path = os.path.join(tmp_dir, f"{name.replace('/', '_')}.db")
+            conn = sqlite3.connect(db_path)
+            conn.execute(CREATE_TABLE)
+            conn.commit()
+            _, elapsed = timed(lambda: write(conn))
+            conn.close()
+            print(f"write  {name:>20}: {elapsed:7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_live_buffer.py
+"""Per-sample and per-frame cost of the old four live deques vs. SampleRingBuffer.
+
+Run with: python benchmarks/bench_live_buffer.py [samples]
+"""
+import datetime
+import os
+import sys
+import time
+from collections import deque
+
+import matplotlib.dates as mdates
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from core.ring_buffer import SampleRingBuffer
+from ui.plot_renderer import epoch_ns_to_datenum
+
+WINDOW = 500
+BATCH = 10  # readings drained per 100 ms frame at 100 Hz
+
+
+def legacy(samples, start):
+    relative_data, relative_timestamps = deque(maxlen=WINDOW), deque(maxlen=WINDOW)
+    gmt_data, gmt_timestamps = deque(maxlen=WINDOW), deque(maxlen=WINDOW)
+    nows = [start + i * 0.01 for i in range(samples)]
+    luxes = [300.0 + i % 50 for i in range(samples)]
+    t0 = time.perf_counter()
+    for now, lux in zip(nows, luxes):
+        relative_timestamps.append(int((now - start) * 1000))
+        relative_data.append(lux)
+        gmt_timestamps.append(datetime.datetime.utcfromtimestamp(now))
+        gmt_data.append(lux)
+    t1 = time.perf_counter()
+    for _ in range(100):
+        times, data = mdates.date2num(list(gmt_timestamps)), list(gmt_data)
+    t2 = time.perf_counter()
+    return (t1 - t0) / samples, (t2 - t1) / 100
+
+
+def ring(samples, start):
+    buffer = SampleRingBuffer(capacity=WINDOW)
+    epochs = [int((start + i * 0.01) * 1_000_000_000) for i in range(samples)]
+    luxes = [300.0 + i % 50 for i in range(samples)]
+    t0 = time.perf_counter()
+    for first in range(0, samples, BATCH):
+        buffer.extend(epochs[first:first + BATCH], luxes[first:first + BATCH])
+    t1 = time.perf_counter()
+    for _ in range(100):
+        epoch_ns, lux = buffer.window()
+        times, data = epoch_ns_to_datenum(epoch_ns), lux.copy()
+    t2 = time.perf_counter()
+    return (t1 - t0) / samples, (t2 - t1) / 100
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    start = time.time()
+    for name, func in (("four deques", legacy), ("ring buffer", ring)):
+        per_sample, per_frame = func(samples, start)
+        print(f"{name:>12}: {per_sample * 1e6:6.2f} us/sample, GMT frame {per_frame * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
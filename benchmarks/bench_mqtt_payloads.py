@@ -0,0 +1,66 @@
+# benchmarks/bench_mqtt_payloads.py
+"""Wire size and decode cost of the MQTT payload formats.
+
+Compared: one JSON message per reading (legacy firmware), JSON batches and
+"LX" binary batches of MQTT_BATCH_SIZE readings. Decoding goes through
+decode_mqtt_batch, as MqttTransport does for each queued batch of messages.
+Reports bytes and microseconds per reading.
+
+Run with: python benchmarks/bench_mqtt_payloads.py [readings] [batch_size]
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from core.mqtt_codec import decode_mqtt_batch, encode_batch
+
+TOPIC = "sensor/esp32-a/lux"
+
+
+def single_messages(n):
+    return [(TOPIC, json.dumps({"device": "esp32-a", "timestamp": i * 10,
+                                "lux": round((i % 5000) * 0.37, 2)}).encode())
+            for i in range(n)]
+
+
+def json_batches(n, size):
+    return [(TOPIC, json.dumps({"device": "esp32-a", "timestamp": start * 10,
+                                "dt": [k * 10 for k in range(min(size, n - start))],
+                                "lux": [round((i % 5000) * 0.37, 2)
+                                        for i in range(start, min(start + size, n))]}).encode())
+            for start in range(0, n, size)]
+
+
+def binary_batches(n, size):
+    return [(TOPIC, encode_batch(start * 10, [k * 10 for k in range(min(size, n - start))],
+                                 [(i % 5000) * 0.37 for i in range(start, min(start + size, n))]))
+            for start in range(0, n, size)]
+
+
+def decode_all(messages, chunk=500):
+    count = 0
+    for i in range(0, len(messages), chunk):
+        count += sum(len(readings) for readings in decode_mqtt_batch(messages[i:i + chunk]))
+    return count
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    for name, messages in [("single JSON", single_messages(n)),
+                           (f"JSON batch x{size}", json_batches(n, size)),
+                           (f"binary batch x{size}", binary_batches(n, size))]:
+        nbytes = sum(len(payload) for _, payload in messages)
+        start = time.perf_counter()
+        count = decode_all(messages)
+        elapsed = time.perf_counter() - start
+        assert count == n, count
+        print(f"{name:<20}{len(messages):>8} msgs{nbytes / n:>8.1f} B/reading"
+              f"{elapsed / n * 1e6:>8.2f} us/reading")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/bench_multi_device.py
+"""Ingest and render cost of many sensors streaming into one dashboard.
+
+Simulates N devices at R Hz: every 100 ms frame parses N * R / 10 MQTT
+messages, routes them through StreamRegistry (stats, session, live buffer,
+session WAL) and blits one overlay trace per device.
+
+Run with: python benchmarks/bench_multi_device.py [devices] [rate_hz]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from core.data_logger import SessionWAL
+from core.ingest import parse_mqtt_message
+from core.streams import StreamRegistry
+from ui.plot_renderer import BlitPlotRenderer
+
+FRAMES = 200
+FRAME_SEC = 0.1
+
+
+def main():
+    devices = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rate = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    per_frame = devices * rate * FRAME_SEC
+    names = [f"bh1750-{i:04d}" for i in range(devices)]
+    messages = [(f"sensor/{name}/lux", b'{"lux": %.2f}' % (300 + i)) for i, name in enumerate(names)]
+
+    registry = StreamRegistry(window=500)
+    figure = Figure(figsize=(10, 4), dpi=100)
+    canvas = FigureCanvasAgg(figure)
+    renderer = BlitPlotRenderer(canvas, figure.add_subplot(111))
+    start = time.time()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        wal = SessionWAL(os.path.join(tmp_dir, "temp_log.csv"))
+        parse_time = route_time = draw_time = 0.0
+        for frame in range(FRAMES):
+            now = start + frame * FRAME_SEC
+            t0 = time.perf_counter()
+            batch = []
+            for step in range(rate // 10 or 1):
+                for topic, payload in messages:
+                    device, lux = parse_mqtt_message(topic, payload)
+                    batch.append((now + step / rate, device, lux))
+            t1 = time.perf_counter()
+            registry.ingest(batch, start, wal)
+            wal.tick()
+            t2 = time.perf_counter()
+            renderer.update_overlay({
+                stream.device: ((stream.buffer.window()[0] - int(start * 1e9)) / 1e6, stream.buffer.window()[1].copy())
+                for stream in registry
+            })
+            t3 = time.perf_counter()
+            parse_time += t1 - t0
+            route_time += t2 - t1
+            draw_time += t3 - t2
+        wal.close()
+
+    readings = FRAMES * per_frame
+    print(f"{devices} devices x {rate} Hz = {int(per_frame)} readings per 100 ms frame")
+    print(f"  parse : {parse_time / readings * 1e6:6.2f} us/reading")
+    print(f"  route : {route_time / readings * 1e6:6.2f} us/reading")
+    print(f"  render: {draw_time / FRAMES * 1000:6.2f} ms/frame ({renderer.full_draws} full draws, {renderer.blits} blits)")
+    busy = (parse_time + route_time + draw_time) / (FRAMES * FRAME_SEC)
+    print(f"  GUI-thread load: {busy * 100:.1f}% of real time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_parquet.py
+"""File size and read speed of CSV vs Parquet exports of one long session.
+
+Both files are written by the real exporters; the CSV size is also given
+gzipped, as it is uploaded. Reads compared: the whole CSV
+through the csv module (what ad-hoc scripts do) and through Arrow's CSV
+reader, the whole Parquet file, and a one-hour lux-only slice of the
+Parquet file, where the time filter and column selection are pushed down.
+
+Run with: python benchmarks/bench_parquet.py [samples]
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from core.s3_uploader import gzip_file
+from core.data_logger import write_summary_csv, write_parquet_session, read_parquet_session
+from core.session_store import SessionStore, NS_PER_SEC
+
+START_NS = 1745100000 * NS_PER_SEC
+STEP_NS = 100_000_000  # 10 Hz
+
+
+def make_session(n):
+    # A noisy random walk: periodic test data would flatter every compressor
+    lux = np.round(np.abs(300 + np.cumsum(np.random.default_rng(1).normal(0, 0.5, n))), 2)
+    store = SessionStore()
+    for i, value in enumerate(lux.tolist()):
+        store.append(i * 100, START_NS + i * STEP_NS, value)
+    return store
+
+
+def read_csv_module(path):
+    with open(path, newline='') as f:
+        rows = csv.reader(f)
+        next(rows)
+        return [(int(r[0]), r[1], float(r[2])) for r in rows if len(r) == 3 and r[0].isdigit()]
+
+
+def read_csv_arrow(path):
+    from pyarrow import csv as pa_csv
+    return pa_csv.read_csv(path, parse_options=pa_csv.ParseOptions(invalid_row_handler=lambda row: "skip"))
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    store = make_session(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "session.csv")
+        parquet_path = os.path.join(tmp, "session.parquet")
+        write_summary_csv(csv_path, store)
+        write_parquet_session(parquet_path, store, "sensor")
+        gz_path = gzip_file(csv_path)  # what the S3 uploader sends for CSV
+        print(f"{n} samples: CSV {os.path.getsize(csv_path) / 1e6:.1f} MB "
+              f"({os.path.getsize(gz_path) / 1e6:.1f} MB gzipped), "
+              f"Parquet {os.path.getsize(parquet_path) / 1e6:.1f} MB")
+        hour_start = START_NS + (n // 2) * STEP_NS
+        for name, fn in [("CSV, csv module", lambda: read_csv_module(csv_path)),
+                         ("CSV, Arrow reader", lambda: read_csv_arrow(csv_path)),
+                         ("Parquet, all columns", lambda: read_parquet_session(parquet_path)),
+                         ("Parquet, 1 h of lux", lambda: read_parquet_session(
+                             parquet_path, hour_start, hour_start + 3600 * NS_PER_SEC, columns=["lux"]))]:
+            print(f"{name:<24}{timed(fn) * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_plot_renderer.py
+"""Frame-time comparison of the legacy full-redraw plot path and BlitPlotRenderer.
+
+Run with: python benchmarks/bench_plot_renderer.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from ui.plot_renderer import BlitPlotRenderer
+
+FRAMES = 100
+
+
+def make_canvas():
+    figure = Figure(figsize=(8, 4), dpi=100)
+    canvas = FigureCanvasAgg(figure)
+    ax = figure.add_subplot(111)
+    figure.subplots_adjust(bottom=0.25)
+    return canvas, ax
+
+
+def legacy_frame(canvas, ax, times, data):
+    # Mirrors the pre-blitting SensorDashboard.update_plot
+    ax.cla()
+    ax.set_xlabel("Time (ms)")
+    ax.plot(list(times), list(data), label="Lux", color="blue")
+    ax.set_ylabel("Lux")
+    ax.set_title("Real-Time Light Sensor Data")
+    ax.legend()
+    ax.grid(True)
+    canvas.draw()
+
+
+def run(points, use_blit):
+    canvas, ax = make_canvas()
+    times = np.arange(points, dtype=float) * 10
+    data = 300 + 50 * np.sin(times / 1000)
+    renderer = BlitPlotRenderer(canvas, ax) if use_blit else None
+    frame_times = []
+    for frame in range(FRAMES):
+        # Slide the window by one sample per frame, like the live buffer
+        times = times + 10
+        data = np.roll(data, -1)
+        start = time.perf_counter()
+        if renderer:
+            renderer.update(times, data)
+        else:
+            legacy_frame(canvas, ax, times, data)
+        frame_times.append(time.perf_counter() - start)
+    frame_times = np.array(frame_times) * 1000
+    full_draws = renderer.full_draws if renderer else FRAMES
+    return np.median(frame_times), np.percentile(frame_times, 95), full_draws
+
+
+def main():
+    print(f"{'points':>8} {'path':>8} {'median ms':>10} {'p95 ms':>8} {'full draws':>11}")
+    for points in (500, 50_000):
+        for use_blit in (False, True):
+            median, p95, full_draws = run(points, use_blit)
+            path = "blit" if use_blit else "legacy"
+            print(f"{points:>8} {path:>8} {median:>10.2f} {p95:>8.2f} {full_draws:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/bench_rolling_stats.py
+"""Per-sample cost of RollingStats vs. rescanning the 500-sample deque.
+
+Feeds 10 s worth of a 10k samples/s stream and reports the CPU share each
+approach would need to keep up in real time.
+
+Run with: python benchmarks/bench_rolling_stats.py
+"""
+import os
+import random
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from core.rolling_stats import RollingStats
+
+RATE = 10_000
+SECONDS = 10
+WINDOW = 500
+
+
+def legacy(values):
+    data = deque(maxlen=WINDOW)
+    for lux in values:
+        data.append(lux)
+        min(data)
+        max(data)
+        sum(data) / len(data)
+
+
+def rolling(values):
+    stats = RollingStats(window=WINDOW)
+    for lux in values:
+        stats.push(lux)
+        stats.min
+        stats.max
+        stats.mean
+
+
+def main():
+    values = [random.uniform(0, 65535) for _ in range(RATE * SECONDS)]
+    print(f"{len(values)} samples ({RATE}/s for {SECONDS} s), window={WINDOW}")
+    for name, func in (("legacy rescan", legacy), ("RollingStats", rolling)):
+        start = time.perf_counter()
+        func(values)
+        elapsed = time.perf_counter() - start
+        per_sample_us = elapsed / len(values) * 1e6
+        print(f"{name:>14}: {per_sample_us:6.2f} us/sample, {elapsed / SECONDS * 100:5.1f}% of one core at {RATE}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/bench_rollup_queries.py
+"""Dashboard queries over raw readings vs. the per-minute/per-hour rollup tables.
+
+Generates synthetic readings at 10 Hz, builds the rollups with the Lambda's
+Rollup class and times the Grafana-style queries on a SQLite stand-in.
+
+Run with: python benchmarks/bench_rollup_queries.py [readings]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "lambda_postgres_etl"))
+
+from lambda_function import Rollup
+
+CHUNK = 1_000_000
+RATE_HZ = 10
+
+
+def create_tables(conn):
+    conn.execute("CREATE TABLE readings (ts REAL, lux REAL)")
+    conn.execute("CREATE INDEX readings_ts_idx ON readings (ts)")
+    for table in ("lux_rollup_minute", "lux_rollup_hour"):
+        conn.execute(f"""
+            CREATE TABLE {table} (
+                bucket INTEGER PRIMARY KEY, reading_count INTEGER, lux_sum REAL,
+                lux_min REAL, lux_max REAL, lux_sum_sq REAL
+            )
+        """)
+
+
+def load(conn, readings, start):
+    rollup = Rollup()
+    rollup_time = 0.0
+    for offset in range(0, readings, CHUNK):
+        n = min(CHUNK, readings - offset)
+        ts = start + (offset + np.arange(n)) / RATE_HZ
+        lux = 500 + 400 * np.sin(ts / 3600) + np.random.normal(0, 20, n)
+        conn.executemany("INSERT INTO readings VALUES (?, ?)", zip(ts.tolist(), lux.tolist()))
+        began = time.perf_counter()
+        rollup.add(ts.astype("datetime64[s]"), lux)
+        rollup_time += time.perf_counter() - began
+    for table, buckets in (("lux_rollup_minute", rollup.minutes), ("lux_rollup_hour", rollup.hours())):
+        conn.executemany(f"INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?)",
+                         [(minute * 60, *values) for minute, values in sorted(buckets.items())])
+    conn.commit()
+    return rollup_time
+
+
+QUERIES = {
+    "latest day min/max/count": (
+        """SELECT MIN(lux), MAX(lux), COUNT(*) FROM readings
+           WHERE ts >= (SELECT MAX(ts) FROM readings) - ((SELECT MAX(ts) FROM readings) % 86400)""",
+        """SELECT MIN(lux_min), MAX(lux_max), SUM(reading_count) FROM lux_rollup_hour
+           WHERE bucket >= (SELECT MAX(bucket) FROM lux_rollup_hour) - ((SELECT MAX(bucket) FROM lux_rollup_hour) % 86400)""",
+    ),
+    "per-minute avg, last 24 h": (
+        """SELECT CAST(ts / 60 AS INTEGER) * 60 AS bucket, AVG(lux) FROM readings
+           WHERE ts >= :end - 86400 GROUP BY bucket ORDER BY bucket""",
+        """SELECT bucket, lux_sum / reading_count FROM lux_rollup_minute
+           WHERE bucket >= :end - 86400 ORDER BY bucket""",
+    ),
+    "per-minute min/max, full range": (
+        """SELECT CAST(ts / 60 AS INTEGER) * 60 AS bucket, MIN(lux), MAX(lux) FROM readings
+           GROUP BY bucket ORDER BY bucket""",
+        """SELECT bucket, lux_min, lux_max FROM lux_rollup_minute ORDER BY bucket""",
+    ),
+}
+
+
+def timed(conn, sql, params):
+    start = time.perf_counter()
+    rows = conn.execute(sql, params).fetchall()
+    return time.perf_counter() - start, len(rows)
+
+
+def main():
+    readings = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    start = 1745107200.0
+    end = start + readings / RATE_HZ
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        conn = sqlite3.connect(os.path.join(tmp_dir, "bench.db"))
+        create_tables(conn)
+        rollup_time = load(conn, readings, start)
+        print(f"{readings} readings at {RATE_HZ} Hz; rollup build {rollup_time:.2f} s")
+        for name, (raw_sql, rollup_sql) in QUERIES.items():
+            raw_time, _ = timed(conn, raw_sql, {"end": end})
+            rollup_time, rows = timed(conn, rollup_sql, {"end": end})
+            print(f"{name:>32}: raw {raw_time * 1000:9.1f} ms, rollup {rollup_time * 1000:7.2f} ms ({rows} rows)")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_serial_parser.py
+"""Serial ingest throughput through a pty standing in for the sensor's USB port.
+
+A writer thread pushes N readings into the pty master as fast as the reader
+drains them. Compared: the old per-line readline/decode/split path, the bulk
+text decoder, and binary frames. Reports samples per second parsed, which
+is what bounds the sustainable sample rate.
+
+Run with: python benchmarks/bench_serial_parser.py [samples]
+"""
+import os
+import pty
+import sys
+import threading
+import time
+
+import serial
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from core.ingest import parse_serial_line
+from core.serial_codec import SerialDecoder, encode_frame
+
+
+def text_stream(n):
+    return b"".join(b"%d,%.2f\n" % (i * 10, (i % 5000) * 0.37) for i in range(n))
+
+
+def binary_stream(n):
+    return b"".join(encode_frame(i * 10, (i % 5000) * 0.37) for i in range(n))
+
+
+def feed(master, data):
+    view = memoryview(data)
+    while view:
+        written = os.write(master, view[:4096])
+        view = view[written:]
+
+
+def run(data, n, read_loop):
+    master, slave = pty.openpty()
+    ser = serial.Serial(os.ttyname(slave), 115200, timeout=0.5)
+    writer = threading.Thread(target=feed, args=(master, data), daemon=True)
+    started = time.perf_counter()
+    writer.start()
+    count = read_loop(ser, n)
+    elapsed = time.perf_counter() - started
+    writer.join()
+    ser.close()
+    os.close(master)
+    os.close(slave)
+    assert count == n, f"parsed {count} of {n}"
+    return n / elapsed
+
+
+def legacy_loop(ser, n):
+    count = 0
+    while count < n:
+        line = ser.readline().decode().strip()
+        if line and parse_serial_line(line) is not None:
+            count += 1
+    return count
+
+
+def bulk_loop(ser, n):
+    decoder = SerialDecoder()
+    count = 0
+    while count < n:
+        _, lux = decoder.feed(ser.read(max(1, ser.in_waiting)))
+        count += len(lux)
+    return count
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    text, frames = text_stream(n), binary_stream(n)
+    print(f"{n} samples ({len(text) / n:.1f} B/sample text, {len(frames) / n:.0f} B/sample binary)")
+    for name, data, loop in [("readline + split", text, legacy_loop),
+                             ("bulk text", text, bulk_loop),
+                             ("bulk binary frames", frames, bulk_loop)]:
+        rate = run(data, n, loop)
+        print(f"{name:<20}{rate:>12,.0f} samples/s")
+
+
+if __name__ == "__main__":
+    main()
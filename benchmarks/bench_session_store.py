@@ -0,0 +1,60 @@
+# benchmarks/bench_session_store.py
+"""Bytes per sample of the old list-of-tuples session vs. SessionStore.
+
+Run with: python benchmarks/bench_session_store.py [samples]
+"""
+import datetime
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from core.session_store import SessionStore
+
+
+def fill_tuples(samples, start):
+    session = []
+    for i in range(samples):
+        now = start + i * 0.01
+        gmt_ts = datetime.datetime.utcfromtimestamp(now)
+        session.append((i * 10, gmt_ts.strftime("%Y-%m-%d %H:%M:%S"), 300.0 + (i % 700) / 7))
+    return session
+
+
+def fill_store(samples, start, lux_typecode):
+    session = SessionStore(lux_typecode=lux_typecode)
+    for i in range(samples):
+        now = start + i * 0.01
+        session.append(i * 10, int(now * 1_000_000_000), 300.0 + (i % 700) / 7)
+    return session
+
+
+def measure(name, func, samples):
+    tracemalloc.start()
+    start = time.perf_counter()
+    session = func()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:>22}: {size / samples:7.1f} bytes/sample, append {elapsed / samples * 1e6:5.2f} us/sample")
+    return session
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    start = time.time()
+    print(f"{samples} samples")
+    measure("list of tuples", lambda: fill_tuples(samples, start), samples)
+    measure("SessionStore float64", lambda: fill_store(samples, start, "d"), samples)
+    store = measure("SessionStore float32", lambda: fill_store(samples, start, "f"), samples)
+
+    start_iter = time.perf_counter()
+    for _ in store:
+        pass
+    print(f"lazy GMT iteration: {(time.perf_counter() - start_iter) / samples * 1e6:.2f} us/row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_startup.py
+"""Cold-start time of the dashboard, from interpreter start to first paint.
+
+Runs `src/main.py --profile-startup` offscreen several times and reports the
+best milestones and slowest imports, plus whether any cloud SDK was imported
+before the window appeared (it should not be).
+
+Run with: python benchmarks/bench_startup.py [runs] [--budget SECONDS]
+"""
+import os
+import re
+import subprocess
+import sys
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+SDKS = ("boto3", "botocore", "Adafruit_IO", "requests", "paho")
+MILESTONE = re.compile(r"^\s+(.+?)\s+([\d.]+)\s+\(\+[\d.]+\)$")
+IMPORT = re.compile(r"^\s+(\S+)\s+([\d.]+)$")
+
+
+def run_once():
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    out = subprocess.run([sys.executable, "main.py", "--profile-startup"], cwd=SRC, env=env,
+                         capture_output=True, text=True, timeout=120, check=True).stdout
+    milestones, imports = {}, {}
+    for line in out.splitlines():
+        if m := MILESTONE.match(line):
+            milestones[m.group(1)] = float(m.group(2))
+        elif m := IMPORT.match(line):
+            imports[m.group(1)] = float(m.group(2))
+    return milestones, imports
+
+
+def sdks_loaded_by_dashboard():
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", PYTHONPATH=SRC)
+    code = f"import sys, ui.layout; print(*[m for m in {SDKS!r} if m in sys.modules])"
+    return subprocess.run([sys.executable, "-c", code], env=env, capture_output=True,
+                          text=True, check=True).stdout.split()
+
+
+def main():
+    args = sys.argv[1:]
+    budget = None
+    if "--budget" in args:
+        i = args.index("--budget")
+        budget = float(args[i + 1])
+        del args[i:i + 2]
+    runs = int(args[0]) if args else 5
+
+    results = [run_once() for _ in range(runs)]
+    best, imports = min(results, key=lambda r: r[0]["first paint"])
+    print(f"Best of {runs} runs:")
+    for label, at in best.items():
+        print(f"  {label:<24}{at:8.3f} s")
+    print("Slowest imports:")
+    for package, spent in imports.items():
+        print(f"  {package:<24}{spent:8.3f} s")
+    eager = sdks_loaded_by_dashboard()
+    print(f"SDKs imported before first paint: {', '.join(eager) or 'none'}")
+
+    if eager:
+        print("FAIL: cloud SDKs should only be imported when first used")
+        sys.exit(1)
+    if budget is not None and best["first paint"] > budget:
+        print(f"FAIL: first paint {best['first paint']:.3f} s exceeds the {budget:.3f} s budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 import os
+import io
+import zlib
 import boto3
 import psycopg2
-import csv
-from io import StringIO
-from datetime import datetime
+import numpy as np
+from psycopg2.extras import execute_values
+from datetime import datetime, date, timedelta, timezone
 from zoneinfo import ZoneInfo
 
 s3 = boto3.client('s3')
@@ -14,11 +16,293 @@ DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 S3_BUCKET = os.getenv("AWS_S3_BUCKET")
 
+READ_CHUNK_SIZE = 1024 * 1024
+ETL_TIMEZONE = ZoneInfo("America/New_York")
+# Re-list the day before the watermark to cover uploads from hosts in other timezones
+LOOKBACK_DAYS = 1
+MAX_BACKFILL_DAYS = 31
+
+
+def iter_object_chunks(body, key):
+    """Stream an S3 object body in chunks, gunzipping `.gz` keys on the fly."""
+    decompressor = zlib.decompressobj(wbits=31) if key.endswith('.gz') else None
+    for chunk in body.iter_chunks(READ_CHUNK_SIZE):
+        yield decompressor.decompress(chunk) if decompressor else chunk
+    if decompressor:
+        yield decompressor.flush()
+
+
+READING_DTYPE = np.dtype([("ts", "datetime64[s]"), ("lux", np.float64)])
+
+
+def _parse_block(block):
+    """(GMT timestamp, lux) records for a block of complete `rel_ts,gmt_ts,lux` lines."""
+    try:
+        return np.loadtxt(io.BytesIO(block), delimiter=",", usecols=(1, 2), dtype=READING_DTYPE, ndmin=1)
+    except ValueError:
+        # Malformed rows somewhere in the block: fall back to the row-by-row rules
+        records = []
+        for line in block.splitlines():
+            parts = line.split(b",")
+            if len(parts) == 3 and parts[0].strip().lstrip(b"-").isdigit():
+                try:
+                    lux = float(parts[2])
+                except ValueError:
+                    continue
+                try:
+                    ts = np.datetime64(parts[1].decode().strip(), "s")
+                except ValueError:
+                    ts = np.datetime64("NaT")
+                records.append((ts, lux))
+        return np.array(records, dtype=READING_DTYPE)
+
+
+def iter_reading_blocks(chunks):
+    """Yield arrays of (ts, lux) records from the data section of an exported CSV.
+
+    The header line is skipped and parsing stops at the blank line that
+    precedes the Summary block, so summary rows are never parsed.
+    """
+    pending = b""
+    header_skipped = False
+    for chunk in chunks:
+        pending += chunk
+        if not header_skipped:
+            newline = pending.find(b"\n")
+            if newline < 0:
+                continue
+            pending = pending[newline + 1:]
+            header_skipped = True
+
+        data_end = pending.find(b"\n\r\n")
+        if data_end < 0:
+            data_end = pending.find(b"\n\n")
+        if pending.startswith((b"\r\n", b"\n")):
+            return
+        if data_end >= 0:
+            if data_end:
+                yield _parse_block(pending[:data_end + 1])
+            return
+
+        last_newline = pending.rfind(b"\n")
+        if last_newline >= 0:
+            yield _parse_block(pending[:last_newline + 1])
+            pending = pending[last_newline + 1:]
+
+    if header_skipped and pending.strip():
+        yield _parse_block(pending)
+
+
+class Rollup:
+    """Per-minute reading count, sum, min, max and sum of squares.
+
+    Blocks are reduced with NumPy and merged into a dict keyed by epoch
+    minute, so a minute split across blocks or files is combined correctly.
+    """
+
+    def __init__(self):
+        self.minutes = {}
+
+    def add(self, ts, lux):
+        valid = ~np.isnat(ts)
+        minutes = ts[valid].astype("datetime64[m]").astype(np.int64)
+        lux = lux[valid]
+        if not len(minutes):
+            return
+        if (np.diff(minutes) < 0).any():
+            order = np.argsort(minutes, kind="stable")
+            minutes, lux = minutes[order], lux[order]
+        starts = np.flatnonzero(np.r_[True, minutes[1:] != minutes[:-1]])
+        counts = np.diff(np.r_[starts, len(minutes)])
+        sums = np.add.reduceat(lux, starts)
+        mins = np.minimum.reduceat(lux, starts)
+        maxs = np.maximum.reduceat(lux, starts)
+        sums_sq = np.add.reduceat(lux * lux, starts)
+        for bucket in zip(minutes[starts].tolist(), counts.tolist(), sums.tolist(),
+                          mins.tolist(), maxs.tolist(), sums_sq.tolist()):
+            self._merge(self.minutes, *bucket)
+
+    @staticmethod
+    def _merge(buckets, key, count, total, low, high, total_sq):
+        current = buckets.get(key)
+        if current is None:
+            buckets[key] = [count, total, low, high, total_sq]
+        else:
+            current[0] += count
+            current[1] += total
+            current[2] = min(current[2], low)
+            current[3] = max(current[3], high)
+            current[4] += total_sq
+
+    def hours(self):
+        hours = {}
+        for minute, values in self.minutes.items():
+            self._merge(hours, minute // 60 * 60, *values)
+        return hours
+
+    @staticmethod
+    def rows(buckets):
+        return [
+            (datetime.fromtimestamp(minute * 60, timezone.utc), *values)
+            for minute, values in sorted(buckets.items())
+        ]
+
+
+def summarize_csv_stream(chunks, rollup=None):
+    """Return (record_count, min_lux, max_lux, avg_lux) for an exported CSV, or None if it has no data.
+
+    If a Rollup is given, the readings are also added to its time buckets.
+    """
+    count = 0
+    total = 0.0
+    min_lux = np.inf
+    max_lux = -np.inf
+    for records in iter_reading_blocks(chunks):
+        if not len(records):
+            continue
+        lux = records["lux"]
+        count += len(lux)
+        total += float(lux.sum())
+        min_lux = min(min_lux, float(lux.min()))
+        max_lux = max(max_lux, float(lux.max()))
+        if rollup is not None:
+            rollup.add(records["ts"], lux)
+    if not count:
+        return None
+    return count, min_lux, max_lux, total / count
+
+
+def file_date_from_key(key):
+    try:
+        name = os.path.basename(key)
+        date_part = name.split("_")[2].split(".")[0]
+        return datetime.strptime(date_part, "%Y-%m-%d").date()
+    except (IndexError, ValueError):
+        return datetime.utcnow().date()
+
+
+def write_summaries(cursor, rows):
+    """Upsert all per-file summaries in one statement; returns the keys that were new.
+
+    Only new or changed objects reach this point, so a conflicting row is a
+    re-exported file and its summary is replaced.
+    """
+    if not rows:
+        return set()
+    written = execute_values(cursor, """
+        INSERT INTO lux_file_summary (filename, file_date, record_count, min_lux, max_lux, avg_lux)
+        VALUES %s
+        ON CONFLICT (filename) DO UPDATE SET
+            file_date = EXCLUDED.file_date,
+            record_count = EXCLUDED.record_count,
+            min_lux = EXCLUDED.min_lux,
+            max_lux = EXCLUDED.max_lux,
+            avg_lux = EXCLUDED.avg_lux
+        RETURNING filename, (xmax = 0) AS inserted
+    """, rows, fetch=True)
+    return {filename for filename, inserted in written if inserted}
+
+
+ROLLUP_TABLES = ("lux_rollup_minute", "lux_rollup_hour")
+
+
+def ensure_schema(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS etl_object_state (
+            s3_key TEXT PRIMARY KEY,
+            etag TEXT NOT NULL,
+            last_modified TIMESTAMPTZ NOT NULL,
+            processed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """)
+    for table in ROLLUP_TABLES:
+        # The primary key on bucket is the index the dashboard range scans use
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                bucket TIMESTAMPTZ PRIMARY KEY,
+                reading_count BIGINT NOT NULL,
+                lux_sum DOUBLE PRECISION NOT NULL,
+                lux_min DOUBLE PRECISION NOT NULL,
+                lux_max DOUBLE PRECISION NOT NULL,
+                lux_sum_sq DOUBLE PRECISION NOT NULL
+            )
+        """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS lux_file_summary_date_created_idx
+        ON lux_file_summary (file_date, created_at)
+    """)
+
+
+def write_rollups(cursor, table, rows):
+    """Merge bucket rows into a rollup table: counts and sums add, min/max combine."""
+    if not rows:
+        return
+    execute_values(cursor, f"""
+        INSERT INTO {table} AS t (bucket, reading_count, lux_sum, lux_min, lux_max, lux_sum_sq)
+        VALUES %s
+        ON CONFLICT (bucket) DO UPDATE SET
+            reading_count = t.reading_count + EXCLUDED.reading_count,
+            lux_sum = t.lux_sum + EXCLUDED.lux_sum,
+            lux_min = LEAST(t.lux_min, EXCLUDED.lux_min),
+            lux_max = GREATEST(t.lux_max, EXCLUDED.lux_max),
+            lux_sum_sq = t.lux_sum_sq + EXCLUDED.lux_sum_sq
+    """, rows)
+
+
+def date_prefixes(start, end):
+    days = (end - start).days
+    return [(start + timedelta(days=n)).strftime("%Y/%m/%d/") for n in range(days + 1)]
+
+
+def resolve_date_range(cursor, event, today):
+    """Dates to scan: the event's start_date/end_date, or from the watermark up to today."""
+    event = event or {}
+    end = date.fromisoformat(event["end_date"]) if event.get("end_date") else today
+    if event.get("start_date"):
+        return date.fromisoformat(event["start_date"]), end
+
+    cursor.execute("SELECT MAX(last_modified) FROM etl_object_state")
+    watermark = cursor.fetchone()[0]
+    if watermark is None:
+        return end, end
+    start = watermark.astimezone(ETL_TIMEZONE).date() - timedelta(days=LOOKBACK_DAYS)
+    return max(start, end - timedelta(days=MAX_BACKFILL_DAYS)), end
+
+
+def load_object_state(cursor, start, end):
+    # Keys start with YYYY/MM/DD/, so a date range is a key range on the primary key
+    cursor.execute(
+        "SELECT s3_key, etag FROM etl_object_state WHERE s3_key >= %s AND s3_key < %s",
+        (start.strftime("%Y/%m/%d/"), (end + timedelta(days=1)).strftime("%Y/%m/%d/"))
+    )
+    return dict(cursor.fetchall())
+
+
+def write_object_state(cursor, objects):
+    if not objects:
+        return
+    execute_values(cursor, """
+        INSERT INTO etl_object_state (s3_key, etag, last_modified)
+        VALUES %s
+        ON CONFLICT (s3_key) DO UPDATE SET
+            etag = EXCLUDED.etag,
+            last_modified = EXCLUDED.last_modified,
+            processed_at = now()
+    """, [(obj['Key'], obj['ETag'], obj['LastModified']) for obj in objects])
+
+
+def list_csv_objects(prefix):
+    paginator = s3.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=S3_BUCKET, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            if obj['Key'].endswith(('.csv', '.csv.gz')):
+                yield obj
+
+
 def lambda_handler(event, context):
-    # Set timezone to Eastern Time
-    eastern_time = datetime.now(ZoneInfo("America/New_York"))
-    prefix = eastern_time.strftime("2025/%m/%d/")
+    today = datetime.now(ETL_TIMEZONE).date()
     processed = 0
+    skipped = 0
 
     # Connect to RDS
     try:
@@ -33,56 +317,41 @@ def lambda_handler(event, context):
         return {"status": "DB connection error", "error": str(e)}
 
     try:
-        response = s3.list_objects_v2(Bucket=S3_BUCKET, Prefix=prefix)
-        files = [obj['Key'] for obj in response.get('Contents', []) if obj['Key'].endswith('.csv')]
-
-        for key in files:
-            obj = s3.get_object(Bucket=S3_BUCKET, Key=key)
-            content = obj['Body'].read().decode('utf-8')
-            reader = csv.reader(StringIO(content))
-
-            headers = next(reader, None)
-            data = []
-
-            for row in reader:
-                if len(row) == 3 and row[0].isdigit():
-                    try:
-                        lux = float(row[2])
-                        data.append(lux)
-                    except:
-                        continue
-
-            if not data:
-                continue
+        ensure_schema(cursor)
+        start, end = resolve_date_range(cursor, event, today)
+        known_etags = load_object_state(cursor, start, end)
+
+        rows = []
+        fetched = []
+        rollup = Rollup()
+        for prefix in date_prefixes(start, end):
+            for obj in list_csv_objects(prefix):
+                key = obj['Key']
+                if known_etags.get(key) == obj['ETag']:
+                    skipped += 1
+                    continue
+                body = s3.get_object(Bucket=S3_BUCKET, Key=key)['Body']
+                # Rollups can't subtract an old version of a changed file, so only new keys feed them
+                summary = summarize_csv_stream(iter_object_chunks(body, key),
+                                               rollup if key not in known_etags else None)
+                fetched.append(obj)
+                if summary is None:
+                    continue
+                record_count, min_lux, max_lux, avg_lux = summary
+                rows.append((key, file_date_from_key(key), record_count, min_lux, max_lux, avg_lux))
+                processed += 1
 
-            min_lux = min(data)
-            max_lux = max(data)
-            avg_lux = sum(data) / len(data)
-            record_count = len(data)
-
-            try:
-                name = os.path.basename(key)
-                date_part = name.split("_")[2].split(".")[0]
-                file_date = datetime.strptime(date_part, "%Y-%m-%d").date()
-            except:
-                file_date = datetime.utcnow().date()
-
-            cursor.execute("""
-                INSERT INTO lux_file_summary (filename, file_date, record_count, min_lux, max_lux, avg_lux)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (filename) DO NOTHING
-            """, (key, file_date, record_count, min_lux, max_lux, avg_lux))
-            
-            # Log whether the row was inserted or skipped
-            if cursor.rowcount == 0:
-                print(f"[SKIP] File already processed: {key}")
-            else:
-                print(f"[INSERT] File inserted: {key}")
-
-            conn.commit()
-            processed += 1
+        inserted = write_summaries(cursor, rows)
+        write_rollups(cursor, "lux_rollup_minute", Rollup.rows(rollup.minutes))
+        write_rollups(cursor, "lux_rollup_hour", Rollup.rows(rollup.hours()))
+        write_object_state(cursor, fetched)
+        conn.commit()
+        for key, *_ in rows:
+            print(f"[INSERT] File inserted: {key}" if key in inserted else f"[UPDATE] File changed: {key}")
+        print(f"[SKIP] {skipped} unchanged files since watermark ({start} to {end})")
 
     except Exception as e:
+        conn.rollback()
         return {"status": "ETL error", "error": str(e)}
 
     finally:
@@ -91,5 +360,6 @@ def lambda_handler(event, context):
 
     return {
         "status": "success",
-        "files_processed": processed
+        "files_processed": processed,
+        "files_skipped": skipped
     }
@@ -17,6 +17,30 @@ BH1750 lightMeter;
 unsigned long lastSend = 0;
 const int interval = 10;  // 100 Hz = every 10 ms
 
+// 1: send 12-byte binary frames over serial instead of "millis,lux" text lines.
+// Layout (little-endian): 0xA5 0x5A, uint32 millis, float32 lux, CRC-16/CCITT-FALSE of
+// the 8 payload bytes. The dashboard detects either format on its own.
+#define SERIAL_BINARY_FRAMES 0
+
+// Readings per MQTT message. 1 publishes the single-reading JSON every dashboard
+// understands; more cuts broker and parse overhead at high sample rates (max 255).
+#define MQTT_BATCH_SIZE 1
+// With MQTT_BATCH_SIZE > 1: 1 sends the "LX" binary batch (8-byte header: 'L' 'X',
+// version 1, count, uint32 base millis; then per reading uint16 ms after base and
+// float32 lux, little-endian). 0 sends {"device","timestamp","dt":[...],"lux":[...]}.
+#define MQTT_BATCH_BINARY 1
+
+#if MQTT_BATCH_SIZE > 1
+unsigned long batchBase = 0;
+uint16_t batchDt[MQTT_BATCH_SIZE];
+float batchLux[MQTT_BATCH_SIZE];
+uint8_t batchCount = 0;
+#endif
+
+// Unique per board (from the WiFi MAC); used as MQTT client id and in the topic
+char deviceId[20];
+char topic[48];
+
 void setup() {
   Serial.begin(115200);
   Wire.begin();
@@ -29,13 +53,21 @@ void setup() {
   }
   Serial.println("Connected to WiFi");
 
+  uint8_t mac[6];
+  WiFi.macAddress(mac);
+  snprintf(deviceId, sizeof(deviceId), "bh1750-%02x%02x%02x", mac[3], mac[4], mac[5]);
+  snprintf(topic, sizeof(topic), "sensor/%s/lux", deviceId);
+
   // Setup MQTT
   client.setServer(mqtt_server, 1883);
+#if MQTT_BATCH_SIZE > 1
+  client.setBufferSize(128 + 24 * MQTT_BATCH_SIZE);  // PubSubClient defaults to 256 bytes
+#endif
   client.setKeepAlive(60); // <-- this is how you set keepalive time
 
   while (!client.connected()) {
     Serial.print("Connecting to MQTT...");
-    if (client.connect("ESP32Client")) {
+    if (client.connect(deviceId)) {
       Serial.println("Connected!");
     } else {
       Serial.print("Failed, rc=");
@@ -46,10 +78,81 @@ void setup() {
   }
 }
 
+uint16_t crc16Ccitt(const uint8_t* data, size_t len) {
+  uint16_t crc = 0xFFFF;
+  for (size_t i = 0; i < len; i++) {
+    crc ^= (uint16_t)data[i] << 8;
+    for (int bit = 0; bit < 8; bit++) {
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+    }
+  }
+  return crc;
+}
+
+void sendSerialReading(unsigned long now, float lux) {
+#if SERIAL_BINARY_FRAMES
+  uint8_t frame[12] = {0xA5, 0x5A};
+  uint32_t ms = now;
+  memcpy(frame + 2, &ms, 4);   // ESP32 is little-endian
+  memcpy(frame + 6, &lux, 4);
+  uint16_t crc = crc16Ccitt(frame + 2, 8);
+  memcpy(frame + 10, &crc, 2);
+  Serial.write(frame, sizeof(frame));
+#else
+  Serial.printf("%lu,%.2f\n", now, lux);
+#endif
+}
+
+#if MQTT_BATCH_SIZE > 1
+void publishBatch() {
+#if MQTT_BATCH_BINARY
+  uint8_t buf[8 + 6 * MQTT_BATCH_SIZE] = {'L', 'X', 1, batchCount};
+  uint32_t base = batchBase;
+  memcpy(buf + 4, &base, 4);
+  for (uint8_t i = 0; i < batchCount; i++) {
+    memcpy(buf + 8 + 6 * i, &batchDt[i], 2);
+    memcpy(buf + 10 + 6 * i, &batchLux[i], 4);
+  }
+  client.publish(topic, buf, 8 + 6 * batchCount);
+#else
+  static char payload[96 + 24 * MQTT_BATCH_SIZE];
+  int len = snprintf(payload, sizeof(payload), "{\"device\":\"%s\",\"timestamp\":%lu,\"dt\":[", deviceId, batchBase);
+  for (uint8_t i = 0; i < batchCount; i++) {
+    len += snprintf(payload + len, sizeof(payload) - len, i ? ",%u" : "%u", batchDt[i]);
+  }
+  len += snprintf(payload + len, sizeof(payload) - len, "],\"lux\":[");
+  for (uint8_t i = 0; i < batchCount; i++) {
+    len += snprintf(payload + len, sizeof(payload) - len, i ? ",%.2f" : "%.2f", batchLux[i]);
+  }
+  snprintf(payload + len, sizeof(payload) - len, "]}");
+  client.publish(topic, payload);
+#endif
+  batchCount = 0;
+}
+#endif
+
+void publishReading(unsigned long now, float lux) {
+#if MQTT_BATCH_SIZE > 1
+  if (batchCount == 0) {
+    batchBase = now;
+  }
+  batchDt[batchCount] = (uint16_t)(now - batchBase);
+  batchLux[batchCount] = lux;
+  batchCount++;
+  if (batchCount == MQTT_BATCH_SIZE) {
+    publishBatch();
+  }
+#else
+  char payload[96];
+  snprintf(payload, sizeof(payload), "{\"device\":\"%s\",\"timestamp\":%lu,\"lux\":%.2f}", deviceId, now, lux);
+  client.publish(topic, payload);
+#endif
+}
+
 void reconnect() {
   while (!client.connected()) {
     Serial.print("Reconnecting to MQTT...");
-    if (client.connect("ESP32Client")) {
+    if (client.connect(deviceId)) {
       Serial.println("connected");
     } else {
       Serial.print("failed, rc=");
@@ -71,10 +174,7 @@ void loop() {
     lastSend = now;
 
     float lux = lightMeter.readLightLevel();
-    Serial.printf("%lu,%.2f\n", now, lux);
-
-    char payload[64];
-    snprintf(payload, sizeof(payload), "{\"timestamp\":%lu,\"lux\":%.2f}", now, lux);
-    client.publish("sensor/lux", payload);
+    sendSerialReading(now, lux);
+    publishReading(now, lux);
   }
 }
\ No newline at end of file
@@ -0,0 +1,79 @@
+# src/collector.py
+"""Headless collector: ingest serial/MQTT readings, journal, export and upload without the GUI.
+
+Usage: python src/collector.py [--serial PORT ...] [--no-mqtt] [--no-s3] [--no-adafruit] [--no-history]
+"""
+import argparse
+import asyncio
+import os
+
+from config import (
+    MQTT_BROKER, MQTT_TOPIC, MQTT_DEVICE_TOPIC, MQTT_QOS, MQTT_CLIENT_ID, DEFAULT_LOG_DIR, EXPORT_BINARY,
+    EXPORT_PARQUET, COLLECTOR_FEED_PORT, HISTORY_RETENTION_DAYS, HISTORY_MAX_MB, COLLECTOR_EXPORT_INTERVAL_SEC
+)
+from core.collector import Collector
+from core.ingest import SerialTransport, MqttTransport, mqtt_client_id
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless BH1750 lux collector")
+    parser.add_argument("--serial", action="append", default=[], metavar="PORT",
+                        help="read a serial port (repeatable)")
+    parser.add_argument("--no-mqtt", action="store_true", help="do not subscribe to MQTT")
+    parser.add_argument("--broker", default=MQTT_BROKER)
+    parser.add_argument("--logs-dir", default=DEFAULT_LOG_DIR)
+    parser.add_argument("--export-interval", type=int, default=COLLECTOR_EXPORT_INTERVAL_SEC,
+                        help="seconds between CSV exports")
+    parser.add_argument("--feed-port", type=int, default=COLLECTOR_FEED_PORT,
+                        help="TCP port of the live feed for GUI viewers (0 disables it)")
+    parser.add_argument("--no-s3", action="store_true", help="keep exports local")
+    parser.add_argument("--no-adafruit", action="store_true", help="do not publish to Adafruit IO")
+    parser.add_argument("--no-history", action="store_true",
+                        help="do not keep readings in the local history store")
+    return parser.parse_args(argv)
+
+
+def build_collector(args):
+    os.makedirs(args.logs_dir, exist_ok=True)
+    transports = [SerialTransport(port) for port in args.serial]
+    if not args.no_mqtt:
+        transports.append(MqttTransport(
+            args.broker, [MQTT_TOPIC, MQTT_DEVICE_TOPIC], qos=MQTT_QOS,
+            client_id=MQTT_CLIENT_ID or mqtt_client_id("Collector", args.logs_dir)
+        ))
+
+    aio_uploader = s3_uploader = history = None
+    if not args.no_adafruit:
+        from core.adafruit_uploader import AdafruitUploader
+        aio_uploader = AdafruitUploader()
+    if not args.no_s3:
+        from core.s3_uploader import S3UploadManager
+        s3_uploader = S3UploadManager(os.path.join(args.logs_dir, "s3_queue.json"))
+        s3_uploader.resume()
+    if not args.no_history:
+        from core.history import HistoryStore
+        history = HistoryStore(os.path.join(args.logs_dir, "history.sqlite3"),
+                               retention_days=HISTORY_RETENTION_DAYS, max_bytes=HISTORY_MAX_MB * 1024 * 1024)
+
+    return Collector(
+        transports, args.logs_dir, export_interval=args.export_interval,
+        feed_port=args.feed_port or None, aio_uploader=aio_uploader,
+        s3_uploader=s3_uploader, binary=EXPORT_BINARY, parquet=EXPORT_PARQUET, history=history
+    )
+
+
+def main(argv=None):
+    collector = build_collector(parse_args(argv))
+    try:
+        asyncio.run(collector.run())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass  # Ctrl+C / SIGTERM; run() has already flushed and exported
+    finally:
+        if collector.aio_uploader is not None:
+            collector.aio_uploader.stop()
+        if collector.s3_uploader is not None:
+            collector.s3_uploader.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,17 @@ load_dotenv()
 # MQTT
 MQTT_BROKER = os.getenv("MQTT_BROKER", "localhost")
 MQTT_TOPIC = "sensor/lux"
+# Multi-node deployments publish to sensor/<device id>/lux
+MQTT_DEVICE_TOPIC = "sensor/+/lux"
+# QoS 1 with a persistent session: the broker keeps readings while we reconnect
+MQTT_QOS = int(os.getenv("MQTT_QOS", "1"))
+# Leave unset to get a stable id per install (see core.ingest.mqtt_client_id)
+MQTT_CLIENT_ID = os.getenv("MQTT_CLIENT_ID")
+
+# Headless collector (src/collector.py) and its live feed for GUI viewers
+COLLECTOR_HOST = os.getenv("COLLECTOR_HOST", "localhost")
+COLLECTOR_FEED_PORT = int(os.getenv("COLLECTOR_FEED_PORT", "8765"))
+COLLECTOR_EXPORT_INTERVAL_SEC = int(os.getenv("COLLECTOR_EXPORT_INTERVAL_SEC", "3600"))
 
 # Adafruit IO
 AIO_USERNAME = 'arc2233'
@@ -32,6 +43,15 @@ DEFAULT_LOG_DIR = os.path.join(APP_DIR, 'logs')
 # Make sure the logs directory exists
 os.makedirs(DEFAULT_LOG_DIR, exist_ok=True)
 
+# Also write a compact binary copy (.lxb) of each exported session
+EXPORT_BINARY = os.getenv("EXPORT_BINARY", "0") == "1"
+# Also write a Parquet copy of each export (needs pyarrow), uploaded under parquet/date=.../device=.../
+EXPORT_PARQUET = os.getenv("EXPORT_PARQUET", "0") == "1"
+
+# Local history store (logs/history.sqlite3) behind the dashboard's History view
+HISTORY_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", "30"))
+HISTORY_MAX_MB = int(os.getenv("HISTORY_MAX_MB", "512"))
+
 # GUI update intervals
 UPDATE_INTERVAL_MS = 100
 AIO_SEND_INTERVAL_SEC = 2
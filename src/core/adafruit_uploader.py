@@ -1,14 +1,147 @@
 # src/core/adafruit_uploader.py
-from Adafruit_IO import Client
-from config import AIO_USERNAME, AIO_KEY, AIO_FEED
-
-aio = Client(AIO_USERNAME, AIO_KEY)
-
-def send_to_adafruit(lux):
-    try:
-        aio.send(AIO_FEED, lux)
-        print(f"[Adafruit IO] Uploaded Lux: {lux}")
-        return True
-    except Exception as e:
-        print(f"[Adafruit IO] Error: {e}")
-        return False
+import time
+import random
+import datetime
+from threading import Thread, Event, Lock
+
+from config import AIO_USERNAME, AIO_KEY, AIO_FEED, AIO_SEND_INTERVAL_SEC
+
+AIO_BASE_URL = "https://io.adafruit.com"
+
+
+class AdafruitUploader:
+    """One long-lived worker that uploads readings to Adafruit IO in batches.
+
+    `submit` is cheap and safe to call from any thread. Readings are coalesced
+    to the latest value per `interval`-second slot, and every `interval` the
+    worker posts all pending slots through the feed's batch endpoint over a
+    pooled HTTP session. On throttling or errors the batch is kept and retried
+    with jittered exponential backoff (or the server's Retry-After).
+    `on_status(ok, message)` is called from the worker thread after each attempt.
+    """
+
+    def __init__(self, on_status=None, interval=AIO_SEND_INTERVAL_SEC, max_batch=30,
+                 max_backoff=60.0, session=None):
+        self.on_status = on_status
+        self.interval = interval
+        self.max_batch = max_batch
+        self.max_backoff = max_backoff
+        self.url = f"{AIO_BASE_URL}/api/v2/{AIO_USERNAME}/feeds/{AIO_FEED}/data/batch"
+        self._session = None
+        if session is not None:
+            self.session = session
+        self.failures = 0
+        self.sent = 0
+        self._pending = {}
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._thread = None
+
+    @property
+    def session(self):
+        # requests is only imported once the worker first posts
+        if self._session is None:
+            import requests
+            self.session = requests.Session()
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        session.headers.update({"X-AIO-Key": AIO_KEY or "", "Content-Type": "application/json"})
+        self._session = session
+
+    def submit(self, lux, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            self._pending[int(timestamp // self.interval)] = (timestamp, lux)
+            while len(self._pending) > self.max_batch:
+                del self._pending[min(self._pending)]
+        if self._thread is None:
+            self.start()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = Thread(target=self._run, name="AdafruitUploader", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        delay = self.interval
+        while not self._stop_event.wait(delay):
+            delay = self.flush()
+
+    def _take_batch(self):
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        return batch
+
+    def _requeue(self, batch):
+        with self._lock:
+            # Newer readings for the same slot win over the failed ones
+            batch.update(self._pending)
+            self._pending = batch
+            while len(self._pending) > self.max_batch:
+                del self._pending[min(self._pending)]
+
+    def _backoff(self, retry_after=None):
+        self.failures += 1
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        delay = min(self.max_backoff, self.interval * 2 ** self.failures)
+        return delay * random.uniform(0.5, 1.5)
+
+    def flush(self):
+        """Post everything pending once. Returns the delay before the next attempt."""
+        batch = self._take_batch()
+        if not batch:
+            return self.interval
+
+        data = [
+            {
+                "value": lux,
+                "created_at": datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).isoformat(),
+            }
+            for _, (ts, lux) in sorted(batch.items())
+        ]
+        try:
+            response = self.session.post(self.url, json={"data": data}, timeout=10)
+        except Exception as e:
+            print(f"[Adafruit IO] Error: {e}")
+            self._requeue(batch)
+            self._report(False, str(e))
+            return self._backoff()
+
+        if response.status_code == 429:
+            print("[Adafruit IO] Throttled, backing off")
+            self._requeue(batch)
+            self._report(False, "Throttled")
+            return self._backoff(response.headers.get("Retry-After"))
+        if response.status_code >= 400:
+            print(f"[Adafruit IO] Error: HTTP {response.status_code}")
+            if response.status_code >= 500:
+                self._requeue(batch)  # other client errors would fail again, so drop them
+            self._report(False, f"HTTP {response.status_code}")
+            return self._backoff()
+
+        self.failures = 0
+        self.sent += len(data)
+        print(f"[Adafruit IO] Uploaded {len(data)} readings, latest Lux: {data[-1]['value']}")
+        self._report(True, "Updated")
+        return self.interval
+
+    def _report(self, ok, message):
+        if self.on_status:
+            try:
+                self.on_status(ok, message)
+            except Exception as e:
+                print(f"[Adafruit IO] Status callback error: {e}")
@@ -0,0 +1,73 @@
+# src/core/clock_sync.py
+from collections import deque
+
+import numpy as np
+
+# Crystal drift is tens of ppm; a fitted slope further from 1 than this is noise
+MAX_DRIFT = 1e-3
+
+
+class ClockSync:
+    """Maps a device's millis() onto host epoch seconds.
+
+    Each read contributes one `(device_ms, host_time)` pair: the newest
+    sample in the read and the host time it was read at. Per `bucket_sec` of
+    device time only the least-delayed pair is kept, and over the last
+    `window` buckets the drift (slope) comes from a least-squares fit and the
+    offset from the lower envelope. Batching and thread jitter only ever make
+    a read look late, so they do not pull the estimate. A device reset
+    (millis going backwards) starts over. Returned times never go backwards.
+    """
+
+    def __init__(self, window=256, bucket_sec=1.0):
+        self.bucket_sec = bucket_sec
+        self._pairs = deque(maxlen=window)
+        self.reset()
+
+    def reset(self):
+        self._pairs.clear()
+        self.slope = 1.0
+        self.offset = None
+        self._origin_ms = None
+        self._last_ms = None
+        self._bucket = None
+        self._last_out = float("-inf")
+
+    @property
+    def synced(self):
+        return self.offset is not None
+
+    def observe(self, device_ms, host_time):
+        if self._last_ms is not None and device_ms < self._last_ms:
+            print(f"[Clock] Device clock went back ({self._last_ms} -> {device_ms} ms); resyncing")
+            self.reset()
+        if self._origin_ms is None:
+            self._origin_ms = device_ms
+        self._last_ms = device_ms
+
+        x = (device_ms - self._origin_ms) / 1000.0
+        bucket = int(x // self.bucket_sec)
+        if bucket != self._bucket:
+            self._bucket = bucket
+            self._pairs.append((x, host_time))
+        elif host_time - x < self._pairs[-1][1] - self._pairs[-1][0]:
+            self._pairs[-1] = (x, host_time)
+        else:
+            return  # no better than this bucket's pair; the fit is unchanged
+        self._fit()
+
+    def _fit(self):
+        x, y = np.array(self._pairs).T
+        y0 = y[0]
+        y = y - y0  # keep the fit well-conditioned next to 1.7e9 s epochs
+        if len(x) >= 8:
+            slope = np.polyfit(x, y, 1)[0]
+            self.slope = min(max(slope, 1.0 - MAX_DRIFT), 1.0 + MAX_DRIFT)
+        self.offset = y0 + float(np.min(y - self.slope * x))
+
+    def to_host(self, device_ms):
+        """Host epoch seconds for device millis (scalar or array); call observe() first."""
+        x = (np.asarray(device_ms, np.float64) - self._origin_ms) / 1000.0
+        host = np.maximum.accumulate(np.maximum(np.atleast_1d(self.offset + self.slope * x), self._last_out))
+        self._last_out = float(host[-1])
+        return host if np.ndim(device_ms) else float(host[0])
@@ -0,0 +1,150 @@
+# src/core/collector.py
+import os
+import time
+import signal
+import asyncio
+
+from core.data_logger import SessionWAL
+from core.ingest import run_transport, format_feed_lines, BatchSink
+from core.ingest_queue import IngestQueue
+from core.streams import StreamRegistry, export_streams
+
+# A viewer further behind than this is disconnected instead of buffering without bound
+FEED_MAX_BUFFER = 1024 * 1024
+
+
+class Collector:
+    """Headless data path: ingest, journal, export and upload without Qt.
+
+    Transports run as tasks on the caller's asyncio loop. Readings are routed
+    every `drain_interval` seconds into per-device streams and the session
+    WAL, exactly as the dashboard does. Sessions are exported to CSV every
+    `export_interval` seconds (and on shutdown) and queued for S3. When
+    `feed_port` is set, `device,epoch_ns,lux` lines are streamed to any TCP
+    client, so a dashboard can attach as a live viewer. A `history` store, if
+    given, gets every reading for later browsing.
+    """
+
+    def __init__(self, transports, logs_dir, export_interval=3600, drain_interval=0.25,
+                 feed_host="0.0.0.0", feed_port=None, aio_uploader=None, s3_uploader=None,
+                 binary=False, parquet=False, history=None):
+        self.transports = list(transports)
+        self.logs_dir = logs_dir
+        self.export_interval = export_interval
+        self.drain_interval = drain_interval
+        self.feed_host = feed_host
+        self.feed_port = feed_port
+        self.aio_uploader = aio_uploader
+        self.s3_uploader = s3_uploader
+        self.binary = binary
+        self.parquet = parquet
+        self.history = history
+        self.ingest_queue = IngestQueue()
+        # The live window only feeds stats here; keep it small
+        self.streams = StreamRegistry(window=60, spool_dir=logs_dir)
+        os.makedirs(logs_dir, exist_ok=True)
+        self.session_log = SessionWAL(os.path.join(logs_dir, "temp_log.csv"))
+        self.origin = None
+        self._feed_server = None
+        self._feed_clients = set()
+        self._last_export = time.monotonic()
+
+    def sink(self, device, lux, timestamp=None):
+        self.ingest_queue.put((time.time() if timestamp is None else timestamp, device, lux))
+
+    def sink_many(self, readings):
+        now = time.time()
+        self.ingest_queue.put_many([(now if timestamp is None else timestamp, device, lux)
+                                    for device, lux, timestamp in readings])
+
+    def drain(self):
+        batch = self.ingest_queue.drain()
+        if not batch:
+            return 0
+        if self.origin is None:
+            self.origin = batch[0][0]
+        self.streams.ingest(batch, self.origin, self.session_log)
+        if self.history is not None:
+            self.history.append_many(batch)
+        if self.aio_uploader is not None:
+            # Adafruit IO has a single feed: forward the newest reading of any device
+            now, _, lux = batch[-1]
+            self.aio_uploader.submit(lux, now)
+        self._broadcast(batch)
+        return len(batch)
+
+    def export(self):
+        self._last_export = time.monotonic()
+        exported, failed = export_streams(self.streams, self.logs_dir, binary=self.binary,
+                                          parquet=self.parquet)
+        for filepath in exported:
+            print(f"[Collector] Exported {filepath}")
+            if self.s3_uploader is not None:
+                self.s3_uploader.enqueue(filepath)
+        if failed:
+            print(f"[Collector] {failed} session(s) could not be exported")
+        return exported
+
+    async def _serve_feed_client(self, reader, writer):
+        self._feed_clients.add(writer)
+        try:
+            await reader.read()  # viewers never send anything; wait for them to hang up
+        except OSError:
+            pass
+        finally:
+            self._feed_clients.discard(writer)
+            writer.close()
+
+    def _broadcast(self, batch):
+        if not self._feed_clients:
+            return
+        data = format_feed_lines(batch)
+        for writer in list(self._feed_clients):
+            if writer.transport.get_write_buffer_size() > FEED_MAX_BUFFER:
+                print("[Collector] Dropping a viewer that stopped reading")
+                self._feed_clients.discard(writer)
+                writer.close()
+            else:
+                writer.write(data)
+
+    async def run(self):
+        """Collect until cancelled (Ctrl+C or SIGTERM), then flush and export."""
+        loop = asyncio.get_running_loop()
+        main_task = asyncio.current_task()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, main_task.cancel)
+        except (NotImplementedError, AttributeError):
+            pass  # Windows: Ctrl+C still cancels asyncio.run()
+
+        sink = BatchSink(self.sink, self.sink_many)
+        tasks = [asyncio.create_task(run_transport(t, sink)) for t in self.transports]
+        if self.feed_port is not None:
+            self._feed_server = await asyncio.start_server(
+                self._serve_feed_client, self.feed_host, self.feed_port)
+            print(f"[Collector] Live feed on {self.feed_host}:{self.feed_port}")
+        print(f"[Collector] Running {len(tasks)} source(s): {', '.join(t.name for t in self.transports)}")
+        try:
+            while True:
+                await asyncio.sleep(self.drain_interval)
+                self.drain()
+                self.session_log.tick()
+                if self.history is not None:
+                    self.history.tick()
+                if time.monotonic() - self._last_export >= self.export_interval:
+                    self.export()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self._feed_server is not None:
+                self._feed_server.close()
+                for writer in list(self._feed_clients):
+                    writer.close()
+            self.drain()
+            self.session_log.flush(sync=True)
+            self.export()
+            self.session_log.close()
+            if self.history is not None:
+                self.history.close()
+            self.streams.close()
+            print("[Collector] Stopped")
@@ -1,52 +1,493 @@
 # src/core/data_logger.py
 import os
 import csv
+import json
+import time
+import queue
+import struct
 import datetime
+from threading import Thread
 
-def write_summary_csv(filepath, session_data):
+import numpy as np
+
+from core.rolling_stats import SessionSummary
+from core.session_store import parse_gmt, format_gmt, NS_PER_SEC
+
+
+def _write_rows(writer, session_data, summary):
+    # Accumulate the summary while writing unless the caller already tracks it
+    if summary is not None:
+        for rel_ts, gmt_ts, lux in session_data:
+            writer.writerow([rel_ts, gmt_ts, lux])
+        return summary
+    summary = SessionSummary()
+    for rel_ts, gmt_ts, lux in session_data:
+        writer.writerow([rel_ts, gmt_ts, lux])
+        summary.add(lux)
+    return summary
+
+
+def _summary_row(summary):
+    if not summary.count:
+        return ["--", "--", "--"]
+    return [f"{summary.min:.2f}", f"{summary.max:.2f}", f"{summary.mean:.2f}"]
+
+
+def write_summary_csv(filepath, session_data, summary=None):
     try:
         with open(filepath, mode='w', newline='') as outfile:
             writer = csv.writer(outfile)
             writer.writerow(["Relative Timestamp (ms)", "GMT Timestamp", "Lux"])
-            for rel_ts, gmt_ts, lux in session_data:
-                writer.writerow([rel_ts, gmt_ts, lux])
+            summary = _write_rows(writer, session_data, summary)
 
             writer.writerow([])
             writer.writerow(["Summary"])
             writer.writerow(["Min", "Max", "Avg"])
-
-            lux_values = [entry[2] for entry in session_data]
-            if lux_values:  # handle empty list
-                writer.writerow([
-                    f"{min(lux_values):.2f}",
-                    f"{max(lux_values):.2f}",
-                    f"{sum(lux_values)/len(lux_values):.2f}"
-                ])
-            else:
-                writer.writerow(["--", "--", "--"])
+            writer.writerow(_summary_row(summary))
         return True
     except Exception as e:
         print(f"[Write CSV Failed]: {e}")
         return False
 
 
-def write_temp_log(temp_path, session_data):
+class StreamingCSVWriter:
+    """Writes a session in the export CSV layout while it is being recorded.
+
+    Rows handed to `append_many` are written by a background thread to
+    `path`, with min/max/avg kept as they go, so exporting only has to add
+    the summary block and rename the file (`finalize`). Any write error
+    marks the writer failed; callers then fall back to write_summary_csv.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self.summary = SessionSummary()
+        self.failed = False
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._file = open(path, mode='w', newline='')
+        except OSError as e:
+            self._fail(e)
+            return
+        self._thread = Thread(target=self._run, name="CSVSpool", daemon=True)
+        self._thread.start()
+
+    def _fail(self, error):
+        self.failed = True
+        print(f"[Streaming CSV Failed]: {error}")
+
+    def append_many(self, rel_ms, epoch_ns, lux):
+        self.count += len(lux)
+        if not self.failed:
+            self._queue.put((rel_ms, epoch_ns, lux))
+
+    def _run(self):
+        last_sec = None
+        gmt_ts = None
+        item = ()
+        try:
+            with self._file as outfile:
+                writer = csv.writer(outfile)
+                writer.writerow(["Relative Timestamp (ms)", "GMT Timestamp", "Lux"])
+                while True:
+                    item = self._queue.get()
+                    if item is None:
+                        break
+                    rel_ms, epoch_ns, lux = item
+                    rows = []
+                    for rel_ts, ns, value in zip(rel_ms, epoch_ns, lux):
+                        sec = ns // NS_PER_SEC
+                        if sec != last_sec:
+                            last_sec = sec
+                            gmt_ts = format_gmt(ns)
+                        rows.append((rel_ts, gmt_ts, value))
+                    writer.writerows(rows)
+                    self.summary.add_many(lux)
+                writer.writerow([])
+                writer.writerow(["Summary"])
+                writer.writerow(["Min", "Max", "Avg"])
+                writer.writerow(_summary_row(self.summary))
+        except Exception as e:
+            self._fail(e)
+            while item is not None:
+                item = self._queue.get()  # keep draining until finalize() or discard() stops us
+
+    def _stop(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def finalize(self, filepath):
+        """Write the summary and move the file to `filepath`. Returns True on success."""
+        self._stop()
+        if self.failed:
+            return False
+        try:
+            os.replace(self.path, filepath)
+            return True
+        except OSError as e:
+            self._fail(e)
+            return False
+
+    def discard(self):
+        """Stop writing and delete the partial file."""
+        self._stop()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def write_temp_log(temp_path, session_data, summary=None):
     try:
         with open(temp_path, mode='a', newline='') as temp_file:
             writer = csv.writer(temp_file)
             writer.writerow([f"--- SESSION START: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ---"])
             writer.writerow(["Relative Timestamp (ms)", "GMT Timestamp", "Lux"])
-            for rel_ts, gmt_ts, lux in session_data:
-                writer.writerow([rel_ts, gmt_ts, lux])
+            summary = _write_rows(writer, session_data, summary)
             writer.writerow([])
             writer.writerow(["Summary"])
-            lux_values = [entry[2] for entry in session_data]
             writer.writerow(["Min", "Max", "Avg"])
-            writer.writerow([
-                f"{min(lux_values):.2f}",
-                f"{max(lux_values):.2f}",
-                f"{sum(lux_values)/len(lux_values):.2f}"
-            ])
+            writer.writerow(_summary_row(summary))
             writer.writerow([f"--- SESSION END ---", "", ""])
     except Exception as e:
         print(f"[Temp Log Export Failed]: {e}")
+
+
+class SessionWAL:
+    """Append-only write-ahead log of session samples.
+
+    Each sample is one `rel_ts,epoch_ns,lux[,device]` line. Lines are buffered and
+    written every `flush_interval` seconds and fsynced every `fsync_interval`
+    seconds, so a crash loses at most about one second of readings. The file
+    rotates to `<path>.1`, `<path>.2`, ... once it exceeds `max_bytes`.
+    """
+
+    def __init__(self, path, flush_interval=0.25, fsync_interval=1.0,
+                 max_bytes=16 * 1024 * 1024, backup_count=10):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._file = None
+        self._pending = []
+        self._unsynced = False
+        self._last_flush = time.monotonic()
+        self._last_sync = self._last_flush
+
+    def append(self, rel_ts, epoch_ns, lux, device=None):
+        if device is None:
+            self._pending.append(f"{rel_ts},{epoch_ns},{lux!r}\n")
+        else:
+            self._pending.append(f"{rel_ts},{epoch_ns},{lux!r},{device.replace(',', '_')}\n")
+
+    def tick(self):
+        """Flush and fsync when their intervals have elapsed; call periodically."""
+        now = time.monotonic()
+        sync_due = now - self._last_sync >= self.fsync_interval
+        if self._pending and now - self._last_flush >= self.flush_interval:
+            self.flush(sync=sync_due)
+        elif self._unsynced and sync_due:
+            self.flush(sync=True)
+
+    def flush(self, sync=False):
+        try:
+            if self._pending:
+                if self._file is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    self._file = open(self.path, mode='a', newline='')
+                self._file.write("".join(self._pending))
+                self._pending.clear()
+                self._file.flush()
+                self._unsynced = True
+            self._last_flush = time.monotonic()
+            if sync and self._unsynced:
+                os.fsync(self._file.fileno())
+                self._unsynced = False
+                self._last_sync = self._last_flush
+            if self._file is not None and self._file.tell() >= self.max_bytes:
+                self._rotate()
+        except Exception as e:
+            print(f"[Session Log Write Failed]: {e}")
+
+    def _rotate(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = False
+        self._file.close()
+        self._file = None
+        for index in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{index}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def close(self):
+        self.flush(sync=True)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """Close the log and delete it with all rotated segments. Returns True if anything was deleted."""
+        self._pending.clear()
+        self.close()
+        segments = session_log_segments(self.path)
+        for segment in segments:
+            os.remove(segment)
+        return bool(segments)
+
+
+def session_log_segments(path):
+    """Existing segments of a session log, oldest first."""
+    rotated = []
+    index = 1
+    while os.path.exists(f"{path}.{index}"):
+        rotated.append(f"{path}.{index}")
+        index += 1
+    segments = rotated[::-1]
+    if os.path.exists(path):
+        segments.append(path)
+    return segments
+
+
+def replay_device_log(path):
+    """Yield `(device, rel_ts, epoch_ns, lux)` for every sample in the log, oldest first.
+
+    `device` is None for rows written without one. Rows from the legacy temp
+    log blocks (`rel_ts, gmt_ts, lux`) are accepted too. Anything else,
+    including a torn last line, is skipped.
+    """
+    for segment in session_log_segments(path):
+        with open(segment, newline='') as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    continue
+                parts = line.rstrip("\r\n").split(",")
+                # rel_ts goes negative for device-stamped readings from before the timer start
+                if len(parts) not in (3, 4) or not parts[0].lstrip("-").isdigit():
+                    continue
+                try:
+                    epoch_ns = int(parts[1]) if parts[1].isdigit() else parse_gmt(parts[1])
+                    yield (parts[3] if len(parts) == 4 else None), int(parts[0]), epoch_ns, float(parts[2])
+                except ValueError:
+                    continue
+
+
+def replay_session_log(path):
+    """Yield `(rel_ts, epoch_ns, lux)` for every sample in the log, oldest first."""
+    for _, rel_ts, epoch_ns, lux in replay_device_log(path):
+        yield rel_ts, epoch_ns, lux
+
+
+# === Binary session format ===
+# Header: magic, version, header size, origin (epoch ns of relative time 0),
+# then UTF-8 JSON metadata padded with spaces to an 8-byte boundary.
+# Body: packed little-endian (int64 epoch_ns, float32 lux) records, 12 bytes each.
+BINARY_MAGIC = b"LUXB"
+BINARY_VERSION = 1
+BINARY_RECORD = np.dtype([("epoch_ns", "<i8"), ("lux", "<f4")])
+_BINARY_HEADER = struct.Struct("<4sHxxIq")
+
+
+class BinarySessionWriter:
+    """Streams samples into a binary session file; see BinarySessionReader."""
+
+    def __init__(self, filepath, origin_ns, metadata=None):
+        meta = json.dumps(metadata or {}).encode("utf-8")
+        header_size = _BINARY_HEADER.size + len(meta)
+        header_size += -header_size % 8
+        meta = meta.ljust(header_size - _BINARY_HEADER.size, b" ")
+        self.filepath = filepath
+        self.count = 0
+        self._pending = []
+        self._file = open(filepath, mode='wb')
+        self._file.write(_BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, header_size, origin_ns))
+        self._file.write(meta)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, epoch_ns, lux):
+        self._pending.append((epoch_ns, lux))
+        if len(self._pending) >= 4096:
+            self.flush()
+
+    def append_many(self, epoch_ns, lux):
+        self.flush()
+        records = np.empty(len(epoch_ns), dtype=BINARY_RECORD)
+        records["epoch_ns"] = epoch_ns
+        records["lux"] = lux
+        records.tofile(self._file)
+        self.count += len(records)
+
+    def flush(self):
+        if self._pending:
+            records = np.array(self._pending, dtype=BINARY_RECORD)
+            self._pending.clear()
+            records.tofile(self._file)
+            self.count += len(records)
+        self._file.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+class BinarySessionReader:
+    """Zero-copy reader for binary session files.
+
+    Records are memory-mapped, so opening a multi-GB file costs nothing until
+    a slice is touched. `epoch_ns` must be non-decreasing for `time_slice`.
+    """
+
+    def __init__(self, filepath):
+        with open(filepath, mode='rb') as f:
+            magic, version, header_size, origin_ns = _BINARY_HEADER.unpack(f.read(_BINARY_HEADER.size))
+            if magic != BINARY_MAGIC or version != BINARY_VERSION:
+                raise ValueError(f"Not a binary session file: {filepath}")
+            meta = f.read(header_size - _BINARY_HEADER.size)
+        self.filepath = filepath
+        self.origin_ns = origin_ns
+        self.metadata = json.loads(meta.decode("utf-8") or "{}")
+        count = (os.path.getsize(filepath) - header_size) // BINARY_RECORD.itemsize
+        if count:
+            self.records = np.memmap(filepath, dtype=BINARY_RECORD, mode='r',
+                                     offset=header_size, shape=(count,))
+        else:
+            self.records = np.empty(0, dtype=BINARY_RECORD)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def epoch_ns(self):
+        return self.records["epoch_ns"]
+
+    @property
+    def lux(self):
+        return self.records["lux"]
+
+    def time_slice(self, start_ns=None, end_ns=None):
+        """Records with start_ns <= epoch_ns < end_ns, as a view into the file."""
+        epoch_ns = self.epoch_ns
+        lo = 0 if start_ns is None else np.searchsorted(epoch_ns, start_ns, side="left")
+        hi = len(epoch_ns) if end_ns is None else np.searchsorted(epoch_ns, end_ns, side="left")
+        return self.records[lo:hi]
+
+    def rows(self, records=None, chunk_size=65536):
+        """Yield `(rel_ts, gmt_ts, lux)` rows in the CSV export layout.
+
+        Lux is stored as float32, so it is rounded back to the two decimals
+        the sensor publishes.
+        """
+        records = self.records if records is None else records
+        last_sec = None
+        gmt_ts = None
+        for start in range(0, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
+            epoch_ns = chunk["epoch_ns"]
+            rel_ms = ((epoch_ns - self.origin_ns) // 1_000_000).tolist()
+            lux = np.round(chunk["lux"].astype(np.float64), 2).tolist()
+            for rel_ts, ns, value in zip(rel_ms, epoch_ns.tolist(), lux):
+                sec = ns // NS_PER_SEC
+                if sec != last_sec:
+                    last_sec = sec
+                    gmt_ts = format_gmt(ns)
+                yield rel_ts, gmt_ts, value
+
+
+def write_binary_session(filepath, session_data, metadata=None):
+    try:
+        rel_ms, epoch_ns, lux = session_data.columns()
+        origin_ns = int(epoch_ns[0] - rel_ms[0] * 1_000_000) if len(epoch_ns) else 0
+        with BinarySessionWriter(filepath, origin_ns, metadata) as writer:
+            writer.append_many(epoch_ns, lux)
+        return True
+    except Exception as e:
+        print(f"[Write Binary Failed]: {e}")
+        return False
+
+
+def binary_to_csv(bin_path, csv_path, start_ns=None, end_ns=None):
+    """Convert a binary session (optionally a time range of it) to the CSV export layout."""
+    reader = BinarySessionReader(bin_path)
+    records = reader.time_slice(start_ns, end_ns)
+    summary = SessionSummary()
+    summary.add_many(np.round(records["lux"].astype(np.float64), 2))
+    return write_summary_csv(csv_path, reader.rows(records), summary)
+
+
+# === Parquet session format (optional, needs pyarrow) ===
+# Columns: timestamp (timestamp[ns, UTC]), lux (float32), device (dictionary string).
+# Schema metadata carries the device and the first/last epoch ns, so uploads
+# can be partitioned without reading any rows. Row groups keep min/max
+# statistics, which lets readers skip groups outside a time filter.
+PARQUET_ROW_GROUP_SIZE = 128 * 1024
+PARQUET_COMPRESSION = "zstd"
+
+
+def parquet_available():
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def write_parquet_session(filepath, session_data, device, compression=PARQUET_COMPRESSION,
+                          row_group_size=PARQUET_ROW_GROUP_SIZE):
+    try:
+        # pyarrow is optional and slow to import; only load it when exporting Parquet
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        _, epoch_ns, lux = session_data.columns()
+        table = pa.table({
+            "timestamp": pa.array(epoch_ns, pa.timestamp("ns", tz="UTC")),
+            "lux": pa.array(lux.astype(np.float32)),
+            "device": pa.DictionaryArray.from_arrays(np.zeros(len(lux), np.int32), [device]),
+        })
+        metadata = {"device": device}
+        if len(epoch_ns):
+            metadata.update(start_ns=str(int(epoch_ns[0])), end_ns=str(int(epoch_ns[-1])))
+        table = table.replace_schema_metadata(metadata)
+        # Regular timestamps delta-encode to a few bits each; split float bytes compress far better
+        pq.write_table(table, filepath, compression=compression, row_group_size=row_group_size,
+                       write_statistics=True, use_dictionary=["device"],
+                       column_encoding={"timestamp": "DELTA_BINARY_PACKED", "lux": "BYTE_STREAM_SPLIT"})
+        return True
+    except Exception as e:
+        print(f"[Write Parquet Failed]: {e}")
+        return False
+
+
+def parquet_session_info(filepath):
+    """Schema metadata of a Parquet session (device, start_ns, end_ns) without reading rows."""
+    import pyarrow.parquet as pq
+    metadata = pq.read_schema(filepath).metadata or {}
+    return {key.decode(): value.decode() for key, value in metadata.items()}
+
+
+def read_parquet_session(filepath, start_ns=None, end_ns=None, columns=None):
+    """Rows with start_ns <= timestamp < end_ns as a pyarrow Table.
+
+    The time filter is pushed down, so row groups outside the range are
+    skipped using their statistics; `columns` limits what is decoded.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    ts_type = pa.timestamp("ns", tz="UTC")
+    condition = None
+    if start_ns is not None:
+        condition = ds.field("timestamp") >= pa.scalar(start_ns, ts_type)
+    if end_ns is not None:
+        before_end = ds.field("timestamp") < pa.scalar(end_ns, ts_type)
+        condition = before_end if condition is None else condition & before_end
+    return pq.read_table(filepath, columns=columns, filters=condition)
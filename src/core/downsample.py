@@ -0,0 +1,120 @@
+# src/core/downsample.py
+import numpy as np
+
+
+def min_max_downsample(x, y, n_buckets):
+    """Reduce (x, y) to at most 2 * n_buckets points.
+
+    Each bucket keeps its min and max at the bucket's first x, so spikes and
+    dropouts stay visible however far the data is reduced.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    n_buckets = max(int(n_buckets), 1)
+    if len(y) <= 2 * n_buckets:
+        return x, y
+    starts = np.unique(np.linspace(0, len(y), n_buckets, endpoint=False).astype(np.int64))
+    mins = np.minimum.reduceat(y, starts)
+    maxs = np.maximum.reduceat(y, starts)
+    return np.repeat(x[starts], 2), np.column_stack((mins, maxs)).ravel()
+
+
+class _Level:
+    """Growable (first epoch_ns, min, max) arrays for one block size."""
+
+    def __init__(self, block):
+        self.block = block
+        self.count = 0
+        self.t = np.empty(64, np.int64)
+        self.mn = np.empty(64, np.float64)
+        self.mx = np.empty(64, np.float64)
+
+    def extend(self, t, mn, mx):
+        needed = self.count + len(t)
+        if needed > len(self.t):
+            capacity = max(needed, 2 * len(self.t))
+            for name in ("t", "mn", "mx"):
+                grown = np.empty(capacity, getattr(self, name).dtype)
+                grown[:self.count] = getattr(self, name)[:self.count]
+                setattr(self, name, grown)
+        self.t[self.count:needed] = t
+        self.mn[self.count:needed] = mn
+        self.mx[self.count:needed] = mx
+        self.count = needed
+
+    def arrays(self, start, stop):
+        return self.t[start:stop], self.mn[start:stop], self.mx[start:stop]
+
+
+class MinMaxPyramid:
+    """Incremental min/max envelope of a SessionStore at several block sizes.
+
+    Level k summarizes blocks of `factor ** (k + 1)` samples. `update()` only
+    folds in rows added since the last call, and `query()` answers any time
+    range from the level closest to `max_points`, so drawing a long session costs O(screen width), not O(samples).
+    """
+
+    def __init__(self, store, factor=16, levels=5):
+        self.store = store
+        self.factor = factor
+        self._n_levels = levels
+        self.reset()
+
+    def reset(self):
+        self._levels = [_Level(self.factor ** (k + 1)) for k in range(self._n_levels)]
+        self._generation = getattr(self.store, "generation", None)
+
+    def update(self):
+        base = self._levels[0]
+        length = len(self.store)
+        if (getattr(self.store, "generation", None) != self._generation
+                or length < base.count * base.block):
+            self.reset()  # the store was cleared or replaced underneath us
+            base = self._levels[0]
+
+        f = self.factor
+        start, stop = base.count * f, (length // f) * f
+        if stop > start:
+            _, epoch, lux = self.store.slice_columns(start, stop)
+            blocks = lux.reshape(-1, f)
+            base.extend(epoch[::f], blocks.min(axis=1), blocks.max(axis=1))
+
+        for lower, upper in zip(self._levels, self._levels[1:]):
+            start, stop = upper.count * f, (lower.count // f) * f
+            if stop > start:
+                t, mn, mx = lower.arrays(start, stop)
+                upper.extend(t[::f], mn.reshape(-1, f).min(axis=1), mx.reshape(-1, f).max(axis=1))
+
+    def query(self, start_ns=None, end_ns=None, max_points=2000):
+        """Return (epoch_ns, lux) for the time range with at most about `max_points` points."""
+        self.update()
+        length = len(self.store)
+        i0 = 0 if start_ns is None else max(self.store.search_epoch(start_ns) - 1, 0)
+        i1 = length if end_ns is None else min(self.store.search_epoch(end_ns) + 1, length)
+        count = i1 - i0
+        if count <= max_points:
+            _, epoch, lux = self.store.slice_columns(i0, i1)
+            return epoch, lux.astype(np.float64)
+
+        pairs = max(max_points // 2, 1)
+        # Finest level within `factor` of the budget; the final pass trims it to size
+        level = next((lvl for lvl in self._levels if count / lvl.block <= pairs * self.factor),
+                     self._levels[-1])
+        b0 = i0 // level.block
+        b1 = min(-(-i1 // level.block), level.count)
+        t, mn, mx = level.arrays(b0, b1)
+        xs = [np.repeat(t, 2)]
+        ys = [np.column_stack((mn, mx)).ravel()]
+
+        # Rows not yet folded into this level are reduced on the fly at the same density
+        tail = max(b1 * level.block, i0)
+        if tail < i1:
+            _, epoch, lux = self.store.slice_columns(tail, i1)
+            epoch, lux = min_max_downsample(epoch, lux, -(-(i1 - tail) // level.block))
+            xs.append(epoch)
+            ys.append(lux)
+
+        x, y = np.concatenate(xs), np.concatenate(ys)
+        if len(x) > max_points:
+            x, y = min_max_downsample(x, y, pairs)
+        return x, y
@@ -0,0 +1,328 @@
+# src/core/history.py
+import os
+import time
+import zlib
+import sqlite3
+
+import numpy as np
+
+from core.downsample import min_max_downsample
+from core.session_store import NS_PER_SEC
+
+# Rollup bucket sizes in seconds; wide windows are answered from these instead of raw samples.
+# The 10 s level only stands in for raw data, so it is kept as long as the raw chunks.
+ROLLUP_LEVELS = (10, 60, 3600)
+# Raw samples are decoded while there are at most this many per requested point pair
+# (about 10 ms for the History view), whatever the sample rate
+RAW_FACTOR = 200
+# Otherwise the finest rollup with at most this many buckets per point pair is used
+ROLLUP_FACTOR = 16
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS chunks (
+        id INTEGER PRIMARY KEY,
+        device TEXT NOT NULL,
+        start_ns INTEGER NOT NULL,
+        end_ns INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        epoch BLOB NOT NULL,
+        lux BLOB NOT NULL
+    )""",
+    # Covers range lookups and sample counts (chunks ending after the window start)
+    # without touching the table
+    "CREATE INDEX IF NOT EXISTS chunks_device_time ON chunks (device, end_ns, start_ns, count)",
+] + [
+    f"""CREATE TABLE IF NOT EXISTS rollup_{level} (
+        device TEXT NOT NULL,
+        bucket_ns INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        lux_min REAL NOT NULL,
+        lux_max REAL NOT NULL,
+        lux_sum REAL NOT NULL,
+        PRIMARY KEY (device, bucket_ns)
+    ) WITHOUT ROWID""" for level in ROLLUP_LEVELS
+]
+
+
+def encode_chunk(epoch_ns, lux):
+    """Delta-encoded int64 epochs and byte-split float32 lux, each zlib-compressed."""
+    deltas = np.diff(np.asarray(epoch_ns, dtype=np.int64), prepend=np.int64(0)).astype("<i8")
+    planes = np.asarray(lux, dtype="<f4").view(np.uint8).reshape(-1, 4).T
+    return zlib.compress(deltas.tobytes(), 1), zlib.compress(planes.tobytes(), 1)
+
+
+def decode_chunk(epoch_blob, lux_blob):
+    epoch_ns = np.cumsum(np.frombuffer(zlib.decompress(epoch_blob), dtype="<i8"))
+    planes = np.frombuffer(zlib.decompress(lux_blob), dtype=np.uint8).reshape(4, -1)
+    return epoch_ns, np.ascontiguousarray(planes.T).view("<f4").ravel()
+
+
+class HistoryStore:
+    """Embedded SQLite time-series store for browsing past readings.
+
+    Readings are buffered per device and written every `flush_interval`
+    seconds as compressed chunks, together with 10 s, per-minute and per-hour
+    min/max/sum rollups, in one WAL transaction. `query` answers any time
+    window with about `max_points` points from raw chunks or a rollup.
+    Raw chunks and 10 s rollups older than `retention_days` and the
+    other rollups older than `rollup_retention_days` are deleted; past
+    `max_bytes` the oldest raw chunks go first, then the oldest rollups.
+    `compact` merges small chunks and hands freed pages back to the filesystem.
+    """
+
+    def __init__(self, path, flush_interval=10.0, chunk_size=4096, retention_days=30,
+                 rollup_retention_days=365, max_bytes=512 * 1024 * 1024, maintenance_interval=3600.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.chunk_size = chunk_size
+        self.retention_days = retention_days
+        self.rollup_retention_days = rollup_retention_days
+        self.max_bytes = max_bytes
+        self.maintenance_interval = maintenance_interval
+        self._pending = {}
+        self._last_flush = time.monotonic()
+        self._last_maintenance = self._last_flush
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path)
+        # auto_vacuum only takes effect on a new database, so it has to come before the tables
+        self._db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            for statement in _SCHEMA:
+                self._db.execute(statement)
+
+    # === Writing ===
+
+    def append_many(self, batch):
+        """Buffer `(timestamp_s, device, lux)` readings, as drained from an IngestQueue."""
+        for now, device, lux in batch:
+            epochs, values = self._pending.setdefault(device, ([], []))
+            epochs.append(int(now * NS_PER_SEC))
+            values.append(lux)
+
+    def tick(self):
+        """Flush and run retention when their intervals have elapsed; call periodically.
+
+        Returns True if new readings were written.
+        """
+        now = time.monotonic()
+        flushed = bool(self._pending) and now - self._last_flush >= self.flush_interval
+        if flushed:
+            self.flush()
+        if now - self._last_maintenance >= self.maintenance_interval:
+            self.enforce_retention()
+        return flushed
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        try:
+            with self._db:
+                for device, (epochs, values) in pending.items():
+                    epoch_ns = np.asarray(epochs, dtype=np.int64)
+                    lux = np.asarray(values, dtype=np.float64)
+                    order = np.argsort(epoch_ns, kind="stable")
+                    epoch_ns, lux = epoch_ns[order], lux[order]
+                    for start in range(0, len(lux), self.chunk_size):
+                        self._insert_chunk(device, epoch_ns[start:start + self.chunk_size],
+                                           lux[start:start + self.chunk_size])
+                    self._merge_rollups(device, epoch_ns, lux)
+        except sqlite3.Error as e:
+            print(f"[History] Write failed: {e}")
+
+    def _insert_chunk(self, device, epoch_ns, lux):
+        epoch_blob, lux_blob = encode_chunk(epoch_ns, lux)
+        self._db.execute(
+            "INSERT INTO chunks (device, start_ns, end_ns, count, epoch, lux) VALUES (?, ?, ?, ?, ?, ?)",
+            (device, int(epoch_ns[0]), int(epoch_ns[-1]), len(lux), epoch_blob, lux_blob))
+
+    def _merge_rollups(self, device, epoch_ns, lux):
+        for level in ROLLUP_LEVELS:
+            span = level * NS_PER_SEC
+            buckets, starts = np.unique(epoch_ns // span, return_index=True)
+            rows = zip(
+                [device] * len(buckets), (buckets * span).tolist(), np.diff(starts, append=len(lux)).tolist(),
+                np.minimum.reduceat(lux, starts).tolist(), np.maximum.reduceat(lux, starts).tolist(),
+                np.add.reduceat(lux, starts).tolist())
+            # Same merge the RDS rollups use: counts and sums add, min/max combine
+            self._db.executemany(f"""
+                INSERT INTO rollup_{level} AS t (device, bucket_ns, count, lux_min, lux_max, lux_sum)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (device, bucket_ns) DO UPDATE SET
+                    count = t.count + excluded.count,
+                    lux_min = MIN(t.lux_min, excluded.lux_min),
+                    lux_max = MAX(t.lux_max, excluded.lux_max),
+                    lux_sum = t.lux_sum + excluded.lux_sum
+            """, rows)
+
+    # === Reading ===
+
+    def devices(self):
+        return [row[0] for row in self._db.execute("SELECT DISTINCT device FROM chunks ORDER BY device")]
+
+    def time_bounds(self, device):
+        """(first, last) epoch ns stored for a device, or None."""
+        first, last = self._db.execute(
+            "SELECT MIN(start_ns), MAX(end_ns) FROM chunks WHERE device = ?", (device,)).fetchone()
+        return None if first is None else (first, last)
+
+    def range(self, device, start_ns=None, end_ns=None):
+        """Every stored (epoch_ns, lux) of a device with start_ns <= epoch_ns < end_ns."""
+        start_ns = -2 ** 63 if start_ns is None else start_ns
+        end_ns = 2 ** 63 - 1 if end_ns is None else end_ns
+        rows = self._db.execute(
+            "SELECT epoch, lux FROM chunks WHERE device = ? AND end_ns >= ? AND start_ns < ? ORDER BY start_ns",
+            (device, start_ns, end_ns)).fetchall()
+        if not rows:
+            return np.empty(0, np.int64), np.empty(0, np.float64)
+        parts = [decode_chunk(epoch_blob, lux_blob) for epoch_blob, lux_blob in rows]
+        epoch_ns = np.concatenate([epoch for epoch, _ in parts])
+        lux = np.concatenate([values for _, values in parts])
+        if len(epoch_ns) > 1 and (np.diff(epoch_ns) < 0).any():
+            order = np.argsort(epoch_ns, kind="stable")  # chunks from different flushes can interleave
+            epoch_ns, lux = epoch_ns[order], lux[order]
+        keep = (epoch_ns >= start_ns) & (epoch_ns < end_ns)
+        # float32 on disk; round back to the 0.01 lx the sensor publishes
+        return epoch_ns[keep], np.round(lux[keep].astype(np.float64), 2)
+
+    def sample_count(self, device, start_ns, end_ns):
+        """Readings in the chunks overlapping the window; an upper bound read from the index."""
+        count, = self._db.execute(
+            "SELECT COALESCE(SUM(count), 0) FROM chunks WHERE device = ? AND end_ns >= ? AND start_ns < ?",
+            (device, start_ns, end_ns)).fetchone()
+        return count
+
+    def _raw_covers(self, device, start_ns):
+        """False once the window's raw chunks were dropped (retention, size cap) but its rollups remain."""
+        first = self._db.execute(
+            "SELECT start_ns FROM chunks WHERE device = ? ORDER BY end_ns LIMIT 1", (device,)).fetchone()
+        if first is None:
+            return False
+        if start_ns >= first[0]:
+            return True
+        span = ROLLUP_LEVELS[1] * NS_PER_SEC
+        return self._db.execute(
+            f"SELECT 1 FROM rollup_{ROLLUP_LEVELS[1]} "
+            "WHERE device = ? AND bucket_ns >= ? AND bucket_ns < ? LIMIT 1",
+            (device, start_ns - start_ns % span, first[0] - span)).fetchone() is None
+
+    def _rollup(self, level, device, start_ns, end_ns):
+        rows = self._db.execute(
+            f"SELECT bucket_ns, lux_min, lux_max FROM rollup_{level} "
+            "WHERE device = ? AND bucket_ns >= ? AND bucket_ns < ? ORDER BY bucket_ns",
+            (device, start_ns - start_ns % (level * NS_PER_SEC), end_ns)).fetchall()
+        if not rows:
+            return np.empty(0, np.int64), np.empty(0, np.float64)
+        table = np.array(rows, dtype=np.float64)
+        buckets = np.array([row[0] for row in rows], dtype=np.int64)
+        return np.repeat(buckets, 2), table[:, 1:].ravel()
+
+    def query(self, device, start_ns, end_ns, max_points=2000):
+        """(epoch_ns, lux) for the window with at most about `max_points` points.
+
+        Raw samples are used while the chunks in the window hold at most
+        RAW_FACTOR readings per point pair; otherwise the finest rollup with
+        at most ROLLUP_FACTOR buckets per pair that has rows in the window.
+        Either way the result is min/max reduced to size, so spikes stay visible.
+        """
+        pairs = max(max_points // 2, 1)
+        span_s = (end_ns - start_ns) / NS_PER_SEC
+        covered = self._raw_covers(device, start_ns)
+        if covered and self.sample_count(device, start_ns, end_ns) <= pairs * RAW_FACTOR:
+            epoch_ns, lux = self.range(device, start_ns, end_ns)
+        else:
+            # The finest level is dropped with the raw chunks; past them only coarser ones remain
+            levels = ROLLUP_LEVELS if covered else ROLLUP_LEVELS[1:]
+            first = next((i for i, lvl in enumerate(levels) if span_s / lvl <= pairs * ROLLUP_FACTOR),
+                         len(levels) - 1)
+            for level in levels[first:]:
+                epoch_ns, lux = self._rollup(level, device, start_ns, end_ns)
+                if len(lux):
+                    break
+        if len(lux) > max_points:
+            epoch_ns, lux = min_max_downsample(epoch_ns, lux, pairs)
+        return epoch_ns, lux
+
+    # === Retention and compaction ===
+
+    def size_bytes(self):
+        page_size, = self._db.execute("PRAGMA page_size").fetchone()
+        pages, = self._db.execute("PRAGMA page_count").fetchone()
+        free, = self._db.execute("PRAGMA freelist_count").fetchone()
+        return (pages - free) * page_size
+
+    def enforce_retention(self, now_ns=None):
+        """Drop data past its retention age, then the oldest raw chunks while over `max_bytes`."""
+        self._last_maintenance = time.monotonic()
+        now_ns = time.time_ns() if now_ns is None else now_ns
+        raw_cutoff = now_ns - self.retention_days * 86400 * NS_PER_SEC
+        rollup_cutoff = now_ns - self.rollup_retention_days * 86400 * NS_PER_SEC
+        try:
+            with self._db:
+                for device in self.devices():
+                    self._db.execute("DELETE FROM chunks WHERE device = ? AND end_ns < ?", (device, raw_cutoff))
+                for level in ROLLUP_LEVELS:
+                    cutoff = raw_cutoff if level == ROLLUP_LEVELS[0] else rollup_cutoff
+                    self._db.execute(f"DELETE FROM rollup_{level} WHERE bucket_ns < ?", (cutoff,))
+            # Over the size cap: oldest raw chunks go first, then the oldest rollups, finest first
+            victims = [self._drop_oldest_chunks] + [
+                lambda level=level: self._db.execute(
+                    f"DELETE FROM rollup_{level} WHERE (device, bucket_ns) IN "
+                    f"(SELECT device, bucket_ns FROM rollup_{level} ORDER BY bucket_ns LIMIT 256)").rowcount
+                for level in ROLLUP_LEVELS]
+            for drop in victims:
+                while self.size_bytes() > self.max_bytes:
+                    with self._db:
+                        if not drop():
+                            break
+            self.compact()
+        except sqlite3.Error as e:
+            print(f"[History] Retention failed: {e}")
+
+    def _drop_oldest_chunks(self, limit=16):
+        """Delete the oldest raw chunks with the finest rollups covering them."""
+        rows = self._db.execute(
+            "SELECT id, device, end_ns FROM chunks ORDER BY end_ns LIMIT ?", (limit,)).fetchall()
+        self._db.executemany("DELETE FROM chunks WHERE id = ?", [(row[0],) for row in rows])
+        last_end = {}
+        for _, device, end_ns in rows:
+            last_end[device] = max(end_ns, last_end.get(device, end_ns))
+        for device, end_ns in last_end.items():
+            # Whole buckets only; the rest of the last one may sit in the next chunk
+            self._db.execute(f"DELETE FROM rollup_{ROLLUP_LEVELS[0]} WHERE device = ? AND bucket_ns <= ?",
+                             (device, end_ns - ROLLUP_LEVELS[0] * NS_PER_SEC))
+        return len(rows)
+
+    def compact(self, min_age_s=3600):
+        """Merge runs of small chunks older than `min_age_s` and release free pages."""
+        cutoff = time.time_ns() - min_age_s * NS_PER_SEC
+        small = self.chunk_size // 4
+        with self._db:
+            for device in self.devices():
+                rows = self._db.execute(
+                    "SELECT id, count, epoch, lux FROM chunks WHERE device = ? AND end_ns < ? ORDER BY start_ns",
+                    (device, cutoff)).fetchall()
+                run = []
+                for row in rows + [None]:
+                    if row is not None and row[1] < small and sum(r[1] for r in run) + row[1] <= self.chunk_size:
+                        run.append(row)
+                        continue
+                    if len(run) > 1:
+                        self._merge_chunks(device, run)
+                    run = [row] if row is not None and row[1] < small else []
+        self._db.execute("PRAGMA incremental_vacuum").fetchall()
+
+    def _merge_chunks(self, device, run):
+        parts = [decode_chunk(epoch_blob, lux_blob) for _, _, epoch_blob, lux_blob in run]
+        epoch_ns = np.concatenate([epoch for epoch, _ in parts])
+        lux = np.concatenate([values for _, values in parts])
+        order = np.argsort(epoch_ns, kind="stable")
+        self._db.executemany("DELETE FROM chunks WHERE id = ?", [(row[0],) for row in run])
+        self._insert_chunk(device, epoch_ns[order], lux[order])
+
+    def close(self):
+        self.flush()
+        self._db.close()
@@ -0,0 +1,527 @@
+# src/core/ingest.py
+import os
+import time
+import uuid
+import socket
+import asyncio
+from collections import deque
+from threading import Thread, get_ident
+
+import serial
+
+from core.session_store import NS_PER_SEC
+from core.serial_codec import SerialDecoder
+from core.clock_sync import ClockSync
+from core.mqtt_codec import (  # noqa: F401 (parsers are re-exported for callers of core.ingest)
+    decode_mqtt_batch, decode_mqtt_payload, parse_mqtt_reading, parse_mqtt_message
+)
+
+try:
+    import serial_asyncio
+except ImportError:  # optional: fall back to blocking reads in the loop's executor
+    serial_asyncio = None
+
+# pyserial-asyncio has no selector support on Windows: it polls the port every 0.5 ms and
+# wakes the shared loop even when idle. The blocking reader sleeps in read() instead.
+ASYNC_SERIAL = os.name != "nt"
+
+
+def parse_serial_line(line):
+    """Return the lux of a `millis,lux` line, or None if the line is not a reading."""
+    parts = line.split(",")
+    if len(parts) != 2:
+        return None
+    try:
+        return float(parts[1])
+    except ValueError:
+        return None
+
+
+def mqtt_client_id(role, state_dir=None):
+    """A client id that is unique per install but stable across restarts.
+
+    A persistent MQTT session is only picked up again under the same id, so
+    a random suffix is generated once and kept in `state_dir`.
+    """
+    host = socket.gethostname().split(".")[0] or "host"
+    suffix = None
+    path = os.path.join(state_dir, f"mqtt_client_id_{role}") if state_dir else None
+    if path:
+        try:
+            with open(path) as f:
+                suffix = f.read().strip() or None
+        except OSError:
+            pass
+    if suffix is None:
+        suffix = uuid.uuid4().hex[:8]
+        if path:
+            try:
+                with open(path, "w") as f:
+                    f.write(suffix)
+            except OSError as e:
+                print(f"[MQTT] Could not save client id: {e}")
+    return f"{role}-{host}-{suffix}"
+
+
+def deliver(sink, readings):
+    """Hand `(device, lux, timestamp)` readings to a sink, in one call if it takes batches."""
+    many = getattr(sink, "many", None)
+    if many is not None:
+        many(readings)
+    else:
+        for reading in readings:
+            sink(*reading)
+
+
+class BatchSink:
+    """A reading sink that also accepts whole batches through `many(readings)`."""
+
+    def __init__(self, one, many):
+        self.one = one
+        self.many = many
+
+    def __call__(self, device, lux, timestamp=None):
+        self.one(device, lux, timestamp)
+
+
+def format_feed_lines(batch):
+    """Encode `(timestamp, device, lux)` readings as collector feed lines."""
+    return "".join(f"{device},{int(now * NS_PER_SEC)},{lux!r}\n" for now, device, lux in batch).encode()
+
+
+def parse_feed_line(raw):
+    """Return `(device, lux, timestamp)` from a `device,epoch_ns,lux` feed line, or None."""
+    parts = raw.decode(errors="replace").strip().rsplit(",", 2)
+    if len(parts) != 3:
+        return None
+    try:
+        return parts[0], float(parts[2]), int(parts[1]) / NS_PER_SEC
+    except ValueError:
+        return None
+
+
+async def run_transport(transport, sink):
+    """Run one transport until it finishes or is cancelled, logging unexpected errors."""
+    try:
+        await transport.run(sink)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"[Ingest] {transport.name} stopped: {e}")
+
+
+class SerialTransport:
+    """Reads `millis,lux` lines or binary frames from a serial port.
+
+    Everything the port has buffered is read at once and decoded in one
+    pass by SerialDecoder. Readings are named after the port and stamped
+    with the device's millis() mapped to host time by a ClockSync, so a
+    burst read at once keeps its original spacing.
+    """
+
+    READ_SIZE = 65536
+
+    def __init__(self, port, baudrate=115200, name=None):
+        self.port = port
+        self.baudrate = baudrate
+        self.name = name or port
+        self.decoder = SerialDecoder()
+        self.clock = ClockSync()
+
+    async def run(self, sink):
+        try:
+            if serial_asyncio is not None and ASYNC_SERIAL:
+                await self._run_async(sink)
+            else:
+                await self._run_blocking(sink)
+        except (OSError, serial.SerialException) as e:
+            print(f"[Serial] Error: {e}")
+
+    def _handle(self, data, read_at, sink):
+        millis, lux = self.decoder.feed(data)
+        if not len(lux):
+            return
+        self.clock.observe(int(millis[-1]), read_at)
+        name = self.name
+        deliver(sink, [(name, value, timestamp)
+                       for timestamp, value in zip(self.clock.to_host(millis).tolist(), lux.tolist())])
+
+    async def _run_async(self, sink):
+        reader, writer = await serial_asyncio.open_serial_connection(url=self.port, baudrate=self.baudrate)
+        try:
+            while True:
+                data = await reader.read(self.READ_SIZE)
+                if not data:
+                    return
+                self._handle(data, time.time(), sink)
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _read_available(ser):
+        # Blocks for the first byte only, then takes whatever else is already buffered.
+        # Stamped here, not after the hop back to the loop thread.
+        data = ser.read(max(1, ser.in_waiting))
+        return data, time.time()
+
+    async def _run_blocking(self, sink):
+        # Without pyserial-asyncio, one executor thread blocks in read (never spins)
+        loop = asyncio.get_running_loop()
+        with serial.Serial(self.port, self.baudrate, timeout=1) as ser:
+            read = None
+            try:
+                while True:
+                    read = loop.run_in_executor(None, self._read_available, ser)
+                    # Shielded: a cancellation must not leave the read running on a closed port
+                    data, read_at = await asyncio.shield(read)
+                    if data:
+                        self._handle(data, read_at, sink)
+            finally:
+                if read is not None and not read.done():
+                    ser.cancel_read()
+                    await asyncio.wait([read])
+
+
+class MqttTransport:
+    """Subscribes to lux JSON messages with paho driven by the asyncio loop.
+
+    paho's socket callbacks register the MQTT socket with the loop's
+    selector, so no paho network thread is started. One connection serves
+    every device: `topics` may include wildcards such as `sensor/+/lux`, and
+    each reading is passed to the sink under its device id.
+
+    Subscriptions use `qos` (1 by default). With a fixed `client_id` the
+    session is persistent, so the broker keeps QoS 1 messages while we are
+    away; without one a random id and a clean session are used. `on_message`
+    only queues the raw payload; a separate task decodes them in batches. If
+    more than `max_queue` payloads are waiting, the socket stops being read
+    until the queue is half drained, which pushes back on the broker instead
+    of dropping readings. Messages carrying the firmware's millis() are
+    timestamped through a per-device ClockSync. The client reconnects with
+    backoff until cancelled.
+    """
+
+    def __init__(self, broker, topics, port=1883, keepalive=60, client_id=None, qos=1,
+                 name=None, max_backoff=30.0, max_queue=10000, batch_size=500, report_interval=60.0):
+        self.broker = broker
+        self.topics = [topics] if isinstance(topics, str) else list(topics)
+        self.port = port
+        self.keepalive = keepalive
+        self.persistent = client_id is not None
+        self.client_id = client_id or f"lux-{uuid.uuid4().hex[:12]}"
+        self.qos = qos
+        self.name = name or f"mqtt:{broker}"
+        self.max_backoff = max_backoff
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.report_interval = report_interval
+        self.client = None
+        self._sink = None
+        self._loop = None
+        self._loop_thread = None
+        self._sock = None
+        self._misc_task = None
+        self._disconnected = None
+        self._clocks = {}
+        # Hard cap in case paho still delivers buffered packets while reading is paused
+        self._raw = deque(maxlen=2 * max_queue)
+        self._wakeup = None
+        self._paused = False
+        self.received = 0
+        self.decoded = 0
+        self.dropped = 0
+        self.rate_hz = 0.0
+        self.lag_avg_ms = 0.0
+        self.lag_max_ms = 0.0
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._window_lag = 0.0
+        self._window_lag_max = 0.0
+        self._last_report = time.monotonic()
+
+    def _make_client(self):
+        import paho.mqtt.client as mqtt  # deferred: only needed once an MQTT stream starts
+        api_version = getattr(mqtt, "CallbackAPIVersion", None)
+        if api_version is not None:
+            client = mqtt.Client(api_version.VERSION2, client_id=self.client_id,
+                                 clean_session=not self.persistent)
+        else:
+            client = mqtt.Client(client_id=self.client_id, clean_session=not self.persistent)
+        client.on_connect = self._on_connect
+        client.on_message = self._on_message
+        client.on_disconnect = self._on_disconnect
+        client.on_socket_open = self._on_socket_open
+        client.on_socket_close = self._on_socket_close
+        client.on_socket_register_write = self._on_socket_register_write
+        client.on_socket_unregister_write = self._on_socket_unregister_write
+        return client
+
+    # paho callbacks; all run on the event loop thread, except the socket ones fired from
+    # inside connect(), which runs in an executor thread and hands them over to the loop
+    def _off_loop(self, callback, *args):
+        if get_ident() == self._loop_thread:
+            return False
+        self._loop.call_soon_threadsafe(callback, *args)
+        return True
+
+    def _on_connect(self, client, userdata, flags, *args):
+        if getattr(flags, "session_present", False):
+            print("[MQTT] Resumed session; the broker will replay missed messages")
+        client.subscribe([(topic, self.qos) for topic in self.topics])
+
+    def _on_message(self, client, userdata, msg):
+        # Runs inside the socket read: queue the payload and get out
+        if len(self._raw) == self._raw.maxlen:
+            self.dropped += 1
+        self._raw.append((msg.topic, msg.payload, time.time()))
+        self.received += 1
+        if len(self._raw) >= self.max_queue and not self._paused:
+            self._pause_reading()
+        self._wakeup.set()
+
+    def _on_disconnect(self, client, userdata, *args):
+        if self._disconnected is not None:
+            self._disconnected.set()
+
+    def _on_socket_open(self, client, userdata, sock):
+        if self._off_loop(self._on_socket_open, client, userdata, sock):
+            return
+        self._sock = sock
+        self._paused = False
+        self._loop.add_reader(sock, client.loop_read)
+        self._misc_task = self._loop.create_task(self._misc_loop(client))
+
+    def _on_socket_close(self, client, userdata, sock):
+        if self._off_loop(self._on_socket_close, client, userdata, sock):
+            return
+        self._loop.remove_reader(sock)
+        self._sock = None
+        if self._misc_task is not None:
+            self._misc_task.cancel()
+        if self._disconnected is not None:
+            self._disconnected.set()
+
+    def _on_socket_register_write(self, client, userdata, sock):
+        if self._off_loop(self._on_socket_register_write, client, userdata, sock):
+            return
+        self._loop.add_writer(sock, client.loop_write)
+
+    def _on_socket_unregister_write(self, client, userdata, sock):
+        if self._off_loop(self._on_socket_unregister_write, client, userdata, sock):
+            return
+        self._loop.remove_writer(sock)
+
+    def _pause_reading(self):
+        self._paused = True
+        if self._sock is not None:
+            self._loop.remove_reader(self._sock)
+        print(f"[MQTT] {len(self._raw)} messages waiting; pausing reads")
+
+    def _resume_reading(self):
+        self._paused = False
+        if self._sock is not None:
+            self._loop.add_reader(self._sock, self.client.loop_read)
+
+    async def _misc_loop(self, client):
+        from paho.mqtt.client import MQTT_ERR_SUCCESS
+        # Keepalive pings and retries, which paho's own thread would otherwise do
+        while client.loop_misc() == MQTT_ERR_SUCCESS:
+            await asyncio.sleep(1)
+
+    async def _decode_loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._raw:
+                batch = [self._raw.popleft() for _ in range(min(len(self._raw), self.batch_size))]
+                self._decode(batch)
+                if self._paused and len(self._raw) <= self.max_queue // 2:
+                    self._resume_reading()
+                await asyncio.sleep(0)  # let the socket be read between batches
+
+    def _decode(self, batch):
+        now = time.time()
+        decoded = decode_mqtt_batch([(topic, payload) for topic, payload, _ in batch])
+        out = []
+        for readings, (_, _, arrived) in zip(decoded, batch):
+            if not readings:
+                continue
+            device, _, device_ms = readings[-1]
+            if device_ms is None:
+                out.extend((device, lux, arrived) for device, lux, _ in readings)
+                continue
+            clock = self._clocks.get(device)
+            if clock is None:
+                clock = self._clocks[device] = ClockSync()
+            # A batched message arrives with its newest reading; the rest keep the device's spacing
+            clock.observe(device_ms, arrived)
+            stamps = clock.to_host([ms for _, _, ms in readings]).tolist()
+            out.extend((device, lux, stamp) for (device, lux, _), stamp in zip(readings, stamps))
+        deliver(self._sink, out)
+        self._record(len(batch), now - batch[0][2])
+
+    def _record(self, count, oldest_lag):
+        self.decoded += count
+        self._window_count += count
+        self._window_lag += oldest_lag * count
+        self._window_lag_max = max(self._window_lag_max, oldest_lag)
+        elapsed = time.monotonic() - self._window_start
+        if elapsed < 1.0:
+            return
+        self.rate_hz = self._window_count / elapsed
+        self.lag_avg_ms = 1000 * self._window_lag / self._window_count
+        self.lag_max_ms = 1000 * self._window_lag_max
+        self._window_start += elapsed
+        self._window_count = 0
+        self._window_lag = self._window_lag_max = 0.0
+        if time.monotonic() - self._last_report >= self.report_interval:
+            self._last_report = time.monotonic()
+            print(f"[MQTT] {self.rate_hz:.1f} msg/s, lag avg {self.lag_avg_ms:.1f} ms "
+                  f"max {self.lag_max_ms:.1f} ms, dropped {self.dropped}")
+
+    def metrics(self):
+        """Receive rate and queueing lag over the last second, plus running totals."""
+        return {
+            "received": self.received,
+            "decoded": self.decoded,
+            "dropped": self.dropped,
+            "queued": len(self._raw),
+            "paused": self._paused,
+            "rate_hz": self.rate_hz,
+            "lag_avg_ms": self.lag_avg_ms,
+            "lag_max_ms": self.lag_max_ms,
+        }
+
+    async def run(self, sink):
+        self._sink = sink
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = get_ident()
+        self._disconnected = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self.client = self._make_client()
+        decoder = self._loop.create_task(self._decode_loop())
+        delay = 1.0
+        try:
+            while True:
+                self._disconnected.clear()
+                try:
+                    # DNS and the TCP handshake block; keep them off the shared loop
+                    await self._loop.run_in_executor(None, self.client.connect,
+                                                     self.broker, self.port, self.keepalive)
+                    delay = 1.0
+                    await self._disconnected.wait()
+                    print("[MQTT] Disconnected, reconnecting")
+                except OSError as e:
+                    print(f"[MQTT] Connection Error: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+        finally:
+            decoder.cancel()
+            try:
+                self.client.disconnect()
+            except Exception as e:
+                print(f"[MQTT] Cleanup Error: {e}")
+            if self._misc_task is not None:
+                self._misc_task.cancel()
+
+
+class CollectorTransport:
+    """Attaches to a headless collector's live feed as a viewer; keeps the collector's timestamps."""
+
+    def __init__(self, host, port, name=None, max_backoff=30.0):
+        self.host = host
+        self.port = port
+        self.name = name or f"collector:{host}:{port}"
+        self.max_backoff = max_backoff
+
+    async def run(self, sink):
+        delay = 1.0
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+                delay = 1.0
+                try:
+                    while True:
+                        raw = await reader.readline()
+                        if not raw:
+                            break
+                        reading = parse_feed_line(raw)
+                        if reading is not None:
+                            sink(*reading)
+                finally:
+                    writer.close()
+                print("[Collector] Feed closed, reconnecting")
+            except OSError as e:
+                print(f"[Collector] Connection Error: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
+
+
+class IngestCore:
+    """Runs any number of transports on one asyncio loop in a background thread.
+
+    Transports are objects with a `name` and an `async run(sink)` coroutine;
+    they call `sink(device, lux, timestamp=None)` for every reading, where
+    `timestamp` is the reading's host epoch time if the transport knows
+    better than the time of the call, or pass a whole list of such tuples
+    through `deliver` (one call for a BatchSink). The sink is invoked
+    on the loop thread, so GUI consumers should hand readings over through a
+    thread-safe queue (the dashboard uses IngestQueue). Stopping a transport
+    cancels its task, which closes its port or connection in `finally`.
+    """
+
+    def __init__(self, sink):
+        self.sink = sink
+        self._loop = None
+        self._thread = None
+        self._tasks = {}
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        # A selector loop on every platform: the MQTT transport needs add_reader()
+        self._loop = asyncio.SelectorEventLoop()
+        self._thread = Thread(target=self._loop.run_forever, name="IngestLoop", daemon=True)
+        self._thread.start()
+
+    def add(self, transport):
+        """Start reading from `transport`. Returns a concurrent.futures.Future for its task."""
+        self.start()
+        self.remove(transport.name)
+        future = asyncio.run_coroutine_threadsafe(run_transport(transport, self.sink), self._loop)
+        self._tasks[transport.name] = future
+        return future
+
+    def remove(self, name):
+        future = self._tasks.pop(name, None)
+        if future is not None:
+            future.cancel()
+
+    def sources(self):
+        return [name for name, future in self._tasks.items() if not future.done()]
+
+    def stop_all(self):
+        for name in list(self._tasks):
+            self.remove(name)
+
+    async def _cancel_all(self):
+        # Cancel and wait, so every transport closes its port or socket before the loop stops
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self, timeout=2.0):
+        self._tasks.clear()
+        if self._loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._cancel_all(), self._loop).result(timeout)
+        except Exception as e:
+            print(f"[Ingest] Shutdown Error: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self._loop.close()
+        self._loop = None
+        self._thread = None
@@ -0,0 +1,59 @@
+# src/core/ingest_queue.py
+from collections import deque
+from threading import Lock
+
+
+class IngestQueue:
+    """Bounded ring of readings handed from sensor threads to the GUI thread.
+
+    Producers call `put`/`put_many` from any thread; the consumer takes
+    everything queued so far with `drain`. When the ring is full the oldest
+    reading is dropped so the display stays current. The lock only guards
+    a few pointer operations, so producers are never blocked for long.
+    """
+
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self._items = deque()
+        self._lock = Lock()
+        self.received = 0
+        self.dropped = 0
+        self.high_water = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item):
+        with self._lock:
+            if len(self._items) >= self.capacity:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self.received += 1
+            if len(self._items) > self.high_water:
+                self.high_water = len(self._items)
+
+    def put_many(self, items):
+        with self._lock:
+            self._items.extend(items)
+            self.received += len(items)
+            overflow = len(self._items) - self.capacity
+            for _ in range(max(overflow, 0)):
+                self._items.popleft()
+            self.dropped += max(overflow, 0)
+            if len(self._items) > self.high_water:
+                self.high_water = len(self._items)
+
+    def drain(self):
+        """Return every queued reading in arrival order and empty the queue."""
+        with self._lock:
+            items, self._items = self._items, deque()
+        return items
+
+    def counters(self):
+        return {
+            "received": self.received,
+            "dropped": self.dropped,
+            "high_water": self.high_water,
+            "pending": len(self._items),
+        }
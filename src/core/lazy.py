@@ -0,0 +1,35 @@
+# src/core/lazy.py
+from threading import Lock
+
+
+class LazyClient:
+    """Stands in for an SDK client that is only built on first use.
+
+    Attribute access is forwarded to the object returned by `factory()`,
+    which runs once, on whichever thread needs the client first. Importing a
+    module that exposes one of these therefore costs nothing until the
+    first upload. Attributes set on the proxy itself (e.g. by mock.patch)
+    shadow the client's.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._client = None
+        self._lock = Lock()
+
+    @property
+    def loaded(self):
+        return self._client is not None
+
+    def get(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    def __getattr__(self, name):
+        # Only reached for names the proxy does not have itself
+        if name in ("_factory", "_client", "_lock"):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
@@ -0,0 +1,105 @@
+# src/core/mqtt_codec.py
+import json
+import struct
+
+import numpy as np
+
+from core.streams import DEFAULT_DEVICE, device_from_topic
+
+# Payloads on sensor/lux and sensor/<device>/lux may be any of:
+#   {"lux": 12.5}                                   one reading (legacy firmware)
+#   {"device": "...", "timestamp": 1000, "lux": 12.5}
+#   {"device": "...", "timestamp": 1000, "dt": [0, 10, ...], "lux": [12.5, 12.7, ...]}
+#       a JSON batch; "interval": 10 may replace "dt" for evenly spaced readings
+#   b"LX" v1 binary batch: BATCH_HEADER then `count` BATCH_DTYPE rows, little-endian,
+#       device taken from the topic
+BATCH_MAGIC = b"LX"
+BATCH_VERSION = 1
+BATCH_HEADER = struct.Struct("<2sBBI")  # magic, version, count, base millis
+BATCH_DTYPE = np.dtype([("dt", "<u2"), ("lux", "<f4")])  # ms after base, lux
+
+
+def encode_batch(base_ms, offsets_ms, lux):
+    """Binary batch payload, as the firmware builds it with MQTT_BATCH_BINARY."""
+    rows = np.empty(len(lux), BATCH_DTYPE)
+    rows["dt"] = offsets_ms
+    rows["lux"] = lux
+    return BATCH_HEADER.pack(BATCH_MAGIC, BATCH_VERSION, len(rows), base_ms) + rows.tobytes()
+
+
+def readings_from_json(topic, data):
+    """`(device, lux, device_ms)` readings of one decoded JSON payload; raises on malformed ones."""
+    lux = data.get("lux")
+    if lux is None:
+        return []
+    device = device_from_topic(topic, str(data.get("device") or DEFAULT_DEVICE))
+    base_ms = data.get("timestamp")
+    if not isinstance(lux, list):
+        return [(device, float(lux), None if base_ms is None else int(base_ms))]
+    if base_ms is None:
+        return [(device, float(value), None) for value in lux]
+    offsets = data.get("dt")
+    if offsets is None:
+        interval = int(data.get("interval", 0))
+        offsets = range(0, interval * len(lux), interval) if interval else [0] * len(lux)
+    if len(offsets) != len(lux):
+        raise ValueError("dt and lux lengths differ")
+    base_ms = int(base_ms)
+    return [(device, float(value), base_ms + int(dt)) for value, dt in zip(lux, offsets)]
+
+
+def _readings_from_binary(topic, payload):
+    magic, version, count, base_ms = BATCH_HEADER.unpack_from(payload)
+    if version != BATCH_VERSION or len(payload) != BATCH_HEADER.size + count * BATCH_DTYPE.itemsize:
+        raise ValueError(f"bad lux batch (version {version}, {len(payload)} bytes)")
+    rows = np.frombuffer(payload, BATCH_DTYPE, count, BATCH_HEADER.size)
+    device = device_from_topic(topic)
+    # float32 on the wire; round to the 0.01 lx the text formats carry
+    lux = np.round(rows["lux"].astype(np.float64), 2).tolist()
+    millis = (rows["dt"].astype(np.int64) + base_ms).tolist()
+    return [(device, value, ms) for value, ms in zip(lux, millis)]
+
+
+def decode_mqtt_payload(topic, payload):
+    """All `(device, lux, device_ms)` readings in one message; [] if it has none or is malformed.
+
+    The device comes from a `sensor/<device>/lux` topic, else from the
+    payload's "device" field, else DEFAULT_DEVICE. `device_ms` is the
+    firmware's millis() for the reading, or None if the message has none.
+    """
+    try:
+        if isinstance(payload, (bytes, bytearray)) and payload[:2] == BATCH_MAGIC:
+            return _readings_from_binary(topic, payload)
+        data = json.loads(payload.decode() if isinstance(payload, (bytes, bytearray)) else payload)
+        return readings_from_json(topic, data)
+    except (ValueError, AttributeError, TypeError, struct.error) as e:
+        print(f"[MQTT] Error: {e}")
+        return []
+
+
+def parse_mqtt_reading(topic, payload):
+    """Return the first `(device, lux, device_ms)` reading of a message, or None."""
+    readings = decode_mqtt_payload(topic, payload)
+    return readings[0] if readings else None
+
+
+def parse_mqtt_message(topic, payload):
+    """Return `(device, lux)` for a `{"lux": ...}` JSON message, or None."""
+    reading = parse_mqtt_reading(topic, payload)
+    return None if reading is None else reading[:2]
+
+
+def decode_mqtt_batch(messages):
+    """Decode `(topic, payload)` pairs into one list of readings per message.
+
+    When every payload is JSON the whole batch costs a single json.loads;
+    binary batches or any bad payload go down the per-message path.
+    """
+    if all(payload[:1] == b"{" for _, payload in messages):
+        try:
+            decoded = json.loads(b"[" + b",".join(payload for _, payload in messages) + b"]")
+            if len(decoded) == len(messages) and all(isinstance(d, dict) for d in decoded):
+                return [readings_from_json(topic, data) for (topic, _), data in zip(messages, decoded)]
+        except (ValueError, TypeError):
+            pass
+    return [decode_mqtt_payload(topic, payload) for topic, payload in messages]
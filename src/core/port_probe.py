@@ -0,0 +1,133 @@
+# src/core/port_probe.py
+import os
+import json
+import time
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+
+import serial
+
+from core.serial_codec import SerialDecoder
+
+# The firmware prints a reading every 10 ms; half a second also covers a board reset on open
+PROBE_TIMEOUT_SEC = 0.5
+PROBE_READ_SIZE = 256
+
+
+def port_identity(port):
+    """Stable hardware key of a USB serial port, or None for ports without one.
+
+    VID:PID plus the serial number; adapters without a serial number (CH340)
+    fall back to their USB location, so two identical boards stay distinct.
+    """
+    if getattr(port, "vid", None) is None:
+        return None
+    suffix = getattr(port, "serial_number", None) or getattr(port, "location", None)
+    if not suffix:
+        return None
+    return f"{port.vid:04x}:{port.pid:04x}:{suffix}"
+
+
+def probe_port(device, baudrate=115200, timeout=PROBE_TIMEOUT_SEC):
+    """True if a reading arrives on `device` within `timeout` seconds.
+
+    Either format counts: `millis,lux` text lines or CRC-checked binary frames.
+    """
+    deadline = time.monotonic() + timeout
+    decoder = SerialDecoder()
+    try:
+        with serial.Serial(device, baudrate, timeout=min(timeout, 0.1)) as ser:
+            while time.monotonic() < deadline:
+                _, lux = decoder.feed(ser.read(PROBE_READ_SIZE))
+                if len(lux):
+                    return True
+    except (OSError, serial.SerialException, ValueError):
+        pass
+    return False
+
+
+class PortProber:
+    """Looks for the sensor on the attached serial ports without blocking the caller.
+
+    `scan(ports)` returns immediately. If one of the ports has the hardware
+    identity the sensor was last found on, it is reported straight from the
+    cache; otherwise every port is probed concurrently and `on_result(device,
+    detected)` is called from a worker thread as each probe finishes. Found
+    sensors are remembered in a JSON file at `cache_path`.
+    """
+
+    def __init__(self, cache_path=None, on_result=None, probe=probe_port, max_workers=8):
+        self.cache_path = cache_path
+        self.on_result = on_result
+        self.probe = probe
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="PortProbe")
+        self._known = self._load_cache()
+
+    def _load_cache(self):
+        if not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        # Called with self._lock held
+        if not self.cache_path:
+            return
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self._known, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"[Ports] Could not save port cache: {e}")
+
+    def cached_sensor(self, ports):
+        """The port whose identity the sensor was last seen on, if it is attached."""
+        with self._lock:
+            return next((port for port in ports if port_identity(port) in self._known), None)
+
+    def remember(self, port):
+        identity = port_identity(port)
+        if identity is None:
+            return
+        with self._lock:
+            self._known[identity] = port.device
+            self._save_cache()
+
+    def forget(self, port):
+        with self._lock:
+            if self._known.pop(port_identity(port), None) is not None:
+                self._save_cache()
+
+    def scan(self, ports, force=False, busy=()):
+        """Start looking for the sensor; returns the probe futures (empty on a cache hit).
+
+        Ports named in `busy` are never opened, so a running stream keeps its readings.
+        """
+        ports = list(ports)
+        cached = None if force else self.cached_sensor(ports)
+        if cached is not None:
+            self._report(cached.device, True)
+            return []
+        return [self._executor.submit(self._probe, port) for port in ports if port.device not in busy]
+
+    def _probe(self, port):
+        detected = self.probe(port.device)
+        if detected:
+            self.remember(port)
+        self._report(port.device, detected)
+        return detected
+
+    def _report(self, device, detected):
+        if self.on_result:
+            try:
+                self.on_result(device, detected)
+            except Exception as e:
+                print(f"[Ports] Result callback error: {e}")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,63 @@
+# src/core/ring_buffer.py
+import numpy as np
+
+NS_PER_MS = 1_000_000
+
+
+class SampleRingBuffer:
+    """Fixed-capacity ring of (epoch_ns, lux) samples for the live plot.
+
+    Each sample is written twice, at `i` and `i + capacity`, so the newest
+    `len(self)` samples are always one contiguous slice. `window()` then
+    returns them in time order as views, without copying or reordering.
+    Relative and date views are derived from epoch_ns only when needed.
+    """
+
+    def __init__(self, capacity=500):
+        self.capacity = capacity
+        self._epoch = np.zeros(2 * capacity, np.int64)
+        self._lux = np.zeros(2 * capacity, np.float64)
+        self.clear()
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, epoch_ns, lux):
+        i = self._head
+        self._epoch[i] = self._epoch[i + self.capacity] = epoch_ns
+        self._lux[i] = self._lux[i + self.capacity] = lux
+        self._head = (i + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def extend(self, epoch_ns, lux):
+        epoch_ns = np.asarray(epoch_ns, np.int64)[-self.capacity:]
+        lux = np.asarray(lux, np.float64)[-self.capacity:]
+        n = len(epoch_ns)
+        head, cap = self._head, self.capacity
+        first = min(n, cap - head)  # the rest wraps around to the start
+        for target, values in ((self._epoch, epoch_ns), (self._lux, lux)):
+            target[head:head + first] = target[head + cap:head + cap + first] = values[:first]
+            target[:n - first] = target[cap:cap + n - first] = values[first:]
+        self._head = (self._head + n) % self.capacity
+        self._count = min(self._count + n, self.capacity)
+
+    def window(self):
+        """(epoch_ns, lux) views of the buffered samples, oldest first. Copy to keep them."""
+        start = self._head - self._count + self.capacity
+        stop = self._head + self.capacity
+        return self._epoch[start:stop], self._lux[start:stop]
+
+    def relative_ms(self, origin_ns):
+        epoch_ns, _ = self.window()
+        return (epoch_ns - origin_ns) / NS_PER_MS
+
+    @property
+    def latest(self):
+        if not self._count:
+            return None
+        i = (self._head - 1) % self.capacity
+        return int(self._epoch[i]), float(self._lux[i])
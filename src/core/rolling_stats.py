@@ -0,0 +1,129 @@
+# src/core/rolling_stats.py
+import math
+from collections import deque
+
+import numpy as np
+
+
+class SessionSummary:
+    """Running count, min, max, mean and variance over every sample of a session."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value):
+        # Welford's update keeps the variance stable over millions of samples
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def add_many(self, values):
+        """Merge a whole array of samples at once (Chan et al. parallel update)."""
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return
+        count = len(values)
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        total = self.count + count
+        delta = mean - self.mean
+        self._m2 += m2 + delta * delta * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+        low, high = float(values.min()), float(values.max())
+        if self.min is None or low < self.min:
+            self.min = low
+        if self.max is None or high > self.max:
+            self.max = high
+
+    @property
+    def variance(self):
+        return self._m2 / self.count if self.count else 0.0
+
+
+class RollingStats:
+    """O(1) amortized min/max/mean/variance over the last `window` samples.
+
+    Min and max come from monotonic deques of (index, value); mean and variance
+    from running sums, which are re-summed once per window to cancel float drift.
+    Session-wide totals are kept alongside in `session`.
+    """
+
+    def __init__(self, window=500):
+        self.window = window
+        self.session = SessionSummary()
+        self.clear()
+
+    def clear(self):
+        self._values = deque()
+        self._min_q = deque()
+        self._max_q = deque()
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._index = 0
+        self.session.clear()
+
+    def __len__(self):
+        return len(self._values)
+
+    def push(self, value):
+        index = self._index
+        self._index += 1
+
+        self._values.append(value)
+        self._sum += value
+        self._sum_sq += value * value
+        if len(self._values) > self.window:
+            old = self._values.popleft()
+            self._sum -= old
+            self._sum_sq -= old * old
+
+        while self._min_q and self._min_q[-1][1] >= value:
+            self._min_q.pop()
+        self._min_q.append((index, value))
+        while self._max_q and self._max_q[-1][1] <= value:
+            self._max_q.pop()
+        self._max_q.append((index, value))
+
+        expired = index - self.window
+        if self._min_q[0][0] <= expired:
+            self._min_q.popleft()
+        if self._max_q[0][0] <= expired:
+            self._max_q.popleft()
+
+        if index % self.window == self.window - 1:
+            self._sum = math.fsum(self._values)
+            self._sum_sq = math.fsum(v * v for v in self._values)
+
+        self.session.add(value)
+
+    @property
+    def min(self):
+        return self._min_q[0][1] if self._min_q else None
+
+    @property
+    def max(self):
+        return self._max_q[0][1] if self._max_q else None
+
+    @property
+    def mean(self):
+        return self._sum / len(self._values) if self._values else None
+
+    @property
+    def variance(self):
+        if not self._values:
+            return None
+        mean = self._sum / len(self._values)
+        return max(self._sum_sq / len(self._values) - mean * mean, 0.0)
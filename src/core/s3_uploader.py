@@ -1,22 +1,199 @@
 # src/core/s3_uploader.py
 import os
+import re
+import gzip
+import json
+import random
+import shutil
 import datetime
-import boto3
+import functools
+from threading import Lock, Event
+from concurrent.futures import ThreadPoolExecutor
+
 from config import AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_S3_BUCKET
+from core.lazy import LazyClient
+from core.session_store import NS_PER_SEC
+
+
+def _make_s3_client():
+    # boto3 takes a few hundred ms to import; only pay for it when something is uploaded
+    import boto3
+    return boto3.client(
+        's3',
+        aws_access_key_id=AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=AWS_SECRET_ACCESS_KEY
+    )
+
+s3_client = LazyClient(_make_s3_client)
+
+@functools.lru_cache(maxsize=None)
+def transfer_config():
+    from boto3.s3.transfer import TransferConfig
+    # Exports are a few MB; split anything larger into 8 MB parts sent 4 at a time
+    return TransferConfig(
+        multipart_threshold=8 * 1024 * 1024,
+        multipart_chunksize=8 * 1024 * 1024,
+        max_concurrency=4,
+        use_threads=True,
+    )
+
+# Parquet exports live apart from the CSV date folders the Lambda ETL scans
+PARQUET_PREFIX = "parquet"
+
+def parquet_key_for(filepath, prefix=PARQUET_PREFIX):
+    """Hive-style key `parquet/date=YYYY-MM-DD/device=<id>/<file>` from the file's own metadata.
 
-s3_client = boto3.client(
-    's3',
-    aws_access_key_id=AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY
-)
+    The date is the UTC day of the session's first reading, so query engines
+    can prune by date and device from the key alone.
+    """
+    from core.data_logger import parquet_session_info
+    info = parquet_session_info(filepath)
+    device = re.sub(r"[^\w.-]", "_", info.get("device") or "sensor")
+    if "start_ns" in info:
+        day = datetime.datetime.fromtimestamp(int(info["start_ns"]) // NS_PER_SEC, datetime.timezone.utc)
+    else:
+        day = datetime.datetime.now(datetime.timezone.utc)
+    return f"{prefix}/date={day:%Y-%m-%d}/device={device}/{os.path.basename(filepath)}"
+
+def s3_key_for(filepath, when=None):
+    if filepath.endswith(".parquet"):
+        return parquet_key_for(filepath)
+    when = when or datetime.datetime.now()
+    return f"{when.year}/{when.month:02d}/{when.day:02d}/{os.path.basename(filepath)}"
 
 def upload_to_s3(filepath):
-    filename = os.path.basename(filepath)
-    today = datetime.datetime.now()
-    s3_key = f"{today.year}/{today.month:02d}/{today.day:02d}/{filename}"
+    s3_key = s3_key_for(filepath)
 
     try:
         s3_client.upload_file(filepath, AWS_S3_BUCKET, s3_key)
         print(f"[S3] Uploaded to: s3://{AWS_S3_BUCKET}/{s3_key}")
     except Exception as e:
         print(f"[S3] Upload failed: {e}")
+
+
+def gzip_file(filepath):
+    gz_path = filepath + ".gz"
+    with open(filepath, 'rb') as src, gzip.open(gz_path, 'wb', compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    return gz_path
+
+
+class S3UploadManager:
+    """Uploads exported files to S3 in the background.
+
+    Pending uploads are kept in a JSON queue file, so anything not yet
+    uploaded when the app exits is retried by `resume()` on the next start.
+    Files are gzipped (key gets a `.gz` suffix; Parquet is already compressed
+    and goes up as is) and sent through a bounded worker pool with
+    transfer_config(). Failures are retried with jittered exponential backoff.
+    `on_progress(path, sent_bytes, total_bytes)` and `on_done(path, ok)` are
+    called from worker threads.
+    """
+
+    def __init__(self, queue_path, bucket=AWS_S3_BUCKET, client=None, max_workers=2,
+                 max_attempts=5, base_delay=1.0, compress=True, on_progress=None, on_done=None):
+        self.queue_path = queue_path
+        self.bucket = bucket
+        self.client = client or s3_client
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.compress = compress
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="S3Upload")
+        self._queue = self._load_queue()
+
+    def _load_queue(self):
+        try:
+            with open(self.queue_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _save_queue(self):
+        # Called with self._lock held; write-then-rename so a crash never leaves half a file
+        tmp_path = self.queue_path + ".tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self._queue, f)
+            os.replace(tmp_path, self.queue_path)
+        except OSError as e:
+            print(f"[S3] Could not save upload queue: {e}")
+
+    def pending(self):
+        with self._lock:
+            return [entry["path"] for entry in self._queue]
+
+    def enqueue(self, filepath):
+        entry = {"path": filepath, "key": s3_key_for(filepath)}
+        with self._lock:
+            self._queue.append(entry)
+            self._save_queue()
+        return self._executor.submit(self._upload, entry)
+
+    def resume(self):
+        """Resubmit uploads left in the queue file by a previous run."""
+        with self._lock:
+            entries = list(self._queue)
+        return [self._executor.submit(self._upload, entry) for entry in entries]
+
+    def shutdown(self, wait=False):
+        self._stop_event.set()
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _finish(self, entry):
+        with self._lock:
+            if entry in self._queue:
+                self._queue.remove(entry)
+            self._save_queue()
+
+    def _upload(self, entry):
+        filepath = entry["path"]
+        if not os.path.exists(filepath):
+            print(f"[S3] Dropping missing file from queue: {filepath}")
+            self._finish(entry)
+            self._notify_done(filepath, False)
+            return False
+
+        for attempt in range(1, self.max_attempts + 1):
+            upload_path = None
+            compress = self.compress and not filepath.endswith(".parquet")
+            try:
+                upload_path = gzip_file(filepath) if compress else filepath
+                key = entry["key"] + (".gz" if compress else "")
+                total = os.path.getsize(upload_path)
+                sent = [0]
+
+                def progress(amount):
+                    sent[0] += amount
+                    if self.on_progress:
+                        self.on_progress(filepath, sent[0], total)
+
+                self.client.upload_file(upload_path, self.bucket, key, Config=transfer_config(), Callback=progress)
+                print(f"[S3] Uploaded to: s3://{self.bucket}/{key}")
+                self._finish(entry)
+                self._notify_done(filepath, True)
+                return True
+            except Exception as e:
+                print(f"[S3] Upload failed (attempt {attempt}/{self.max_attempts}): {e}")
+                if attempt == self.max_attempts:
+                    break
+                delay = self.base_delay * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                if self._stop_event.wait(delay):
+                    break
+            finally:
+                if upload_path and upload_path != filepath and os.path.exists(upload_path):
+                    os.remove(upload_path)
+
+        # Left in the queue file so the next resume() retries it
+        self._notify_done(filepath, False)
+        return False
+
+    def _notify_done(self, filepath, ok):
+        if self.on_done:
+            try:
+                self.on_done(filepath, ok)
+            except Exception as e:
+                print(f"[S3] Status callback error: {e}")
@@ -0,0 +1,147 @@
+# src/core/serial_codec.py
+import struct
+import binascii
+
+import numpy as np
+
+# Binary frame from the firmware (SERIAL_BINARY_FRAMES): sync, uint32 millis, float32 lux,
+# CRC-16/CCITT-FALSE of the 8 payload bytes, all little-endian. 0xA5 never occurs in the
+# ASCII text format, so one stream can be decoded without being told which it carries.
+FRAME_SYNC = b"\xa5\x5a"
+FRAME = struct.Struct("<2sIfH")
+FRAME_DTYPE = np.dtype([("sync", "S2"), ("millis", "<u4"), ("lux", "<f4"), ("crc", "<u2")])
+# A line that never ends is noise, not a reading; stop buffering it
+MAX_PENDING = 64 * 1024
+
+
+def crc16(payload):
+    return binascii.crc_hqx(payload, 0xFFFF)
+
+
+def encode_frame(millis, lux):
+    payload = struct.pack("<If", millis, lux)
+    return FRAME_SYNC + payload + struct.pack("<H", crc16(payload))
+
+
+def _empty():
+    return np.empty(0, np.int64), np.empty(0, np.float64)
+
+
+def parse_serial_lines(block):
+    """Parse complete `millis,lux` lines into (millis int64, lux float64) arrays.
+
+    The common case (every line a reading) is one split and one NumPy
+    conversion for the whole block; anything else falls back to line by line,
+    dropping lines that are not readings (boot and WiFi messages).
+    """
+    lines = block.count(b"\n")
+    if not lines:
+        return _empty()
+    fields = block.replace(b"\n", b",").split(b",")[:-1]
+    if len(fields) == 2 * lines:
+        try:
+            values = np.array(fields).astype(np.float64).reshape(-1, 2)
+            return values[:, 0].astype(np.int64), values[:, 1]
+        except ValueError:
+            pass
+
+    millis, lux = [], []
+    for line in block.split(b"\n"):
+        parts = line.split(b",")
+        if len(parts) != 2:
+            continue
+        try:
+            ms, value = int(parts[0]), float(parts[1])
+        except ValueError:
+            continue
+        millis.append(ms)
+        lux.append(value)
+    return np.array(millis, np.int64), np.array(lux, np.float64)
+
+
+def decode_frames(data):
+    """Decode binary frames from `data`.
+
+    Returns (millis, lux, consumed, bad): bytes before `consumed` were decoded
+    or discarded (stray text, `bad` frames failing their CRC); the rest may be
+    the start of a frame.
+    """
+    size = FRAME.size
+    start = data.find(FRAME_SYNC)
+    if start < 0:
+        # Keep a trailing first sync byte, its partner may be in the next read
+        return (*_empty(), len(data) - 1 if data.endswith(FRAME_SYNC[:1]) else len(data), 0)
+
+    # Fast path: an unbroken run of frames is viewed in place
+    count = (len(data) - start) // size
+    frames = np.frombuffer(data, FRAME_DTYPE, count, start)
+    if count and (frames["sync"] == FRAME_SYNC).all():
+        crcs = [crc16(data[i + 2:i + 10]) for i in range(start, start + count * size, size)]
+        ok = frames["crc"] == np.array(crcs, np.uint16)
+        return (frames["millis"][ok].astype(np.int64), frames["lux"][ok].astype(np.float64),
+                start + count * size, count - int(ok.sum()))
+
+    millis, lux = [], []
+    bad = 0
+    pos = start
+    while pos >= 0 and pos + size <= len(data):
+        _, ms, value, crc = FRAME.unpack_from(data, pos)
+        if crc == crc16(data[pos + 2:pos + 10]):
+            millis.append(ms)
+            lux.append(value)
+            pos += size
+            if data.startswith(FRAME_SYNC, pos):
+                continue
+        else:
+            bad += 1
+            pos += 1
+        pos = data.find(FRAME_SYNC, pos)
+    consumed = len(data) if pos < 0 else pos
+    return np.array(millis, np.int64), np.array(lux, np.float64), consumed, bad
+
+
+class SerialDecoder:
+    """Turns raw serial reads into (millis, lux) arrays, text or binary.
+
+    Bytes are fed in whatever chunks the port returns; partial lines or
+    frames are carried over to the next `feed`. The stream switches to
+    binary decoding once a frame passes its CRC check, so stray sync bytes
+    from line noise or a bootloader do not count, and back to text if a
+    read holds no valid frame but does hold readable lines.
+    """
+
+    def __init__(self):
+        self.binary = False
+        self.crc_errors = 0
+        self._pending = b""
+
+    @staticmethod
+    def _decode_text(data):
+        consumed = data.rfind(b"\n") + 1
+        millis, lux = parse_serial_lines(data[:consumed]) if consumed else _empty()
+        return millis, lux, consumed
+
+    def feed(self, data):
+        data = self._pending + data if self._pending else data
+        decoded = None
+        if self.binary or FRAME_SYNC in data:
+            millis, lux, consumed, bad = decode_frames(data)
+            if len(lux):
+                self.binary = True
+                self.crc_errors += bad
+                decoded = millis, lux, consumed
+            elif self.binary:
+                self.crc_errors += bad
+                text = self._decode_text(data)
+                if len(text[1]):
+                    self.binary = False  # the device went back to text lines
+                    decoded = text
+                else:
+                    decoded = millis, lux, consumed
+        if decoded is None:
+            decoded = self._decode_text(data)
+        millis, lux, consumed = decoded
+        self._pending = data[consumed:]
+        if len(self._pending) > MAX_PENDING:
+            self._pending = b""
+        return millis, lux
@@ -0,0 +1,121 @@
+# src/core/session_store.py
+import bisect
+import datetime
+from array import array
+
+import numpy as np
+
+CHUNK_SIZE = 65536
+NS_PER_SEC = 1_000_000_000
+GMT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def format_gmt(epoch_ns):
+    return datetime.datetime.utcfromtimestamp(epoch_ns // NS_PER_SEC).strftime(GMT_FORMAT)
+
+
+def parse_gmt(gmt_ts):
+    parsed = datetime.datetime.strptime(gmt_ts, GMT_FORMAT).replace(tzinfo=datetime.timezone.utc)
+    return int(parsed.timestamp()) * NS_PER_SEC
+
+
+class SessionStore:
+    """Compact columnar storage for the readings of one recording session.
+
+    Samples live in fixed-size chunks of typed arrays (int64 relative ms,
+    int64 epoch ns, float64 or float32 lux) instead of a list of tuples.
+    Iterating yields the same `(rel_ts, gmt_ts, lux)` rows as before; the GMT
+    string is only formatted at that point, once per distinct second.
+    """
+
+    def __init__(self, lux_typecode="d"):
+        self.lux_typecode = lux_typecode
+        # Bumped on every clear so derived views (MinMaxPyramid) know to rebuild
+        self.generation = 0
+        self.clear()
+
+    def clear(self):
+        self._chunks = []
+        self._length = 0
+        self.generation += 1
+
+    def __len__(self):
+        return self._length
+
+    def __bool__(self):
+        return self._length > 0
+
+    def _current_chunk(self):
+        if not self._chunks or len(self._chunks[-1][0]) >= CHUNK_SIZE:
+            self._chunks.append((array("q"), array("q"), array(self.lux_typecode)))
+        return self._chunks[-1]
+
+    def append(self, rel_ts, epoch_ns, lux):
+        rel_col, epoch_col, lux_col = self._current_chunk()
+        rel_col.append(rel_ts)
+        epoch_col.append(epoch_ns)
+        lux_col.append(lux)
+        self._length += 1
+
+    def append_row(self, rel_ts, gmt_ts, lux):
+        """Append a row in the exported `(rel_ts, gmt_ts, lux)` layout."""
+        self.append(rel_ts, parse_gmt(gmt_ts), lux)
+
+    def __iter__(self):
+        last_sec = None
+        gmt_ts = None
+        for rel_col, epoch_col, lux_col in self._chunks:
+            for rel_ts, epoch_ns, lux in zip(rel_col, epoch_col, lux_col):
+                sec = epoch_ns // NS_PER_SEC
+                if sec != last_sec:
+                    last_sec = sec
+                    gmt_ts = format_gmt(epoch_ns)
+                yield rel_ts, gmt_ts, lux
+
+    def lux_values(self):
+        for _, _, lux_col in self._chunks:
+            yield from lux_col
+
+    def columns(self):
+        """Return (rel_ms, epoch_ns, lux) as NumPy arrays."""
+        if not self._chunks:
+            return self._empty_columns()
+        return tuple(
+            np.concatenate([np.frombuffer(chunk[i], dtype=chunk[i].typecode) for chunk in self._chunks])
+            for i in range(3)
+        )
+
+    def _empty_columns(self):
+        return (np.empty(0, np.int64), np.empty(0, np.int64),
+                np.empty(0, np.float32 if self.lux_typecode == "f" else np.float64))
+
+    def slice_columns(self, start, stop):
+        """Return (rel_ms, epoch_ns, lux) NumPy copies of rows [start, stop)."""
+        start, stop, _ = slice(start, stop).indices(self._length)
+        parts = ([], [], [])
+        first_chunk = start // CHUNK_SIZE
+        last_chunk = (stop - 1) // CHUNK_SIZE if stop > start else first_chunk - 1
+        for index in range(first_chunk, last_chunk + 1):
+            chunk = self._chunks[index]
+            lo = max(start - index * CHUNK_SIZE, 0)
+            hi = min(stop - index * CHUNK_SIZE, len(chunk[0]))
+            for part, col in zip(parts, chunk):
+                # Copy right away: a live buffer view would stop the array from growing
+                part.append(np.frombuffer(col, dtype=col.typecode)[lo:hi].copy())
+        if not parts[0]:
+            return self._empty_columns()
+        return tuple(np.concatenate(part) for part in parts)
+
+    def search_epoch(self, epoch_ns):
+        """Index of the first row with epoch_ns >= the given time (rows are time-ordered)."""
+        if not self._chunks:
+            return 0
+        firsts = [chunk[1][0] for chunk in self._chunks]
+        index = max(bisect.bisect_right(firsts, epoch_ns) - 1, 0)
+        epoch_col = self._chunks[index][1]
+        offset = int(np.searchsorted(np.frombuffer(epoch_col, dtype=epoch_col.typecode), epoch_ns))
+        return index * CHUNK_SIZE + offset
+
+    @property
+    def nbytes(self):
+        return sum(col.itemsize * len(col) for chunk in self._chunks for col in chunk)
@@ -0,0 +1,63 @@
+# src/core/startup_profile.py
+import sys
+import time
+import builtins
+
+
+class StartupProfiler:
+    """Import-time and milestone breakdown of application start-up.
+
+    `mark(label)` records a milestone relative to the profiler's creation.
+    While `track_imports()` is active, the time spent importing each
+    top-level package is accumulated, excluding the time of other packages
+    it pulls in, so boto3 is not also charged to whatever imported it.
+    """
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.marks = []
+        self.imports = {}
+        self._stack = []
+        self._original_import = None
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter() - self.start))
+
+    def track_imports(self):
+        if self._original_import is not None:
+            return
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def stop_tracking(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        package = name.partition(".")[0]
+        if level or not package or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        frame = [package, 0.0]
+        self._stack.append(frame)
+        started = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][1] += elapsed
+            self.imports[package] = self.imports.get(package, 0.0) + elapsed - frame[1]
+
+    def report(self, top=10):
+        lines = ["[Startup] Milestones (s since start):"]
+        previous = 0.0
+        for label, at in self.marks:
+            lines.append(f"  {label:<24}{at:8.3f}  (+{at - previous:.3f})")
+            previous = at
+        if self.imports:
+            lines.append(f"[Startup] Slowest imports (s, {sum(self.imports.values()):.3f} total):")
+            for package, spent in sorted(self.imports.items(), key=lambda kv: -kv[1])[:top]:
+                lines.append(f"  {package:<24}{spent:8.3f}")
+        return "\n".join(lines)
@@ -0,0 +1,246 @@
+# src/core/streams.py
+import os
+import re
+import time
+import datetime
+import itertools
+
+from core.ring_buffer import SampleRingBuffer
+from core.rolling_stats import RollingStats
+from core.session_store import SessionStore, NS_PER_SEC
+from core.downsample import MinMaxPyramid
+from core.data_logger import write_summary_csv, write_binary_session, write_parquet_session, StreamingCSVWriter
+
+# Device id for readings that do not name their sensor (legacy topic, plain serial lines)
+DEFAULT_DEVICE = "sensor"
+
+_spool_ids = itertools.count()
+_SPOOL_NAME = re.compile(r"^\.recording_.*_(\d+)_\d+\.csv\.part$")
+# Spools of our own pid older than this are from an earlier process that had the same pid
+_STARTED = time.time()
+
+
+def _safe_name(device):
+    return re.sub(r"[^\w.-]", "_", device)
+
+
+def _recorder_alive(pid, mtime):
+    if pid == os.getpid():
+        return mtime >= _STARTED
+    if os.name == "nt":
+        # os.kill(pid, 0) would send it CTRL+C; a live recorder's open spool cannot be deleted anyway
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # exists, but belongs to another user
+    return True
+
+
+def sweep_orphaned_spools(spool_dir):
+    """Delete session CSVs left behind by recorders that are no longer running.
+
+    Their readings are also in the session WAL, so Recover still has them.
+    Returns the number of files removed.
+    """
+    try:
+        names = os.listdir(spool_dir)
+    except OSError:
+        return 0
+    removed = 0
+    for name in names:
+        match = _SPOOL_NAME.match(name)
+        if match is None:
+            continue
+        path = os.path.join(spool_dir, name)
+        try:
+            if not _recorder_alive(int(match.group(1)), os.path.getmtime(path)):
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass  # still open in another process, or already gone
+    if removed:
+        print(f"[Streams] Removed {removed} orphaned recording file(s) from {spool_dir}")
+    return removed
+
+
+def device_from_topic(topic, default=DEFAULT_DEVICE):
+    """`sensor/<device>/lux` -> `<device>`; anything else maps to `default`."""
+    parts = topic.split("/")
+    if len(parts) == 3 and parts[0] == "sensor" and parts[2] == "lux" and parts[1]:
+        return parts[1]
+    return default
+
+
+class DeviceStream:
+    """Live window, rolling stats and session samples of one sensor."""
+
+    def __init__(self, device, window=500, spool_dir=None):
+        self.device = device
+        self.buffer = SampleRingBuffer(capacity=window)
+        self.stats = RollingStats(window=window)
+        self.session = SessionStore()
+        self.lod = MinMaxPyramid(self.session)
+        self.spool_dir = spool_dir
+        self.spool = None
+        self._spool_session = None
+
+    def clear(self):
+        self.buffer.clear()
+        self.stats.clear()
+        self.session.clear()
+        self.discard_spool()
+
+    def spool_rows(self, rel_ms, epoch_ns, lux):
+        """Stream rows just added to the session into its export CSV (needs `spool_dir`)."""
+        if self.spool_dir is None:
+            return
+        if self.spool is not None and (self._spool_session is not self.session
+                                       or self.spool.count + len(lux) != len(self.session)):
+            self.discard_spool()  # the session was cleared or replaced underneath us
+        if self.spool is None:
+            if len(lux) != len(self.session):
+                return  # picked up mid-session (recovery): export writes it in one go
+            name = f".recording_{_safe_name(self.device)}_{os.getpid()}_{next(_spool_ids)}.csv.part"
+            self.spool = StreamingCSVWriter(os.path.join(self.spool_dir, name))
+            self._spool_session = self.session
+        self.spool.append_many(rel_ms, epoch_ns, lux)
+
+    def take_spool(self):
+        """Hand over the spool if it holds exactly the current session, else drop it."""
+        spool, self.spool = self.spool, None
+        if spool is not None and self._spool_session is self.session and spool.count == len(self.session):
+            return spool
+        if spool is not None:
+            spool.discard()
+        return None
+
+    def discard_spool(self):
+        if self.spool is not None:
+            self.spool.discard()
+            self.spool = None
+
+    def session_summary(self):
+        # Only reuse the running totals if they describe exactly what is in the session
+        if self.stats.session.count == len(self.session):
+            return self.stats.session
+        return None
+
+    def session_lod(self):
+        # The session may have been swapped out (recovery, tests); keep the pyramid in step
+        if self.lod.store is not self.session:
+            self.lod = MinMaxPyramid(self.session)
+        return self.lod
+
+
+class StreamRegistry:
+    """Per-device streams, created the first time a device reports.
+
+    With `spool_dir` set, every session is also streamed to a CSV there as it
+    is recorded, so export_streams only has to finalize it. Spools left there
+    by a crashed recorder are deleted on creation.
+    """
+
+    def __init__(self, window=500, on_new_device=None, spool_dir=None):
+        self.window = window
+        self.on_new_device = on_new_device
+        self.spool_dir = spool_dir
+        self._streams = {}
+        if spool_dir is not None:
+            sweep_orphaned_spools(spool_dir)
+
+    def __len__(self):
+        return len(self._streams)
+
+    def __contains__(self, device):
+        return device in self._streams
+
+    def __iter__(self):
+        return iter(list(self._streams.values()))
+
+    def devices(self):
+        return list(self._streams)
+
+    def get(self, device):
+        stream = self._streams.get(device)
+        if stream is None:
+            stream = self._streams[device] = DeviceStream(device, self.window, self.spool_dir)
+            if self.on_new_device:
+                self.on_new_device(device)
+        return stream
+
+    def ingest(self, batch, origin, session_log=None):
+        """Route `(timestamp, device, lux)` readings to their streams.
+
+        `origin` is the epoch second of relative time 0. Each device's live
+        buffer gets one batched extend. Returns the streams that got data.
+        """
+        pending = {}
+        for now, device, lux in batch:
+            rel_ts = int((now - origin) * 1000)
+            epoch_ns = int(now * NS_PER_SEC)
+            stream = self.get(device)
+            stream.stats.push(lux)
+            stream.session.append(rel_ts, epoch_ns, lux)
+            if session_log is not None:
+                session_log.append(rel_ts, epoch_ns, lux, None if device == DEFAULT_DEVICE else device)
+            rels, epochs, values = pending.setdefault(stream, ([], [], []))
+            rels.append(rel_ts)
+            epochs.append(epoch_ns)
+            values.append(lux)
+        for stream, (rels, epochs, values) in pending.items():
+            if len(epochs) == 1:
+                stream.buffer.append(epochs[0], values[0])  # cheaper than a NumPy extend
+            else:
+                stream.buffer.extend(epochs, values)
+            stream.spool_rows(rels, epochs, values)
+        return pending.keys()
+
+    def clear(self):
+        """Empty every stream but keep the known devices."""
+        for stream in self._streams.values():
+            stream.clear()
+
+    def close(self):
+        """Stop streaming and delete any unexported session CSVs."""
+        for stream in self._streams.values():
+            stream.discard_spool()
+
+
+def export_streams(streams, logs_dir, binary=False, parquet=False, timestamp=None):
+    """Write each non-empty session to a summary CSV and clear it once written.
+
+    A session already streamed to disk is just finalized and renamed.
+
+    Files are named `lux_data_<timestamp>[_<device>].csv`; the device suffix
+    is only added when more than one device has data. With `parquet`, a
+    `.parquet` copy is written next to each CSV and returned with it. Returns
+    the written paths and the number of sessions that failed to export.
+    """
+    streams = [stream for stream in streams if stream.session]
+    timestamp = timestamp or datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    exported = []
+    failed = 0
+    for stream in streams:
+        suffix = "" if len(streams) == 1 else "_" + _safe_name(stream.device)
+        filepath = os.path.join(logs_dir, f"lux_data_{timestamp}{suffix}.csv")
+        spool = stream.take_spool()
+        if spool is None or not spool.finalize(filepath):
+            if spool is not None:
+                spool.discard()
+            if not write_summary_csv(filepath, stream.session, stream.session_summary()):
+                failed += 1
+                continue
+        if binary:
+            write_binary_session(filepath[:-len(".csv")] + ".lxb", stream.session,
+                                 {"exported_at": timestamp, "device": stream.device})
+        exported.append(filepath)
+        if parquet:
+            parquet_path = filepath[:-len(".csv")] + ".parquet"
+            if write_parquet_session(parquet_path, stream.session, stream.device):
+                exported.append(parquet_path)
+        stream.session.clear()
+        stream.stats.session.clear()
+    return exported, failed
@@ -1,10 +1,68 @@
 # src/main.py
+import time
+_STARTED = time.perf_counter()
+
 import sys
-from PyQt5.QtWidgets import QApplication
-from ui.layout import SensorDashboard
+import argparse
 
-if __name__ == '__main__':
-    app = QApplication(sys.argv)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Real-time BH1750 lux dashboard")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print an import and first-paint timing breakdown, then exit")
+    # Anything else (e.g. -platform offscreen) is left for Qt
+    return parser.parse_known_args(argv[1:])
+
+
+def main(argv=None):
+    argv = sys.argv if argv is None else argv
+    args, qt_args = parse_args(argv)
+    profiler = None
+    if args.profile_startup:
+        from core.startup_profile import StartupProfiler
+        profiler = StartupProfiler(start=_STARTED)
+        profiler.track_imports()
+
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(argv[:1] + qt_args)
+    if profiler:
+        profiler.mark("QApplication")
+
+    from ui.layout import SensorDashboard
+    if profiler:
+        profiler.mark("dashboard imports")
     window = SensorDashboard()
+    if profiler:
+        profiler.stop_tracking()
+        profiler.mark("dashboard built")
+        _report_after_first_paint(app, window, profiler)
     window.show()
-    sys.exit(app.exec_())
+    return app.exec_()
+
+
+def _report_after_first_paint(app, window, profiler):
+    from PyQt5.QtCore import QObject, QEvent
+
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                obj.removeEventFilter(self)
+                # Quit once this paint has been delivered, not in the middle of it
+                app.postEvent(self, QEvent(QEvent.User))
+            return False
+
+        def event(self, event):
+            if event.type() == QEvent.User:
+                profiler.mark("first paint")
+                print(profiler.report())
+                window.close()
+                app.quit()
+                return True
+            return super().event(event)
+
+    window._first_paint_filter = FirstPaint()
+    window.installEventFilter(window._first_paint_filter)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
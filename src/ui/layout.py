@@ -2,53 +2,123 @@
 
 import os
 import sys
-import csv
 import time
-import json
-import serial
-import datetime
-from threading import Thread, Event
-from collections import deque
 
 import serial.tools.list_ports
-import paho.mqtt.client as mqtt
 
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QPushButton, QLabel,
-    QComboBox, QGroupBox, QRadioButton, QButtonGroup, QFormLayout, QMessageBox
+    QComboBox, QGroupBox, QRadioButton, QButtonGroup, QFormLayout, QMessageBox, QCheckBox
 )
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT
 from matplotlib.figure import Figure
 
 from config import (
-    MQTT_BROKER, MQTT_TOPIC, DEFAULT_LOG_DIR,
-    AIO_SEND_INTERVAL_SEC
+    MQTT_BROKER, MQTT_TOPIC, MQTT_DEVICE_TOPIC, MQTT_QOS, MQTT_CLIENT_ID, DEFAULT_LOG_DIR, EXPORT_BINARY,
+    EXPORT_PARQUET, COLLECTOR_HOST, COLLECTOR_FEED_PORT, HISTORY_RETENTION_DAYS, HISTORY_MAX_MB
 )
-from core.adafruit_uploader import send_to_adafruit
-from core.s3_uploader import upload_to_s3
-from core.data_logger import write_summary_csv, write_temp_log
+from core.adafruit_uploader import AdafruitUploader
+from core.s3_uploader import S3UploadManager
+from core.data_logger import SessionWAL, session_log_segments, replay_device_log
+from core.ingest_queue import IngestQueue
+from core.history import HistoryStore
+from core.port_probe import PortProber
+from core.ingest import (
+    IngestCore, BatchSink, SerialTransport, MqttTransport, CollectorTransport, parse_serial_line,
+    mqtt_client_id
+)
+from core.session_store import SessionStore, NS_PER_SEC
+from core.streams import StreamRegistry, DEFAULT_DEVICE, export_streams
+from ui.plot_renderer import BlitPlotRenderer, epoch_ns_to_datenum, datenum_to_epoch_ns
+
+# History view windows, in seconds back from now
+HISTORY_RANGES = {"Last hour": 3600, "Last 24 hours": 86400, "Last 7 days": 7 * 86400, "Last 30 days": 30 * 86400}
+
+
+class SessionNavigationToolbar(NavigationToolbar2QT):
+    """Matplotlib pan/zoom toolbar whose Home button re-fits the session view."""
+
+    def __init__(self, canvas, parent, on_home):
+        self._on_home = on_home
+        super().__init__(canvas, parent)
+
+    def home(self, *args):
+        super().home(*args)
+        self._on_home()
+
 
 class SensorDashboard(QWidget):
+    # Emitted from the Adafruit uploader thread; delivered on the GUI thread
+    adafruit_status_changed = pyqtSignal(bool, str)
+    # Emitted from S3 upload workers
+    s3_progress = pyqtSignal(str, int, int)
+    s3_done = pyqtSignal(str, bool)
+    # Emitted from port probe workers
+    port_probed = pyqtSignal(str, bool)
+
     def __init__(self):
         super().__init__()
-        self.relative_data = deque(maxlen=500)
-        self.relative_timestamps = deque(maxlen=500)
-        self.gmt_data = deque(maxlen=500)
-        self.gmt_timestamps = deque(maxlen=500)
+        # Sessions are streamed to CSV as they are recorded, so Export only finalizes them
+        self.streams = StreamRegistry(window=500, spool_dir=DEFAULT_LOG_DIR)
+        self.selected_device = DEFAULT_DEVICE
+        self.streams.get(DEFAULT_DEVICE)
+        self.overlay_devices = False
+        self.ingest_queue = IngestQueue()
         self.running = False
         self.paused = False
-        self.serial_thread = None
-        self.mqtt_thread = None
-        self.mqtt_client = None
-        self.stop_event = Event()
+        self.ingest = IngestCore(sink=BatchSink(self._on_reading, self._on_readings))
         self.timer_start_time = None
         self.timestamp_mode = "Relative"
-        self.last_aio_send_time = 0
-        self.session_data = []
+        self.aio_uploader = AdafruitUploader(on_status=self.adafruit_status_changed.emit)
+        self.adafruit_status_changed.connect(self._set_adafruit_status)
+        self.view_mode = "Live"
+        self.session_zoomed = False
+        self._setting_view = False
+        self._view_refresh_pending = False
         self.logs_dir = DEFAULT_LOG_DIR
         os.makedirs(self.logs_dir, exist_ok=True)
+        self.session_log = SessionWAL(os.path.join(self.logs_dir, "temp_log.csv"))
+        self.history = HistoryStore(os.path.join(self.logs_dir, "history.sqlite3"),
+                                    retention_days=HISTORY_RETENTION_DAYS,
+                                    max_bytes=HISTORY_MAX_MB * 1024 * 1024)
+        self.s3_uploader = S3UploadManager(
+            os.path.join(self.logs_dir, "s3_queue.json"),
+            on_progress=self.s3_progress.emit, on_done=self.s3_done.emit
+        )
+        self.port_prober = PortProber(os.path.join(self.logs_dir, "port_cache.json"),
+                                      on_result=self.port_probed.emit)
+        self.port_probed.connect(self._on_port_probed)
+        self._port_devices = set()
+        # Port the running serial stream has open; probes must leave it alone
+        self.serial_port = None
         self.init_ui()
+        self.streams.on_new_device = self._on_new_device
+        self.s3_progress.connect(self._show_s3_progress)
+        self.s3_done.connect(self._show_s3_done)
+        self.s3_uploader.resume()
+
+    # The live buffer, stats and session of the device selected in the UI
+    @property
+    def selected_stream(self):
+        return self.streams.get(self.selected_device)
+
+    @property
+    def live_buffer(self):
+        return self.selected_stream.buffer
+
+    @property
+    def stats(self):
+        return self.selected_stream.stats
+
+    @property
+    def session_data(self):
+        return self.selected_stream.session
+
+    @session_data.setter
+    def session_data(self, session):
+        self.selected_stream.session = session
 
     def init_ui(self):
         self.setWindowTitle("Real-Time Sensor Dashboard")
@@ -58,23 +128,37 @@ class SensorDashboard(QWidget):
         stream_group = QGroupBox("Data Stream Mode")
         self.wifi_radio = QRadioButton("WiFi")
         self.com_radio = QRadioButton("COM")
+        self.collector_radio = QRadioButton("Collector")
+        self.collector_radio.setToolTip(f"View the live feed of a headless collector at {COLLECTOR_HOST}:{COLLECTOR_FEED_PORT}")
         self.wifi_radio.setChecked(True)
         self.mode_group = QButtonGroup()
         self.mode_group.addButton(self.wifi_radio)
         self.mode_group.addButton(self.com_radio)
+        self.mode_group.addButton(self.collector_radio)
         self.mode_group.buttonClicked.connect(self.toggle_stream_mode)
         stream_layout = QVBoxLayout()
         stream_layout.addWidget(self.wifi_radio)
         stream_layout.addWidget(self.com_radio)
+        stream_layout.addWidget(self.collector_radio)
         stream_group.setLayout(stream_layout)
 
         # === COM Port Dropdown ===
         self.com_label = QLabel("Select COM Port:")
         self.com_dropdown = QComboBox()
         self.com_dropdown.setEnabled(False)
+        self.rescan_btn = QPushButton("Rescan")
+        self.rescan_btn.setToolTip("Probe every port again, ignoring the remembered sensor port")
+        self.rescan_btn.clicked.connect(lambda: self.refresh_com_ports(force=True))
         self.refresh_com_ports()
+        com_row = QHBoxLayout()
+        com_row.addWidget(self.com_dropdown, 1)
+        com_row.addWidget(self.rescan_btn)
         com_layout = QFormLayout()
-        com_layout.addRow(self.com_label, self.com_dropdown)
+        com_layout.addRow(self.com_label, com_row)
+        # Hot-plug: listing ports is cheap, probing only happens when the set changes
+        self.port_poll_timer = QTimer(self)
+        self.port_poll_timer.timeout.connect(self.poll_com_ports)
+        self.port_poll_timer.start(2000)
 
         # === Time Mode Group ===
         time_group = QGroupBox("Time Axis Mode")
@@ -90,6 +174,35 @@ class SensorDashboard(QWidget):
         time_layout.addWidget(self.gmt_radio)
         time_group.setLayout(time_layout)
 
+        # === Plot View Group ===
+        view_group = QGroupBox("Plot View")
+        self.live_view_radio = QRadioButton("Live")
+        self.session_view_radio = QRadioButton("Full Session")
+        self.history_view_radio = QRadioButton("History")
+        self.live_view_radio.setChecked(True)
+        self.view_group = QButtonGroup()
+        self.view_group.addButton(self.live_view_radio)
+        self.view_group.addButton(self.session_view_radio)
+        self.view_group.addButton(self.history_view_radio)
+        self.view_group.buttonClicked.connect(self.toggle_view_mode)
+        self.history_range = QComboBox()
+        self.history_range.addItems(HISTORY_RANGES)
+        self.history_range.setEnabled(False)
+        self.history_range.currentTextChanged.connect(self.fit_session_view)
+        view_layout = QVBoxLayout()
+        view_layout.addWidget(self.live_view_radio)
+        view_layout.addWidget(self.session_view_radio)
+        view_layout.addWidget(self.history_view_radio)
+        view_layout.addWidget(self.history_range)
+        self.device_dropdown = QComboBox()
+        self.device_dropdown.addItems(self.streams.devices())
+        self.device_dropdown.currentTextChanged.connect(self.select_device)
+        self.overlay_checkbox = QCheckBox("Overlay all devices")
+        self.overlay_checkbox.toggled.connect(self.toggle_overlay)
+        view_layout.addWidget(self.device_dropdown)
+        view_layout.addWidget(self.overlay_checkbox)
+        view_group.setLayout(view_layout)
+
         # === Export & Recovery Group ===
         export_group = QGroupBox("Data Export / Recovery")
         export_layout = QGridLayout()
@@ -117,7 +230,7 @@ class SensorDashboard(QWidget):
               <li>Relative & GMT timestamps</li>
               <li>Summary stats like Min, Max, and Avg </li>
             </ul>
-            Stored in <code>logs/</code>. If skipped, logs/temp_log.csv will be created.
+            Stored in <code>logs/</code>. Every reading is also journaled to logs/temp_log.csv as it arrives.
             </div>
         """)
 
@@ -126,7 +239,7 @@ class SensorDashboard(QWidget):
         self.recover_tooltip.setToolTipDuration(0)
         self.recover_tooltip.setToolTip("""
             <div style="font-size: 12px; color: white; font-style: italic;">
-            Reloads the last unsaved session from temp_log.csv for export or inspection.
+            Reloads the journaled readings from temp_log.csv for export or inspection.
             </div>
         """)
 
@@ -142,6 +255,7 @@ class SensorDashboard(QWidget):
         top_controls.addWidget(stream_group)
         top_controls.addLayout(com_layout)
         top_controls.addWidget(time_group)
+        top_controls.addWidget(view_group)
         top_controls.addStretch()
         top_controls.addWidget(export_group)
 
@@ -154,10 +268,12 @@ class SensorDashboard(QWidget):
         self.canvas.setMinimumHeight(300)
         self.canvas.setStyleSheet("margin-top: 8px; border: 1px solid #555; border-radius: 4px;")
         self.ax = self.figure.add_subplot(111)
-        self.ax.set_xlabel("Time")
-        self.ax.set_ylabel("Lux")
         self.figure.subplots_adjust(bottom=0.25)  # Slightly increase from 0.2
+        self.renderer = BlitPlotRenderer(self.canvas, self.ax)
+        self.ax.callbacks.connect("xlim_changed", self._on_xlim_changed)
+        self.toolbar = SessionNavigationToolbar(self.canvas, self, self.fit_session_view)
         self.setup_control_buttons(layout)
+        layout.addWidget(self.toolbar)
         layout.addWidget(self.canvas)
         
 
@@ -178,31 +294,63 @@ class SensorDashboard(QWidget):
 
     def toggle_time_mode(self):
         self.timestamp_mode = "Relative" if self.relative_radio.isChecked() else "GMT"
+        if self.view_mode == "Session":
+            self.fit_session_view()
 
-    def refresh_com_ports(self):
-        self.com_dropdown.clear()
-        ports = serial.tools.list_ports.comports()
-        detected_sensor_port = None
-        for port in ports:
-            try:
-                with serial.Serial(port.device, 115200, timeout=1) as ser:
-                    line = ser.readline().decode().strip()
-                    parts = line.split(",")
-                    if len(parts) == 2:
-                        float(parts[1])
-                        detected_sensor_port = port.device
-                        break
-            except:
-                continue
+    def toggle_overlay(self, checked):
+        self.overlay_devices = checked
+        self.fit_session_view()
 
-        for port in ports:
-            label = f"{port.device} (Detected Sensor Port)" if port.device == detected_sensor_port else port.device
-            self.com_dropdown.addItem(label)
+    def select_device(self, device):
+        if not device or device == self.selected_device:
+            return
+        self.selected_device = device
+        self._update_stat_labels()
+        self.fit_session_view()
+
+    def _on_new_device(self, device):
+        self.device_dropdown.addItem(device)
+        # Follow the first device that actually reports if nothing has been shown yet
+        current = self.selected_stream
+        if not len(current.buffer) and not current.session:
+            self.device_dropdown.setCurrentText(device)
+
+    def toggle_view_mode(self):
+        if self.session_view_radio.isChecked():
+            self.view_mode = "Session"
+        elif self.history_view_radio.isChecked():
+            self.view_mode = "History"
+        else:
+            self.view_mode = "Live"
+        self.history_range.setEnabled(self.view_mode == "History")
+        self.fit_session_view()
 
-        if detected_sensor_port:
-            self.com_dropdown.setCurrentIndex(
-                self.com_dropdown.findText(f"{detected_sensor_port} (Detected Sensor Port)")
-            )
+    def refresh_com_ports(self, force=False):
+        """List the ports right away; probe results relabel them as they arrive."""
+        ports = serial.tools.list_ports.comports()
+        self._port_devices = {port.device for port in ports}
+        selected = self.com_dropdown.currentData()
+        self.com_dropdown.clear()
+        for port in ports:
+            self.com_dropdown.addItem(port.device, port.device)
+        if selected in self._port_devices:
+            self.com_dropdown.setCurrentIndex(self.com_dropdown.findData(selected))
+        self.port_prober.scan(ports, force=force, busy={self.serial_port} if self.serial_port else ())
+
+    def poll_com_ports(self):
+        devices = {port.device for port in serial.tools.list_ports.comports()}
+        if devices != self._port_devices:
+            print(f"[Ports] Ports changed: {', '.join(sorted(devices)) or 'none'}")
+            self.refresh_com_ports()
+
+    def _on_port_probed(self, device, detected):
+        index = self.com_dropdown.findData(device)
+        if index < 0 or not detected:
+            return
+        self.com_dropdown.setItemText(index, f"{device} (Detected Sensor Port)")
+        # Never switch ports under a running serial stream
+        if not (self.running and self.com_radio.isChecked()):
+            self.com_dropdown.setCurrentIndex(index)
 
     def setup_control_buttons(self, layout):
         control_box = QGroupBox("Controls")
@@ -235,6 +383,10 @@ class SensorDashboard(QWidget):
         self.adafruit_status.setAlignment(Qt.AlignCenter)
         self.adafruit_status.setStyleSheet("color: gray; font-size: 14px;")
 
+        self.s3_status = QLabel("S3: Idle")
+        self.s3_status.setAlignment(Qt.AlignCenter)
+        self.s3_status.setStyleSheet("color: gray; font-size: 14px;")
+
         self.min_label = QLabel("Min: --")
         self.max_label = QLabel("Max: --")
         self.avg_label = QLabel("Avg: --")
@@ -273,6 +425,7 @@ class SensorDashboard(QWidget):
         layout.addWidget(self.warning_label)
         layout.addWidget(self.current_lux_label)
         layout.addWidget(self.adafruit_status)
+        layout.addWidget(self.s3_status)
         layout.addLayout(stats_layout)
         layout.addWidget(self.updated_label)
 
@@ -284,198 +437,292 @@ class SensorDashboard(QWidget):
         if self.running:
             return
         self.running = True
-        self.stop_event.clear()
+        self.ingest_queue.drain()  # discard stragglers from the previous stream
         self.timer_start_time = time.time()
         self.start_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
 
         if self.com_radio.isChecked():
-            selected_label = self.com_dropdown.currentText()
-            selected_port = selected_label.split(" ")[0]
+            selected_port = self.com_dropdown.currentData() or self.com_dropdown.currentText().split(" ")[0]
             if selected_port:
-                self.serial_thread = Thread(target=self.read_serial, args=(selected_port,), daemon=True)
-                self.serial_thread.start()
+                self.serial_port = selected_port
+                self.ingest.add(SerialTransport(selected_port))
+        elif self.collector_radio.isChecked():
+            self.ingest.add(CollectorTransport(COLLECTOR_HOST, COLLECTOR_FEED_PORT))
         else:
-            self.mqtt_thread = Thread(target=self.read_mqtt, daemon=True)
-            self.mqtt_thread.start()
+            self.ingest.add(MqttTransport(
+                MQTT_BROKER, [MQTT_TOPIC, MQTT_DEVICE_TOPIC], qos=MQTT_QOS,
+                client_id=MQTT_CLIENT_ID or mqtt_client_id("Dashboard", self.logs_dir)
+            ))
 
         QTimer.singleShot(100, self.update_plot)
 
     def stop_stream(self):
         self.running = False
-        self.stop_event.set()
+        self.ingest.stop_all()
+        self.serial_port = None
+        self.drain_ingest_queue()
+        self.session_log.flush(sync=True)
+        self.history.flush()
         self.start_btn.setEnabled(False)
         self.warning_label.show()
         self.stop_btn.setEnabled(False)
-        if self.mqtt_client:
-            try:
-                self.mqtt_client.loop_stop()
-                self.mqtt_client.disconnect()
-            except Exception as e:
-                print(f"[MQTT] Cleanup Error: {e}")
-            finally:
-                self.mqtt_client = None
 
     def clear_plot(self):
-        self.relative_data.clear()
-        self.relative_timestamps.clear()
-        self.gmt_data.clear()
-        self.gmt_timestamps.clear()
-        self.ax.cla()
-        self.ax.set_xlabel("Time (ms)")
-        self.ax.set_ylabel("Lux")
-        self.canvas.draw()
+        self.drain_ingest_queue()
         self.start_btn.setEnabled(True)
         self.warning_label.hide()
-        if self.session_data:
-            temp_path = os.path.join(self.logs_dir, "temp_log.csv")
-            write_temp_log(temp_path, self.session_data)
-        self.session_data.clear()
+        self.session_log.flush(sync=True)
+        self.streams.clear()
+        self.fit_session_view()
 
     def reset_timer(self):
         self.timer_start_time = time.time()
         self.clear_plot()
 
     def export_csv(self):
-        if not self.session_data:
+        self.drain_ingest_queue()
+        if not any(stream.session for stream in self.streams):
             QMessageBox.information(self, "No Data", "No session data to export.")
             return
 
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        filename = f"lux_data_{timestamp}.csv"
-        filepath = os.path.join(self.logs_dir, filename)
-
-        if write_summary_csv(filepath, self.session_data):
-            QMessageBox.information(self, "Export Successful", f"Data exported to:\n{filepath}")
-            self.session_data.clear()
-            upload_to_s3(filepath)
-        else:
+        exported, failed = export_streams(self.streams, self.logs_dir, binary=EXPORT_BINARY,
+                                          parquet=EXPORT_PARQUET)
+        for filepath in exported:
+            self.s3_uploader.enqueue(filepath)
+        if exported:
+            QMessageBox.information(self, "Export Successful", "Data exported to:\n" + "\n".join(exported))
+            self.s3_status.setText(f"S3: Queued {os.path.basename(exported[0])}" if len(exported) == 1
+                                   else f"S3: Queued {len(exported)} files")
+        if failed:
             QMessageBox.warning(self, "Export Failed", "Could not export data.")
 
     def update_plot(self):
         if self.running:
-            self.ax.cla()
-            if self.timestamp_mode == "GMT":
-                timestamps_copy = list(self.gmt_timestamps)
-                data = list(self.gmt_data)
-                times = [ts.strftime("%H:%M:%S") for ts in timestamps_copy]
-                self.ax.set_xlabel("Time (GMT)")
+            self.drain_ingest_queue()
+            self.session_log.tick()
+            history_flushed = self.history.tick()
+            if self.view_mode == "Session":
+                self.refresh_session_view()
+            elif self.view_mode == "History":
+                if history_flushed:
+                    self.refresh_history_view()
             else:
-                times = list(self.relative_timestamps)
-                data = list(self.relative_data)
-                self.ax.set_xlabel("Time (ms)")
-
-            self.ax.plot(times, data, label="Lux", color="blue")
-            self.ax.set_ylabel("Lux")
-            self.ax.set_title("Real-Time Light Sensor Data")
-            self.ax.legend()
-            self.ax.grid(True)
-            self.canvas.draw()
+                self.update_live_view()
             QTimer.singleShot(100, self.update_plot)
 
-    def read_serial(self, port):
-        try:
-            with serial.Serial(port, 115200, timeout=1) as ser:
-                while self.running and not self.stop_event.is_set():
-                    line = ser.readline().decode().strip()
-                    if line:
-                        self.process_data_line(line)
-        except Exception as e:
-            print(f"[Serial] Error: {e}")
-
-    def read_mqtt(self):
-        if self.mqtt_client is not None and self.mqtt_thread and self.mqtt_thread.is_alive():
+    def update_live_view(self):
+        self.renderer.set_time_mode(self.timestamp_mode)
+        if self.overlay_devices:
+            self.renderer.update_overlay({
+                stream.device: self._live_xy(stream.buffer) for stream in self.streams if len(stream.buffer)
+            })
+        else:
+            self.renderer.update(*self._live_xy(self.live_buffer))
+
+    def _live_xy(self, buffer):
+        epoch_ns, lux = buffer.window()
+        if self.timestamp_mode == "GMT":
+            return epoch_ns_to_datenum(epoch_ns), lux.copy()
+        return buffer.relative_ms(int((self.timer_start_time or 0) * NS_PER_SEC)), lux.copy()
+
+    def _epoch_to_x(self, epoch_ns, origin_ns):
+        if self.timestamp_mode == "GMT":
+            return epoch_ns_to_datenum(epoch_ns)
+        return (epoch_ns - origin_ns) / 1e6
+
+    def _x_to_epoch(self, x, origin_ns):
+        if self.timestamp_mode == "GMT":
+            return datenum_to_epoch_ns(x)
+        return int(origin_ns + x * 1e6)
+
+    def refresh_session_view(self):
+        """Draw the whole session (or the zoomed part of it) at about two points per pixel."""
+        self._view_refresh_pending = False
+        self.renderer.set_time_mode(self.timestamp_mode)
+        if not self.session_data:
+            self.renderer.update([], [])
             return
 
-        def on_connect(client, userdata, flags, rc):
-            client.subscribe(MQTT_TOPIC)
-
-        def on_message(client, userdata, msg):
-            try:
-                payload = json.loads(msg.payload.decode())
-                lux = payload.get("lux")
-                if lux is not None:
-                    self.append_data(lux)
-                    if time.time() - self.last_aio_send_time >= AIO_SEND_INTERVAL_SEC:
-                        self.last_aio_send_time = time.time()
-                        Thread(target=self._send_lux_to_adafruit, args=(lux,), daemon=True).start()
-            except Exception as e:
-                print(f"[MQTT] Error: {e}")
-
+        # Epoch of relative time 0, so relative x values line up with the live view
+        rel, epoch, _ = self.session_data.slice_columns(0, 1)
+        origin_ns = int(epoch[0]) - int(rel[0]) * 1_000_000
+        start_ns = end_ns = None
+        if self.session_zoomed:
+            x_lo, x_hi = self.ax.get_xlim()
+            start_ns, end_ns = self._x_to_epoch(x_lo, origin_ns), self._x_to_epoch(x_hi, origin_ns)
+
+        max_points = 2 * max(int(self.ax.bbox.width), 100)
+        epoch, lux = self.selected_stream.session_lod().query(start_ns, end_ns, max_points)
+        self._setting_view = True
         try:
-            self.mqtt_client = mqtt.Client(client_id="DashboardClient")
-            self.mqtt_client.on_connect = on_connect
-            self.mqtt_client.on_message = on_message
-            self.mqtt_client.connect(MQTT_BROKER, 1883, 60)
-            self.mqtt_client.loop_start()
-            while self.running and not self.stop_event.is_set():
-                time.sleep(0.1)
-        except Exception as e:
-            print(f"[MQTT] Connection Error: {e}")
+            self.renderer.update(self._epoch_to_x(epoch, origin_ns), lux, autoscale=not self.session_zoomed)
+        finally:
+            self._setting_view = False
+
+    def refresh_history_view(self):
+        """Draw the chosen window (or the zoomed part of it) of the local history store."""
+        self._view_refresh_pending = False
+        # Past windows are only meaningful on the wall clock
+        self.renderer.set_time_mode("GMT")
+        if self.session_zoomed:
+            x_lo, x_hi = self.ax.get_xlim()
+            start_ns, end_ns = datenum_to_epoch_ns(x_lo), datenum_to_epoch_ns(x_hi)
+        else:
+            end_ns = time.time_ns()
+            start_ns = end_ns - HISTORY_RANGES[self.history_range.currentText()] * NS_PER_SEC
+
+        max_points = 2 * max(int(self.ax.bbox.width), 100)
+        devices = self.history.devices() if self.overlay_devices else [self.selected_device]
+        series = {}
+        for device in devices:
+            epoch, lux = self.history.query(device, start_ns, end_ns, max_points)
+            if len(epoch):
+                series[device] = (epoch_ns_to_datenum(epoch), lux)
+        self._setting_view = True
+        try:
+            if self.overlay_devices:
+                self.renderer.update_overlay(series, autoscale=not self.session_zoomed)
+            else:
+                self.renderer.update(*series.get(self.selected_device, ([], [])),
+                                     autoscale=not self.session_zoomed)
+        finally:
+            self._setting_view = False
+
+    def _refresh_pinned_view(self):
+        if self.view_mode == "History":
+            self.refresh_history_view()
+        else:
+            self.refresh_session_view()
 
-    def _send_lux_to_adafruit(self, lux):
-        status = send_to_adafruit(lux)
-        self.adafruit_status.setText("Adafruit IO: Updated" if status else "Adafruit IO: Error")
+    def fit_session_view(self):
+        """Drop any pan/zoom and redraw the current view from scratch."""
+        self.session_zoomed = False
+        self._setting_view = True
+        try:
+            self.renderer.reset()
+        finally:
+            self._setting_view = False
+        if self.view_mode == "Session":
+            self.refresh_session_view()
+        elif self.view_mode == "History":
+            self.history.flush()  # include readings still waiting for the next write
+            self.refresh_history_view()
+        elif not self.running:
+            self.update_live_view()
+
+    def _on_xlim_changed(self, ax):
+        # Limits set by pan/zoom (not by our own autoscaling) pin the session and history views
+        if self._setting_view or self.view_mode not in ("Session", "History"):
+            return
+        self.session_zoomed = True
+        if (not self.running or self.view_mode == "History") and not self._view_refresh_pending:
+            self._view_refresh_pending = True
+            QTimer.singleShot(0, self._refresh_pinned_view)
+
+    def _show_s3_progress(self, filepath, sent, total):
+        percent = int(sent * 100 / total) if total else 100
+        self.s3_status.setText(f"S3: Uploading {os.path.basename(filepath)} ({percent}%)")
+        self.s3_status.setStyleSheet("color: gray; font-size: 14px;")
+
+    def _show_s3_done(self, filepath, ok):
+        name = os.path.basename(filepath)
+        self.s3_status.setText(f"S3: Uploaded {name}" if ok else f"S3: Upload failed, will retry {name}")
+        self.s3_status.setStyleSheet("color: green;" if ok else "color: red;")
+
+    def _set_adafruit_status(self, status, message=""):
+        if status:
+            self.adafruit_status.setText("Adafruit IO: Updated")
+        else:
+            self.adafruit_status.setText(f"Adafruit IO: Error ({message})" if message else "Adafruit IO: Error")
         self.adafruit_status.setStyleSheet("color: green;" if status else "color: red;")
 
     def process_data_line(self, line):
-        try:
-            parts = line.split(",")
-            if len(parts) == 2:
-                lux = float(parts[1])
-                self.append_data(lux)
-                if time.time() - self.last_aio_send_time >= AIO_SEND_INTERVAL_SEC:
-                    self.last_aio_send_time = time.time()
-                    Thread(target=self._send_lux_to_adafruit, args=(lux,), daemon=True).start()
-        except ValueError:
-            pass
-
-    def append_data(self, lux):
+        lux = parse_serial_line(line)
+        if lux is not None:
+            self.append_data(lux)
+
+    def _on_reading(self, device, lux, timestamp=None):
+        self.append_data(lux, device, timestamp)
+
+    def _on_readings(self, readings):
+        # A whole decoded batch in one queue operation
         if self.paused:
             return
         now = time.time()
-        if self.timer_start_time is None:
-            self.timer_start_time = now
-        rel_ts = int((now - self.timer_start_time) * 1000)
-        gmt_ts = datetime.datetime.utcnow()
-        self.relative_timestamps.append(rel_ts)
-        self.relative_data.append(lux)
-        self.gmt_timestamps.append(gmt_ts)
-        self.gmt_data.append(lux)
+        self.ingest_queue.put_many([(now if timestamp is None else timestamp, device, lux)
+                                    for device, lux, timestamp in readings])
 
+    def append_data(self, lux, device=DEFAULT_DEVICE, timestamp=None):
+        # Called from the ingest loop thread: only queue the reading here,
+        # the GUI thread applies it in drain_ingest_queue
+        if self.paused:
+            return
+        self.ingest_queue.put((time.time() if timestamp is None else timestamp, device, lux))
+
+    def drain_ingest_queue(self):
+        batch = self.ingest_queue.drain()
+        if not batch:
+            return 0
+
+        if self.timer_start_time is None:
+            self.timer_start_time = batch[0][0]
+        updated = self.streams.ingest(batch, self.timer_start_time, self.session_log)
+        self.history.append_many(batch)
+        if self.selected_stream in updated:
+            epoch_ns, lux = self.live_buffer.latest
+            self.aio_uploader.submit(lux, epoch_ns / NS_PER_SEC)
+            self._update_stat_labels()
+        return len(batch)
+
+    def _update_stat_labels(self):
+        latest = self.live_buffer.latest
+        if latest is None:
+            return
+        epoch_ns, lux = latest
         self.current_lux_label.setText(f"Current Lux: {lux:.2f}")
-        self.min_label.setText(f"Min: {min(self.gmt_data):.2f}")
-        self.max_label.setText(f"Max: {max(self.gmt_data):.2f}")
-        self.avg_label.setText(f"Avg: {sum(self.gmt_data)/len(self.gmt_data):.2f}")
-        self.updated_label.setText(f"Last Updated: {gmt_ts.strftime('%H:%M:%S')}")
-        self.session_data.append((rel_ts, gmt_ts.strftime("%Y-%m-%d %H:%M:%S"), lux))
+        self.min_label.setText(f"Min: {self.stats.min:.2f}")
+        self.max_label.setText(f"Max: {self.stats.max:.2f}")
+        self.avg_label.setText(f"Avg: {self.stats.mean:.2f}")
+        self.updated_label.setText(f"Last Updated: {time.strftime('%H:%M:%S', time.gmtime(epoch_ns // NS_PER_SEC))}")
 
     def recover_from_temp_log(self):
-        temp_path = os.path.join(self.logs_dir, "temp_log.csv")
-        if not os.path.exists(temp_path):
+        temp_path = self.session_log.path
+        self.session_log.flush(sync=True)
+        if not session_log_segments(temp_path):
             QMessageBox.information(self, "No Temp Log", "No temp_log.csv file found.")
             return
         try:
-            self.session_data.clear()
-            with open(temp_path, newline='') as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    if row and row[0].isdigit():
-                        self.session_data.append((int(row[0]), row[1], float(row[2])))
+            sessions = {}
+            for device, rel_ts, epoch_ns, lux in replay_device_log(temp_path):
+                session = sessions.get(device)
+                if session is None:
+                    session = sessions[device] = SessionStore()
+                session.append(rel_ts, epoch_ns, lux)
+            for stream in self.streams:
+                stream.session = SessionStore()
+            for device, session in sessions.items():
+                self.streams.get(device or DEFAULT_DEVICE).session = session
+            if self.view_mode == "Session":
+                self.fit_session_view()
             QMessageBox.information(self, "Recovery Successful", "Data recovered from temp_log.csv.")
         except Exception as e:
             QMessageBox.warning(self, "Recovery Failed", f"Could not recover data:\n{e}")
 
     def clear_temp_log(self):
-        temp_path = os.path.join(self.logs_dir, "temp_log.csv")
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        if self.session_log.remove():
             QMessageBox.information(self, "Temp Log Cleared", "temp_log.csv has been deleted.")
         else:
             QMessageBox.information(self, "No Temp Log", "No temp_log.csv file to delete.")
 
     def closeEvent(self, event):
-        if self.session_data:
-            write_temp_log(os.path.join(self.logs_dir, "temp_log.csv"), self.session_data)
         self.stop_stream()
+        self.ingest.stop()
+        self.session_log.close()
+        self.history.close()
+        self.streams.close()
+        self.aio_uploader.stop()
+        self.s3_uploader.shutdown()
+        self.port_poll_timer.stop()
+        self.port_prober.shutdown()
         super().closeEvent(event)
\ No newline at end of file
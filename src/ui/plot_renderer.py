@@ -0,0 +1,165 @@
+# src/ui/plot_renderer.py
+import numpy as np
+import matplotlib.dates as mdates
+from matplotlib.ticker import AutoLocator, ScalarFormatter
+
+NS_PER_DAY = 86400 * 1_000_000_000
+# Matplotlib date number of the Unix epoch
+MPL_UNIX_EPOCH = mdates.date2num(np.datetime64("1970-01-01T00:00:00"))
+
+
+def epoch_ns_to_datenum(epoch_ns):
+    """Convert epoch nanoseconds to matplotlib date numbers for the GMT axis."""
+    return MPL_UNIX_EPOCH + np.asarray(epoch_ns) / NS_PER_DAY
+
+
+def datenum_to_epoch_ns(datenum):
+    return int((datenum - MPL_UNIX_EPOCH) * NS_PER_DAY)
+
+
+class BlitPlotRenderer:
+    """Draws the live lux trace (or one trace per device) by blitting persistent Line2Ds.
+
+    The axes decorations (title, legend, grid, ticks) are rendered once into a
+    cached background. Each tick only restores that background, redraws the
+    line and blits the axes region. A full redraw happens only when new data
+    falls outside the current axis limits or the time mode changes.
+    """
+
+    MAX_LEGEND_ENTRIES = 12
+
+    def __init__(self, canvas, ax, x_headroom=0.25, y_padding=0.1):
+        self.canvas = canvas
+        self.ax = ax
+        self.x_headroom = x_headroom
+        self.y_padding = y_padding
+        self.time_mode = "Relative"
+        self.full_draws = 0
+        self.blits = 0
+        self._background = None
+        self.overlay_lines = {}
+
+        self.line, = ax.plot([], [], label="Lux", color="blue", animated=True)
+        ax.set_title("Real-Time Light Sensor Data")
+        ax.set_ylabel("Lux")
+        self._set_legend([self.line])
+        ax.grid(True)
+        self._apply_time_mode()
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _on_draw(self, event):
+        # Cache everything except the animated lines, then paint the lines on top
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self):
+        self.ax.draw_artist(self.line)
+        for line in self.overlay_lines.values():
+            self.ax.draw_artist(line)
+
+    def _set_legend(self, lines):
+        legend = self.ax.get_legend()
+        if legend is not None:
+            legend.remove()
+        if 0 < len(lines) <= self.MAX_LEGEND_ENTRIES:
+            self.ax.legend(handles=lines, loc="upper left", fontsize="small" if len(lines) > 1 else None)
+
+    def _apply_time_mode(self):
+        if self.time_mode == "GMT":
+            locator = mdates.AutoDateLocator()
+            self.ax.xaxis.set_major_locator(locator)
+            self.ax.xaxis.set_major_formatter(mdates.DateFormatter("%H:%M:%S"))
+            self.ax.set_xlabel("Time (GMT)")
+        else:
+            self.ax.xaxis.set_major_locator(AutoLocator())
+            self.ax.xaxis.set_major_formatter(ScalarFormatter())
+            self.ax.set_xlabel("Time (ms)")
+
+    def set_time_mode(self, mode):
+        if mode == self.time_mode:
+            return
+        self.time_mode = mode
+        self._apply_time_mode()
+        self._background = None
+
+    def reset(self):
+        self.line.set_data([], [])
+        for line in self.overlay_lines.values():
+            line.set_data([], [])
+        self.ax.set_xlim(0, 1)
+        self.ax.set_ylim(0, 1)
+        self.full_draw()
+
+    def full_draw(self):
+        self.full_draws += 1
+        self.canvas.draw()
+
+    def _rescale_if_needed(self, x_min, x_max, y_min, y_max):
+        x_lo, x_hi = self.ax.get_xlim()
+        y_lo, y_hi = self.ax.get_ylim()
+        if x_lo <= x_min and x_max <= x_hi and y_lo <= y_min and y_max <= y_hi:
+            return False
+
+        x_span = (x_max - x_min) or 1.0
+        if self.time_mode == "GMT":
+            x_span = max(x_span, 1.0 / 86400)  # at least one second in date units
+        y_span = (y_max - y_min) or max(abs(y_max), 1.0)
+        self.ax.set_xlim(x_min, x_max + x_span * self.x_headroom)
+        self.ax.set_ylim(y_min - y_span * self.y_padding, y_max + y_span * self.y_padding)
+        return True
+
+    def _show_overlay(self, overlay):
+        if self.line.get_visible() != (not overlay):
+            self.line.set_visible(not overlay)
+            for line in self.overlay_lines.values():
+                line.set_visible(overlay)
+            self._set_legend(list(self.overlay_lines.values()) if overlay else [self.line])
+            self._background = None
+
+    def update(self, x, y, autoscale=True):
+        """Show (x, y). With autoscale off the current (e.g. user-zoomed) limits are kept."""
+        self._show_overlay(False)
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.line.set_data(x, y)
+        if len(x) == 0:
+            return
+
+        # x is time-ordered, so its extent is just the two end points
+        rescaled = autoscale and self._rescale_if_needed(x[0], x[-1], y.min(), y.max())
+        self._present(rescaled)
+
+    def update_overlay(self, series, autoscale=True):
+        """Show one trace per label from a `{label: (x, y)}` dict, blitted together."""
+        self._show_overlay(True)
+        new_labels = [label for label in series if label not in self.overlay_lines]
+        for label in new_labels:
+            self.overlay_lines[label], = self.ax.plot([], [], label=label, linewidth=1, animated=True)
+        if new_labels:
+            self._set_legend(list(self.overlay_lines.values()))
+            self._background = None
+
+        extents = []
+        for label, line in self.overlay_lines.items():
+            x, y = series.get(label, ((), ()))
+            x = np.asarray(x, dtype=float)
+            y = np.asarray(y, dtype=float)
+            line.set_data(x, y)
+            if len(x):
+                extents.append((x[0], x[-1], y.min(), y.max()))
+        if not extents:
+            return
+
+        x_min, x_max, y_min, y_max = np.array(extents).T
+        rescaled = autoscale and self._rescale_if_needed(x_min.min(), x_max.max(), y_min.min(), y_max.max())
+        self._present(rescaled)
+
+    def _present(self, rescaled):
+        if rescaled or self._background is None:
+            self.full_draw()
+            return
+
+        self.canvas.restore_region(self._background)
+        self._draw_lines()
+        self.canvas.blit(self.ax.bbox)
+        self.blits += 1
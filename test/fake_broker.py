@@ -0,0 +1,134 @@
+# test/fake_broker.py
+"""Just enough of an MQTT 3.1.1 broker to test the dashboard's client against."""
+
+import asyncio
+import struct
+from threading import Thread
+
+
+def _encode_length(length):
+    out = bytearray()
+    while True:
+        byte, length = length % 128, length // 128
+        out.append(byte | (0x80 if length else 0))
+        if not length:
+            return bytes(out)
+
+
+def _packet(header, body=b""):
+    return bytes([header]) + _encode_length(len(body)) + body
+
+
+def _string(data, pos):
+    (length,) = struct.unpack_from("!H", data, pos)
+    return data[pos + 2:pos + 2 + length].decode(), pos + 2 + length
+
+
+def topic_matches(pattern, topic):
+    p, t = pattern.split("/"), topic.split("/")
+    if p and p[-1] == "#":
+        return t[:len(p) - 1] == p[:-1] or all(a in ("+", b) for a, b in zip(p[:-1], t))
+    return len(p) == len(t) and all(a in ("+", b) for a, b in zip(p, t))
+
+
+class FakeBroker:
+    """Runs on its own asyncio loop thread; `publish` may be called from any thread.
+
+    Records CONNECT details and SUBSCRIBE requests, delivers matching
+    publishes to subscribers (with packet ids for QoS 1) and tracks which
+    QoS 1 deliveries are still waiting for their PUBACK.
+    """
+
+    def __init__(self):
+        self.port = None
+        self.connects = []
+        self.subscriptions = []
+        self._clients = []
+        self._unacked = set()
+        self._next_id = 0
+        self._loop = asyncio.new_event_loop()
+        self._thread = Thread(target=self._loop.run_forever, name="FakeBroker", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._serve, "127.0.0.1", 0), self._loop).result(5)
+        self._server = server
+        self.port = server.sockets[0].getsockname()[1]
+
+    def stop(self):
+        async def close():
+            self._server.close()
+            for _, writer in self._clients:
+                writer.close()
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+    def unacked(self):
+        return set(self._unacked)
+
+    def publish(self, topic, payload, qos=0):
+        self._loop.call_soon_threadsafe(self._deliver, topic, payload, qos)
+
+    def _deliver(self, topic, payload, qos):
+        for filters, writer in self._clients:
+            granted = [q for f, q in filters if topic_matches(f, topic)]
+            if not granted:
+                continue
+            level = min(qos, max(granted))
+            body = struct.pack("!H", len(topic)) + topic.encode()
+            if level:
+                self._next_id = self._next_id % 65535 + 1
+                self._unacked.add(self._next_id)
+                body += struct.pack("!H", self._next_id)
+            writer.write(_packet(0x30 | level << 1, body + payload))
+
+    async def _read_packet(self, reader):
+        header = (await reader.readexactly(1))[0]
+        length, shift = 0, 0
+        while True:
+            byte = (await reader.readexactly(1))[0]
+            length += (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        return header, await reader.readexactly(length)
+
+    async def _serve(self, reader, writer):
+        filters = []
+        entry = (filters, writer)
+        try:
+            while True:
+                header, body = await self._read_packet(reader)
+                kind = header >> 4
+                if kind == 1:  # CONNECT
+                    _, pos = _string(body, 0)
+                    flags = body[pos + 1]
+                    client_id, _ = _string(body, pos + 4)
+                    self.connects.append({"client_id": client_id, "clean_session": bool(flags & 0x02)})
+                    writer.write(_packet(0x20, b"\x00\x00"))
+                    self._clients.append(entry)
+                elif kind == 8:  # SUBSCRIBE
+                    packet_id, pos = body[:2], 2
+                    granted = bytearray()
+                    while pos < len(body):
+                        topic, pos = _string(body, pos)
+                        qos = body[pos] & 0x03
+                        pos += 1
+                        filters.append((topic, qos))
+                        self.subscriptions.append((topic, qos))
+                        granted.append(qos)
+                    writer.write(_packet(0x90, packet_id + bytes(granted)))
+                elif kind == 4:  # PUBACK
+                    self._unacked.discard(struct.unpack("!H", body[:2])[0])
+                elif kind == 12:  # PINGREQ
+                    writer.write(_packet(0xD0))
+                elif kind == 14:  # DISCONNECT
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if entry in self._clients:
+                self._clients.remove(entry)
+            writer.close()
@@ -0,0 +1,61 @@
+# test/test_adafruit_uploader.py
+
+import unittest
+from unittest.mock import MagicMock
+from core.adafruit_uploader import AdafruitUploader
+
+def make_response(status_code, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+class TestAdafruitUploader(unittest.TestCase):
+    def setUp(self):
+        self.session = MagicMock()
+        self.session.headers = {}
+        self.statuses = []
+        self.uploader = AdafruitUploader(
+            on_status=lambda ok, msg: self.statuses.append(ok),
+            interval=2, max_batch=5, session=self.session
+        )
+        # Keep the worker thread out of the way; tests drive flush() directly
+        self.uploader._thread = MagicMock()
+
+    def test_coalesces_to_latest_per_slot_and_posts_one_batch(self):
+        self.session.post.return_value = make_response(200)
+        self.uploader.submit(10.0, 100.0)
+        self.uploader.submit(11.0, 101.5)
+        self.uploader.submit(12.0, 102.0)
+        self.assertEqual(self.uploader.flush(), 2)
+        self.session.post.assert_called_once()
+        payload = self.session.post.call_args.kwargs["json"]["data"]
+        self.assertEqual([point["value"] for point in payload], [11.0, 12.0])
+        self.assertEqual(self.statuses, [True])
+
+    def test_throttled_batch_is_retried_after_retry_after(self):
+        self.session.post.return_value = make_response(429, {"Retry-After": "7"})
+        self.uploader.submit(10.0, 100.0)
+        self.assertEqual(self.uploader.flush(), 7.0)
+        self.assertEqual(self.statuses, [False])
+
+        self.session.post.return_value = make_response(200)
+        self.uploader.submit(20.0, 104.0)
+        self.uploader.flush()
+        payload = self.session.post.call_args.kwargs["json"]["data"]
+        self.assertEqual([point["value"] for point in payload], [10.0, 20.0])
+        self.assertEqual(self.uploader.failures, 0)
+
+    def test_connection_error_backs_off_and_bounds_queue(self):
+        self.session.post.side_effect = Exception("offline")
+        for i in range(10):
+            self.uploader.submit(float(i), 100.0 + i * 2)
+        delay = self.uploader.flush()
+        self.assertGreater(delay, 0)
+        self.assertEqual(len(self.uploader._pending), 5)
+
+    def test_client_error_drops_batch(self):
+        self.session.post.return_value = make_response(401)
+        self.uploader.submit(10.0, 100.0)
+        self.uploader.flush()
+        self.assertEqual(self.uploader._pending, {})
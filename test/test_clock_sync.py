@@ -0,0 +1,43 @@
+# test/test_clock_sync.py
+
+import unittest
+import numpy as np
+from core.clock_sync import ClockSync
+
+class TestClockSync(unittest.TestCase):
+    def simulate(self, clock, drift, seconds=600, start_ms=0):
+        rng = np.random.default_rng(1)
+        host0 = 1745100000.0
+        errors = []
+        for ms in range(start_ms, start_ms + seconds * 1000, 70):
+            true = host0 + ms / 1000 * (1 + drift)
+            clock.observe(ms, true + rng.exponential(0.005))  # reads only ever arrive late
+            errors.append(clock.to_host(ms) - true)
+        return np.array(errors)
+
+    def test_estimates_offset_and_drift(self):
+        clock = ClockSync()
+        errors = self.simulate(clock, drift=80e-6)
+        self.assertAlmostEqual(clock.slope, 1 + 80e-6, delta=5e-6)
+        self.assertLess(np.abs(errors[-1000:]).max(), 0.002)
+
+    def test_burst_keeps_device_spacing(self):
+        clock = ClockSync()
+        clock.observe(1000, 500.0)
+        clock.observe(1100, 500.2)  # whole burst read 100 ms late
+        times = clock.to_host(np.array([1110, 1120, 1130]))
+        np.testing.assert_allclose(np.diff(times), [0.01, 0.01])
+        self.assertAlmostEqual(times[0], 500.11, places=6)
+
+    def test_device_reset_resyncs(self):
+        clock = ClockSync()
+        clock.observe(90_000, 1000.0)
+        clock.observe(500, 1001.0)
+        self.assertAlmostEqual(clock.to_host(500), 1001.0)
+
+    def test_output_never_goes_back(self):
+        clock = ClockSync()
+        clock.observe(1000, 10.0)
+        first = clock.to_host(1000)
+        clock.observe(1001, 9.5)  # a much less delayed read moves the offset back
+        self.assertGreaterEqual(clock.to_host(1001), first)
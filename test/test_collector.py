@@ -0,0 +1,87 @@
+# test/test_collector.py
+
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from core.collector import Collector
+from core.ingest import CollectorTransport, format_feed_lines, parse_feed_line
+
+class ListTransport:
+    name = "fake"
+
+    def __init__(self, readings):
+        self.readings = readings
+
+    async def run(self, sink):
+        for device, lux in self.readings:
+            sink(device, lux)
+        await asyncio.sleep(3600)
+
+class TestFeedLines(unittest.TestCase):
+    def test_round_trip(self):
+        data = format_feed_lines([(1745100000.5, "node,1", 12.25)])
+        self.assertEqual(parse_feed_line(data), ("node,1", 12.25, 1745100000.5))
+        self.assertIsNone(parse_feed_line(b"garbage\n"))
+
+class TestCollectorImports(unittest.TestCase):
+    def test_entry_point_does_not_load_gui_stack(self):
+        src = os.path.join(os.path.dirname(__file__), "..", "src")
+        code = "import sys, collector; print('PyQt5' in sys.modules, 'matplotlib' in sys.modules)"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                             env=dict(os.environ, PYTHONPATH=os.path.abspath(src)), check=True)
+        self.assertEqual(out.stdout.split(), ["False", "False"])
+
+class TestCollector(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_collector(self, collector, body):
+        async def scenario():
+            task = asyncio.create_task(collector.run())
+            try:
+                return await body()
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        return asyncio.run(scenario())
+
+    def test_collects_exports_and_uploads_on_shutdown(self):
+        s3 = MagicMock()
+        aio = MagicMock()
+        collector = Collector([ListTransport([("a", 1.0), ("b", 2.0), ("a", 3.0)])], self.tmp_dir.name,
+                              drain_interval=0.01, aio_uploader=aio, s3_uploader=s3)
+        self.run_collector(collector, lambda: asyncio.sleep(0.1))
+        exported = sorted(os.path.basename(call.args[0]) for call in s3.enqueue.call_args_list)
+        self.assertEqual(len(exported), 2)
+        self.assertTrue(exported[0].endswith("_a.csv") and exported[1].endswith("_b.csv"))
+        self.assertTrue(aio.submit.called)
+        with open(os.path.join(self.tmp_dir.name, "temp_log.csv")) as f:
+            self.assertEqual(len(f.readlines()), 3)
+
+    def test_viewer_receives_live_feed(self):
+        collector = Collector([ListTransport([])], self.tmp_dir.name, drain_interval=0.01,
+                              feed_host="127.0.0.1", feed_port=0)
+        readings = []
+
+        async def viewer():
+            while collector._feed_server is None:
+                await asyncio.sleep(0.01)
+            port = collector._feed_server.sockets[0].getsockname()[1]
+            task = asyncio.create_task(CollectorTransport("127.0.0.1", port).run(
+                lambda device, lux, timestamp: readings.append((device, lux))))
+            while not collector._feed_clients:
+                await asyncio.sleep(0.01)
+            collector.sink("node7", 42.0)
+            while not readings:
+                await asyncio.sleep(0.01)
+            task.cancel()
+
+        self.run_collector(collector, lambda: asyncio.wait_for(viewer(), 5))
+        self.assertEqual(readings, [("node7", 42.0)])
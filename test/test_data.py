@@ -2,44 +2,110 @@
 
 import unittest
 import sys
+import os
 import time
+import tempfile
 from PyQt5.QtWidgets import QApplication
 from ui.layout import SensorDashboard
+from unittest.mock import patch
+from core.history import HistoryStore
 
 class TestDataLogic(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         cls.app = QApplication(sys.argv)
-        cls.window = SensorDashboard()
+        cls.logs_dir = tempfile.TemporaryDirectory()
+        with patch("ui.layout.DEFAULT_LOG_DIR", cls.logs_dir.name):
+            cls.window = SensorDashboard()
         cls.window.show()
 
     @classmethod
     def tearDownClass(cls):
         cls.window.close()
         cls.app.quit()
+        cls.logs_dir.cleanup()
 
     def test_append_data_dual_logging(self):
         lux = 123.4
         self.window.timer_start_time = time.time()
         timestamp = int(time.time() * 1000)
         self.window.process_data_line(f"{timestamp},{lux}")
-        self.assertGreater(len(self.window.relative_data), 0)
-        self.assertGreater(len(self.window.gmt_data), 0)
+        self.window.drain_ingest_queue()
+        self.assertGreater(len(self.window.live_buffer), 0)
+        self.assertGreater(len(self.window.session_data), 0)
 
     def test_lux_display_update(self):
         lux = 456.7
         timestamp = int(time.time() * 1000)
         self.window.process_data_line(f"{timestamp},{lux}")
+        self.window.drain_ingest_queue()
         self.assertIn("456.7", self.window.current_lux_label.text())
 
     def test_append_while_paused(self):
         self.window.paused = True
-        pre_len = len(self.window.gmt_data)
+        pre_len = len(self.window.live_buffer)
         self.window.append_data(123.4)
-        post_len = len(self.window.gmt_data)
+        self.window.drain_ingest_queue()
+        post_len = len(self.window.live_buffer)
         self.assertEqual(pre_len, post_len)
         self.window.paused = False  # Reset for future tests
 
+    def test_batch_drain_applies_all_readings(self):
+        pre_len = len(self.window.session_data)
+        for lux in (10.0, 20.0, 30.0):
+            self.window.append_data(lux)
+        self.assertEqual(self.window.drain_ingest_queue(), 3)
+        self.assertEqual(len(self.window.session_data), pre_len + 3)
+        self.assertIn("30.00", self.window.current_lux_label.text())
+
+    def test_session_view_is_downsampled(self):
+        self.window.clear_plot()
+        for i in range(20000):
+            self.window.session_data.append(i, 1745100000_000_000_000 + i * 1_000_000, float(i % 97))
+        self.window.session_view_radio.setChecked(True)
+        self.window.toggle_view_mode()
+        x, y = self.window.renderer.line.get_data()
+        self.assertLessEqual(len(x), 2 * max(int(self.window.ax.bbox.width), 100))
+        self.assertEqual(max(y), 96.0)
+        self.window.live_view_radio.setChecked(True)
+        self.window.toggle_view_mode()
+        self.window.clear_plot()
+
+    def test_history_view_shows_stored_readings(self):
+        live_history = self.window.history
+        with tempfile.TemporaryDirectory() as tmp:
+            self.window.history = HistoryStore(os.path.join(tmp, "history.sqlite3"))
+            try:
+                now = time.time()
+                for i in range(600):
+                    self.window.append_data(100.0 + i % 7, self.window.selected_device, now - 600 + i)
+                self.window.drain_ingest_queue()
+                self.window.history_view_radio.setChecked(True)
+                self.window.toggle_view_mode()
+                self.assertTrue(self.window.history_range.isEnabled())
+                x, y = self.window.renderer.line.get_data()
+                self.assertEqual((len(x), max(y)), (600, 106.0))
+            finally:
+                self.window.live_view_radio.setChecked(True)
+                self.window.toggle_view_mode()
+                self.window.history.close()
+                self.window.history = live_history
+                self.window.clear_plot()
+
+    def test_readings_route_to_device_streams(self):
+        selected = self.window.selected_device
+        pre_len = len(self.window.session_data)
+        for device in ("node1", "node2", "node1"):
+            self.window.append_data(50.0, device)
+        self.window.drain_ingest_queue()
+        self.assertEqual(len(self.window.streams.get("node1").session), 2)
+        self.assertEqual(len(self.window.streams.get("node2").buffer), 1)
+        self.assertEqual(self.window.selected_device, selected)
+        self.assertEqual(len(self.window.session_data), pre_len)
+        self.window.overlay_checkbox.setChecked(True)
+        self.assertIn("node2", self.window.renderer.overlay_lines)
+        self.window.overlay_checkbox.setChecked(False)
+
     def test_empty_serial_line(self):
         self.window.process_data_line("")  # Should be safely ignored
         self.assertTrue(True)  # No exception = pass
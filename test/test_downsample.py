@@ -0,0 +1,71 @@
+# test/test_downsample.py
+
+import unittest
+import numpy as np
+from core.downsample import min_max_downsample, MinMaxPyramid
+from core.session_store import SessionStore
+
+class TestMinMaxDownsample(unittest.TestCase):
+    def test_keeps_extremes(self):
+        x = np.arange(10000)
+        y = np.zeros(10000)
+        y[1234] = 500.0
+        y[8765] = -3.0
+        xs, ys = min_max_downsample(x, y, 100)
+        self.assertLessEqual(len(xs), 200)
+        self.assertEqual(ys.max(), 500.0)
+        self.assertEqual(ys.min(), -3.0)
+        self.assertTrue(np.all(np.diff(xs) >= 0))
+
+    def test_short_input_unchanged(self):
+        xs, ys = min_max_downsample([0, 1, 2], [1.0, 2.0, 3.0], 10)
+        self.assertEqual(list(ys), [1.0, 2.0, 3.0])
+
+class TestMinMaxPyramid(unittest.TestCase):
+    def setUp(self):
+        self.store = SessionStore()
+        self.rng = np.random.default_rng(0)
+        self.lux = self.rng.uniform(0, 1000, 100000)
+        for i, lux in enumerate(self.lux):
+            self.store.append(i, i * 1000, lux)
+        self.pyramid = MinMaxPyramid(self.store)
+
+    def test_full_range_is_bounded_and_exact_at_extremes(self):
+        epoch, lux = self.pyramid.query(max_points=1000)
+        self.assertLessEqual(len(epoch), 1000)
+        self.assertEqual(lux.max(), self.lux.max())
+        self.assertEqual(lux.min(), self.lux.min())
+
+    def test_zoomed_range(self):
+        epoch, lux = self.pyramid.query(20000 * 1000, 30000 * 1000, max_points=500)
+        self.assertLessEqual(len(epoch), 500)
+        self.assertGreaterEqual(lux.max(), self.lux[20000:30000].max())
+        self.assertLessEqual(epoch[0], 20000 * 1000)
+
+    def test_small_range_returns_raw_samples(self):
+        epoch, lux = self.pyramid.query(100 * 1000, 109 * 1000, max_points=500)
+        self.assertTrue(np.allclose(lux, self.lux[99:110]))
+
+    def test_incremental_update_and_reset(self):
+        self.pyramid.query(max_points=1000)
+        for i in range(100000, 100050):
+            self.store.append(i, i * 1000, 5000.0)
+        epoch, lux = self.pyramid.query(max_points=1000)
+        self.assertEqual(lux.max(), 5000.0)
+        self.store.clear()
+        self.store.append(0, 0, 1.0)
+        epoch, lux = self.pyramid.query(max_points=1000)
+        self.assertEqual(list(lux), [1.0])
+
+    def test_clear_then_longer_session_rebuilds(self):
+        store = SessionStore()
+        pyramid = MinMaxPyramid(store)
+        for i in range(5000):
+            store.append(i, i * 1000, 1000.0)
+        pyramid.query(max_points=100)
+        store.clear()
+        for i in range(6000):
+            store.append(i, 10_000_000 + i * 1000, 1.0)
+        epoch, lux = pyramid.query(max_points=100)
+        self.assertEqual(lux.max(), 1.0)
+        self.assertGreaterEqual(epoch[0], 10_000_000)
@@ -6,19 +6,23 @@ import os
 import tempfile
 from PyQt5.QtWidgets import QApplication
 from ui.layout import SensorDashboard
+from unittest.mock import patch
 from core.data_logger import write_temp_log
 
 class TestExportAndRecovery(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         cls.app = QApplication(sys.argv)
-        cls.window = SensorDashboard()
+        cls.logs_dir = tempfile.TemporaryDirectory()
+        with patch("ui.layout.DEFAULT_LOG_DIR", cls.logs_dir.name):
+            cls.window = SensorDashboard()
         cls.window.show()
 
     @classmethod
     def tearDownClass(cls):
         cls.window.close()
         cls.app.quit()
+        cls.logs_dir.cleanup()
 
     def test_temp_log_write_and_recover(self):
         self.window.session_data = [(0, "2025-04-19 22:00:00", 50.0)]
@@ -0,0 +1,126 @@
+# test/test_history.py
+
+import os
+import random
+import unittest
+import tempfile
+from unittest.mock import patch
+from core.history import HistoryStore, encode_chunk, decode_chunk
+from core.session_store import NS_PER_SEC
+
+DAY = 1745107200  # 2025-04-20 00:00 UTC
+
+
+class TestHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "history.sqlite3")
+        self.store = HistoryStore(self.path, flush_interval=0)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def test_chunk_round_trip(self):
+        epoch_ns, lux = decode_chunk(*encode_chunk([5, 15, 15, 40], [1.5, 2.25, -3.0, 4.0]))
+        self.assertEqual(epoch_ns.tolist(), [5, 15, 15, 40])
+        self.assertEqual(lux.tolist(), [1.5, 2.25, -3.0, 4.0])
+
+    def test_range_after_flush(self):
+        self.store.append_many([(DAY + i, "a", 10.0 + i / 100) for i in range(100)])
+        self.store.append_many([(DAY + 1.5, "b", 99.0)])
+        self.assertEqual(len(self.store.range("a")[0]), 0)  # still buffered
+        self.assertTrue(self.store.tick())
+        epoch_ns, lux = self.store.range("a", (DAY + 10) * NS_PER_SEC, (DAY + 20) * NS_PER_SEC)
+        self.assertEqual(epoch_ns[0], (DAY + 10) * NS_PER_SEC)
+        self.assertEqual(lux.tolist(), [10.0 + i / 100 for i in range(10, 20)])
+        self.assertEqual(self.store.devices(), ["a", "b"])
+        self.assertEqual(self.store.time_bounds("b"), ((DAY + 1.5) * NS_PER_SEC,) * 2)
+
+    def test_interleaved_flushes_come_back_in_order(self):
+        self.store.append_many([(DAY + i, "a", float(i)) for i in range(0, 10, 2)])
+        self.store.flush()
+        self.store.append_many([(DAY + i, "a", float(i)) for i in range(1, 10, 2)])
+        self.store.flush()
+        self.assertEqual(self.store.range("a")[1].tolist(), [float(i) for i in range(10)])
+
+    def test_wide_query_uses_rollups_and_keeps_extremes(self):
+        readings = [(DAY + i * 10, "a", float(i % 50)) for i in range(3 * 8640)]  # 3 days every 10 s
+        readings[12345] = (readings[12345][0], "a", 5000.0)
+        self.store.append_many(readings)
+        self.store.append_many([(DAY + 5, "a", 7.0)])  # same minute bucket, second flush
+        self.store.flush()
+        self.store.flush()
+        epoch_ns, lux = self.store.query("a", DAY * NS_PER_SEC, (DAY + 3 * 86400) * NS_PER_SEC, max_points=200)
+        self.assertLessEqual(len(lux), 200)
+        self.assertEqual((lux.max(), lux.min()), (5000.0, 0.0))
+        count, = self.store._db.execute(
+            "SELECT count FROM rollup_60 WHERE device = 'a' AND bucket_ns = ?", (DAY * NS_PER_SEC,)).fetchone()
+        self.assertEqual(count, 7)
+
+    def test_narrow_query_returns_raw_samples(self):
+        self.store.append_many([(DAY + i / 10, "a", float(i)) for i in range(600)])
+        self.store.flush()
+        epoch_ns, lux = self.store.query("a", DAY * NS_PER_SEC, (DAY + 60) * NS_PER_SEC)
+        self.assertEqual(len(lux), 600)
+
+    def test_dense_narrow_window_uses_rollup(self):
+        self.store.append_many([(DAY + i / 100, "a", float(i % 100)) for i in range(60000)])  # 10 min at 100 Hz
+        self.store.flush()
+        with patch.object(self.store, "range") as raw:
+            epoch_ns, lux = self.store.query("a", DAY * NS_PER_SEC, (DAY + 600) * NS_PER_SEC, max_points=200)
+        raw.assert_not_called()
+        self.assertLessEqual(len(lux), 200)
+        self.assertEqual((lux.min(), lux.max()), (0.0, 99.0))
+
+    def test_sparse_wide_window_uses_raw_samples(self):
+        self.store.append_many([(DAY + i * 600, "a", float(i)) for i in range(432)])  # 3 days every 10 min
+        self.store.flush()
+        epoch_ns, lux = self.store.query("a", DAY * NS_PER_SEC, (DAY + 3 * 86400) * NS_PER_SEC)
+        self.assertEqual(lux.tolist(), [float(i) for i in range(432)])
+
+    def test_retention_drops_old_raw_data_but_keeps_rollups(self):
+        self.store.append_many([(DAY + i, "a", 1.0) for i in range(10)])
+        self.store.flush()
+        self.store.append_many([(DAY + 40 * 86400 + i, "a", 2.0) for i in range(10)])
+        self.store.flush()
+        self.store.enforce_retention(now_ns=(DAY + 41 * 86400) * NS_PER_SEC)
+        self.assertEqual(self.store.range("a")[1].tolist(), [2.0] * 10)
+        epoch_ns, lux = self.store.query("a", DAY * NS_PER_SEC, (DAY + 41 * 86400) * NS_PER_SEC, max_points=200)
+        self.assertIn(1.0, lux.tolist())
+
+    def test_size_cap_drops_oldest_chunks(self):
+        rng = random.Random(1)
+        for day in range(4):
+            self.store.append_many([(DAY + day * 86400 + i / 10, "a", rng.random() * 1000)
+                                    for i in range(20000)])
+            self.store.flush()
+        self.store.max_bytes = self.store.size_bytes() // 2
+        self.store.enforce_retention(now_ns=(DAY + 5 * 86400) * NS_PER_SEC)
+        self.assertLessEqual(self.store.size_bytes(), self.store.max_bytes)
+        first, last = self.store.time_bounds("a")
+        self.assertGreater(first, (DAY + 86400) * NS_PER_SEC)
+        self.assertEqual(last, int((DAY + 3 * 86400 + 1999.9) * NS_PER_SEC))
+        # The first day's raw data and 10 s rollups are gone; zooming into it uses the minute rollups
+        epoch_ns, lux = self.store.query("a", DAY * NS_PER_SEC, (DAY + 2000) * NS_PER_SEC)
+        self.assertEqual(len(lux), 2 * 34)
+
+    def test_size_cap_falls_back_to_rollups(self):
+        self.store.append_many([(DAY + i * 60, "a", float(i)) for i in range(5000)])  # one per minute bucket
+        self.store.flush()
+        self.store.max_bytes = 64 * 1024
+        self.store.enforce_retention(now_ns=(DAY + 5 * 86400) * NS_PER_SEC)
+        self.assertLessEqual(self.store.size_bytes(), self.store.max_bytes)
+        self.assertIsNone(self.store.time_bounds("a"))
+        epoch_ns, lux = self.store.query("a", (DAY + 3600) * NS_PER_SEC, (DAY + 7200) * NS_PER_SEC)
+        self.assertGreater(len(lux), 0)
+        self.assertTrue(set(lux.tolist()) <= {float(i) for i in range(60, 120)})
+
+    def test_compact_merges_small_chunks(self):
+        for i in range(20):
+            self.store.append_many([(DAY + i * 10 + k, "a", float(k)) for k in range(10)])
+            self.store.flush()
+        self.store.compact(min_age_s=0)
+        chunks, = self.store._db.execute("SELECT COUNT(*) FROM chunks").fetchone()
+        self.assertEqual(chunks, 1)
+        self.assertEqual(len(self.store.range("a")[0]), 200)
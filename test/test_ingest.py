@@ -0,0 +1,306 @@
+# test/test_ingest.py
+
+import asyncio
+import time
+import unittest
+from threading import Event
+from unittest.mock import patch, MagicMock
+from core import ingest
+from core.ingest import (
+    IngestCore, SerialTransport, MqttTransport, parse_serial_line, parse_mqtt_message,
+    decode_mqtt_batch, mqtt_client_id, BatchSink
+)
+from core.serial_codec import encode_frame
+from test.fake_broker import FakeBroker
+
+class FakeTransport:
+    def __init__(self, name, values):
+        self.name = name
+        self.values = values
+        self.closed = Event()
+
+    async def run(self, sink):
+        try:
+            for lux in self.values:
+                sink(self.name, lux)
+            await asyncio.sleep(3600)
+        finally:
+            self.closed.set()
+
+class FakeSerialAsyncio:
+    """Stands in for the serial_asyncio module; the port sends `chunks`, then closes."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.opened = []
+        self.writer = MagicMock()
+
+    async def open_serial_connection(self, **kwargs):
+        self.opened.append(kwargs)
+        reader = asyncio.StreamReader()
+        for chunk in self.chunks:
+            reader.feed_data(chunk)
+        reader.feed_eof()
+        return reader, self.writer
+
+class BlockingPort:
+    """A serial port whose read blocks until cancel_read, like an idle device."""
+
+    in_waiting = 0
+
+    def __init__(self):
+        self.reading = Event()
+        self.released = Event()
+        self.closed = Event()
+        self.in_read = False
+        self.closed_during_read = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closed_during_read = self.in_read
+        self.closed.set()
+
+    def read(self, size):
+        self.in_read = True
+        self.reading.set()
+        self.released.wait(5)
+        self.in_read = False
+        return b""
+
+    def cancel_read(self):
+        self.released.set()
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+class TestParsers(unittest.TestCase):
+    def test_serial_line(self):
+        self.assertEqual(parse_serial_line("1000,123.4"), 123.4)
+        self.assertIsNone(parse_serial_line("1000,abc"))
+        self.assertIsNone(parse_serial_line("garbage"))
+
+    def test_mqtt_message(self):
+        self.assertEqual(parse_mqtt_message("sensor/lux", b'{"lux": 42.5}'), ("sensor", 42.5))
+        self.assertEqual(parse_mqtt_message("sensor/node7/lux", b'{"lux": 1}'), ("node7", 1.0))
+        self.assertEqual(parse_mqtt_message("sensor/lux", b'{"device": "n2", "lux": 3}'), ("n2", 3.0))
+        self.assertIsNone(parse_mqtt_message("sensor/lux", b'{"temp": 1}'))
+        self.assertIsNone(parse_mqtt_message("sensor/lux", b'not json'))
+
+class TestIngestCore(unittest.TestCase):
+    def setUp(self):
+        self.readings = []
+        self.timestamps = []
+        self.core = IngestCore(sink=self.sink)
+
+    def sink(self, source, lux, timestamp=None):
+        self.readings.append((source, lux))
+        self.timestamps.append(timestamp)
+
+    def tearDown(self):
+        self.core.stop()
+
+    def test_many_transports_share_one_loop(self):
+        transports = [FakeTransport(f"sensor{i}", [float(i)]) for i in range(20)]
+        for transport in transports:
+            self.core.add(transport)
+        self.assertTrue(wait_for(lambda: len(self.readings) == 20))
+        self.assertEqual(sorted(self.core.sources()), sorted(t.name for t in transports))
+
+    def test_remove_cancels_transport(self):
+        transport = FakeTransport("a", [1.0])
+        self.core.add(transport)
+        self.assertTrue(wait_for(lambda: self.readings))
+        self.core.remove("a")
+        self.assertTrue(transport.closed.wait(2))
+        self.assertEqual(self.core.sources(), [])
+
+    def test_stop_closes_transports(self):
+        transport = FakeTransport("a", [])
+        self.core.add(transport)
+        time.sleep(0.05)
+        self.core.stop()
+        self.assertTrue(transport.closed.is_set())
+
+    @patch.object(ingest, "serial_asyncio", None)
+    @patch("serial.Serial")
+    def test_serial_transport_without_pyserial_asyncio(self, mock_serial):
+        port = mock_serial.return_value.__enter__.return_value
+        port.in_waiting = 0
+        port.read.side_effect = [b"1000,12.5\nbad\n2000,13.5\n40", b"00,14.5\n"] + [b""] * 10000
+        self.core.add(SerialTransport("COM9"))
+        self.assertTrue(wait_for(lambda: len(self.readings) == 3))
+        self.assertEqual(self.readings, [("COM9", 12.5), ("COM9", 13.5), ("COM9", 14.5)])
+        # The first two arrived in one read but keep the device's 1 s spacing
+        self.assertAlmostEqual(self.timestamps[1] - self.timestamps[0], 1.0, places=3)
+
+    def test_serial_transport_with_pyserial_asyncio(self):
+        frames = encode_frame(1000, 12.5) + encode_frame(2000, 13.5)
+        fake = FakeSerialAsyncio([frames[:7], frames[7:]])
+        with patch.object(ingest, "serial_asyncio", fake), patch.object(ingest, "ASYNC_SERIAL", True):
+            self.core.add(SerialTransport("COM9", baudrate=230400))
+            self.assertTrue(wait_for(lambda: fake.writer.close.called))
+        self.assertEqual(fake.opened, [{"url": "COM9", "baudrate": 230400}])
+        self.assertEqual(self.readings, [("COM9", 12.5), ("COM9", 13.5)])
+        self.assertAlmostEqual(self.timestamps[1] - self.timestamps[0], 1.0, places=3)
+
+    @patch.object(ingest, "ASYNC_SERIAL", False)
+    @patch("serial.Serial")
+    def test_windows_uses_blocking_reads_even_with_pyserial_asyncio(self, mock_serial):
+        port = mock_serial.return_value.__enter__.return_value
+        port.in_waiting = 0
+        port.read.side_effect = [b"1000,12.5\n"] + [b""] * 10000
+        fake = FakeSerialAsyncio([])
+        with patch.object(ingest, "serial_asyncio", fake):
+            self.core.add(SerialTransport("COM9"))
+            self.assertTrue(wait_for(lambda: self.readings))
+        self.assertEqual(fake.opened, [])
+        self.assertEqual(self.readings, [("COM9", 12.5)])
+
+    @patch.object(ingest, "serial_asyncio", None)
+    def test_cancel_waits_for_the_read_before_closing(self):
+        port = BlockingPort()
+        with patch("serial.Serial", return_value=port):
+            self.core.add(SerialTransport("COM9"))
+            self.assertTrue(port.reading.wait(2))
+            self.core.remove("COM9")
+            self.assertTrue(port.closed.wait(2))
+        self.assertFalse(port.closed_during_read)
+
+class TestMqttTransport(unittest.TestCase):
+    def test_message_reaches_sink(self):
+        readings = []
+        transport = MqttTransport("localhost", ["sensor/lux", "sensor/+/lux"])
+        transport._sink = lambda device, lux, timestamp: readings.append((device, lux))
+        transport._wakeup = asyncio.Event()
+        transport._on_message(None, None, MagicMock(topic="sensor/a1/lux", payload=b'{"lux": 77.0}'))
+        transport._on_message(None, None, MagicMock(topic="sensor/lux", payload=b'{"lux": null}'))
+        self.assertEqual(readings, [])  # the callback only queues
+        transport._decode(list(transport._raw))
+        self.assertEqual(readings, [("a1", 77.0)])
+        self.assertEqual(transport.metrics()["decoded"], 2)
+
+    def test_device_timestamps_keep_spacing(self):
+        stamps = []
+        transport = MqttTransport("localhost", "sensor/+/lux")
+        transport._sink = lambda device, lux, timestamp: stamps.append(timestamp)
+        # One prompt message, then three delivered together 0.5 s late
+        payload = b'{"timestamp": %d, "lux": 1}'
+        transport._decode([("sensor/a1/lux", payload % 0, 95.0)])
+        transport._decode([("sensor/a1/lux", payload % ms, 100.5) for ms in (5000, 5010, 5020)])
+        self.assertEqual(stamps, [95.0, 100.0, 100.01, 100.02])
+
+    def test_batch_decode(self):
+        good = [("sensor/a/lux", b'{"lux": 1}'), ("sensor/lux", b'{"device": "b", "lux": 2}')]
+        self.assertEqual(decode_mqtt_batch(good), [[("a", 1.0, None)], [("b", 2.0, None)]])
+        bad = good + [("sensor/lux", b'1,2'), ("sensor/lux", b'{"temp": 3}')]
+        self.assertEqual(decode_mqtt_batch(bad), [[("a", 1.0, None)], [("b", 2.0, None)], [], []])
+
+    def test_batched_message_reaches_sink_in_one_call(self):
+        calls = []
+        transport = MqttTransport("localhost", "sensor/+/lux")
+        transport._sink = BatchSink(lambda *reading: calls.append([reading]), calls.append)
+        payload = b'{"timestamp": 1000, "interval": 10, "lux": [1, 2, 3]}'
+        transport._decode([("sensor/a1/lux", payload, 50.0), ("sensor/a1/lux", b'{"lux": 4}', 50.1)])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([(d, lux) for d, lux, _ in calls[0]], [("a1", 1.0), ("a1", 2.0), ("a1", 3.0), ("a1", 4.0)])
+        self.assertEqual([t for _, _, t in calls[0]], [49.98, 49.99, 50.0, 50.1])
+
+    def test_client_id_is_stable_per_install(self):
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            first = mqtt_client_id("Dashboard", tmp)
+            self.assertEqual(mqtt_client_id("Dashboard", tmp), first)
+            self.assertNotEqual(mqtt_client_id("Collector", tmp), first)
+        self.assertNotEqual(mqtt_client_id("Dashboard"), mqtt_client_id("Dashboard"))
+
+    def test_backpressure_pauses_reading(self):
+        readings = []
+        transport = MqttTransport("localhost", "sensor/lux", max_queue=50, batch_size=10)
+        transport._sink = lambda device, lux, timestamp: readings.append(lux)
+        transport._loop = MagicMock()
+        transport._sock = sock = object()
+        transport.client = MagicMock()
+
+        async def scenario():
+            transport._wakeup = asyncio.Event()
+            # A burst arrives faster than it is decoded
+            for i in range(60):
+                transport._on_message(None, None, MagicMock(topic="sensor/lux", payload=b'{"lux": %d}' % i))
+            self.assertTrue(transport.metrics()["paused"])
+            transport._loop.remove_reader.assert_called_once_with(sock)
+            task = asyncio.create_task(transport._decode_loop())
+            while transport._raw:
+                await asyncio.sleep(0)
+            task.cancel()
+
+        asyncio.run(scenario())
+        transport._loop.add_reader.assert_called_once_with(sock, transport.client.loop_read)
+        self.assertEqual(readings, [float(i) for i in range(60)])
+        self.assertEqual(transport.metrics()["dropped"], 0)
+        self.assertFalse(transport.metrics()["paused"])
+
+    def test_client_uses_loop_callbacks(self):
+        client = MqttTransport("localhost", "sensor/lux")._make_client()
+        self.assertIsNotNone(client.on_socket_open)
+        self.assertIsNotNone(client.on_socket_register_write)
+
+class TestMqttWithBroker(unittest.TestCase):
+    def setUp(self):
+        self.broker = FakeBroker()
+        self.broker.start()
+        self.readings = []
+        self.core = IngestCore(sink=lambda device, lux, timestamp=None: self.readings.append((device, lux)))
+
+    def tearDown(self):
+        self.core.stop()
+        self.broker.stop()
+
+    def test_qos1_persistent_session(self):
+        transport = MqttTransport("127.0.0.1", ["sensor/+/lux"], port=self.broker.port,
+                                  client_id="Dashboard-test-1", qos=1)
+        self.core.add(transport)
+        self.assertTrue(wait_for(lambda: self.broker.subscriptions, timeout=5))
+        connect = self.broker.connects[0]
+        self.assertEqual(connect["client_id"], "Dashboard-test-1")
+        self.assertFalse(connect["clean_session"])
+        self.assertEqual(self.broker.subscriptions[0], ("sensor/+/lux", 1))
+
+        for i in range(200):
+            self.broker.publish("sensor/n1/lux", b'{"lux": %d}' % i, qos=1)
+        self.assertTrue(wait_for(lambda: len(self.readings) == 200, timeout=5))
+        self.assertEqual(self.readings[-1], ("n1", 199.0))
+        # Every QoS 1 delivery was acknowledged
+        self.assertTrue(wait_for(lambda: not self.broker.unacked(), timeout=5))
+
+    def test_slow_connect_does_not_block_the_loop(self):
+        transport = MqttTransport("127.0.0.1", "sensor/lux", port=self.broker.port)
+        make_client = transport._make_client
+
+        def slow_client():
+            client = make_client()
+            connect = client.connect
+
+            def slow_connect(*args):
+                time.sleep(0.5)  # a broker that takes a while to resolve and accept
+                return connect(*args)
+            client.connect = slow_connect
+            return client
+        transport._make_client = slow_client
+
+        async def scenario():
+            task = asyncio.create_task(transport.run(lambda *reading: None))
+            longest, last = 0.0, time.monotonic()
+            while not self.broker.subscriptions:
+                await asyncio.sleep(0.01)
+                now = time.monotonic()
+                longest, last = max(longest, now - last), now
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return longest
+
+        self.assertLess(asyncio.run(scenario()), 0.25)
@@ -0,0 +1,38 @@
+# test/test_ingest_queue.py
+
+import unittest
+from threading import Thread
+from core.ingest_queue import IngestQueue
+
+class TestIngestQueue(unittest.TestCase):
+    def test_drain_returns_readings_in_order(self):
+        queue = IngestQueue()
+        for i in range(5):
+            queue.put(i)
+        self.assertEqual(list(queue.drain()), [0, 1, 2, 3, 4])
+        self.assertEqual(len(queue), 0)
+
+    def test_overflow_drops_oldest(self):
+        queue = IngestQueue(capacity=3)
+        for i in range(5):
+            queue.put(i)
+        self.assertEqual(list(queue.drain()), [2, 3, 4])
+        self.assertEqual(queue.dropped, 2)
+        self.assertEqual(queue.high_water, 3)
+
+    def test_put_many_counts_drops(self):
+        queue = IngestQueue(capacity=4)
+        queue.put_many(list(range(6)))
+        self.assertEqual(list(queue.drain()), [2, 3, 4, 5])
+        self.assertEqual(queue.counters()["dropped"], 2)
+        self.assertEqual(queue.counters()["received"], 6)
+
+    def test_concurrent_producers(self):
+        queue = IngestQueue(capacity=100000)
+        threads = [Thread(target=lambda: [queue.put(i) for i in range(1000)]) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(queue.drain()), 4000)
+        self.assertEqual(queue.dropped, 0)
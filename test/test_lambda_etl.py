@@ -0,0 +1,128 @@
+# test/test_lambda_etl.py
+
+import os
+import sys
+import gzip
+import datetime
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'lambda_postgres_etl')))
+
+try:
+    import lambda_function
+except ImportError:  # psycopg2 is bundled with the Lambda package, not requirements.txt
+    lambda_function = None
+
+from core.data_logger import write_summary_csv
+
+def export_bytes(values):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "test_lambda_export.csv")
+        write_summary_csv(path, [(i * 10, "2025-04-20 00:00:00", lux) for i, lux in enumerate(values)])
+        with open(path, "rb") as f:
+            return f.read()
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+class FakeBody:
+    def __init__(self, data):
+        self.data = data
+
+    def iter_chunks(self, size):
+        return iter(chunked(self.data, size))
+
+@unittest.skipUnless(lambda_function, "psycopg2 is not installed")
+class TestLambdaETL(unittest.TestCase):
+    def test_summary_is_independent_of_chunking(self):
+        data = export_bytes([float(v) for v in range(1, 501)])
+        for size in (1, 13, 4096, len(data)):
+            self.assertEqual(lambda_function.summarize_csv_stream(chunked(data, size)), (500, 1.0, 500.0, 250.5))
+
+    def test_empty_export_has_no_summary(self):
+        self.assertIsNone(lambda_function.summarize_csv_stream([export_bytes([])]))
+
+    def test_malformed_rows_are_skipped(self):
+        data = b"Relative Timestamp (ms),GMT Timestamp,Lux\r\n0,a,5\r\nbad,row\r\n10,b,x\r\n20,c,7\r\n"
+        self.assertEqual(lambda_function.summarize_csv_stream([data]), (2, 5.0, 7.0, 6.0))
+
+    def test_gzip_objects_are_streamed(self):
+        data = export_bytes([10.0, 20.0])
+        chunks = lambda_function.iter_object_chunks(FakeBody(gzip.compress(data)), "2025/04/20/a.csv.gz")
+        self.assertEqual(lambda_function.summarize_csv_stream(chunks), (2, 10.0, 20.0, 15.0))
+
+    def test_rollup_buckets_by_minute_and_hour(self):
+        data = (b"Relative Timestamp (ms),GMT Timestamp,Lux\r\n"
+                b"0,2025-04-20 00:00:10,1\r\n1,2025-04-20 00:00:50,3\r\n"
+                b"2,2025-04-20 00:01:00,5\r\n3,2025-04-20 01:00:00,7\r\n")
+        rollup = lambda_function.Rollup()
+        # Split mid-minute so the first bucket is merged across blocks
+        lambda_function.summarize_csv_stream(chunked(data, 70), rollup)
+        minutes = lambda_function.Rollup.rows(rollup.minutes)
+        self.assertEqual([row[1:] for row in minutes],
+                         [(2, 4.0, 1.0, 3.0, 10.0), (1, 5.0, 5.0, 5.0, 25.0), (1, 7.0, 7.0, 7.0, 49.0)])
+        self.assertEqual(minutes[0][0], datetime.datetime(2025, 4, 20, tzinfo=datetime.timezone.utc))
+        hours = lambda_function.Rollup.rows(rollup.hours())
+        self.assertEqual([row[1] for row in hours], [3, 1])
+
+    def make_object(self, key, etag):
+        return {"Key": key, "ETag": etag, "LastModified": datetime.datetime(2025, 4, 20, tzinfo=datetime.timezone.utc)}
+
+    def run_handler(self, mock_s3, mock_connect, pages, known_etags, event=None):
+        mock_s3.get_paginator.return_value.paginate.return_value = pages
+        data = export_bytes([10.0, 30.0])
+        mock_s3.get_object.side_effect = lambda Bucket, Key: {
+            "Body": FakeBody(gzip.compress(data) if Key.endswith(".gz") else data)
+        }
+        cursor = mock_connect.return_value.cursor.return_value
+        cursor.fetchone.return_value = (None,)
+        cursor.fetchall.return_value = list(known_etags.items())
+        with patch("lambda_function.execute_values", return_value=[]) as mock_execute:
+            result = lambda_function.lambda_handler(event or {}, None)
+        return result, mock_execute
+
+    @patch("lambda_function.psycopg2.connect")
+    @patch("lambda_function.s3")
+    def test_handler_paginates_and_commits_once(self, mock_s3, mock_connect):
+        pages = [
+            {"Contents": [self.make_object("2025/04/20/lux_data_2025-04-20_00-00-00.csv", '"a"')]},
+            {"Contents": [self.make_object("2025/04/20/lux_data_2025-04-20_01-00-00.csv.gz", '"b"'),
+                          self.make_object("2025/04/20/notes.txt", '"c"')]},
+        ]
+        result, mock_execute = self.run_handler(mock_s3, mock_connect, pages, {})
+
+        self.assertEqual(result, {"status": "success", "files_processed": 2, "files_skipped": 0})
+        calls = {c.args[1].split()[2]: c.args[2] for c in mock_execute.call_args_list}
+        self.assertEqual(len(calls["lux_file_summary"]), 2)
+        self.assertEqual(len(calls["etl_object_state"]), 2)
+        # Both files hold the same minute of readings, merged into one bucket
+        self.assertEqual([row[1:] for row in calls["lux_rollup_minute"]], [(4, 80.0, 10.0, 30.0, 2000.0)])
+        self.assertEqual(len(calls["lux_rollup_hour"]), 1)
+        mock_connect.return_value.commit.assert_called_once()
+
+    @patch("lambda_function.psycopg2.connect")
+    @patch("lambda_function.s3")
+    def test_handler_skips_objects_with_known_etag(self, mock_s3, mock_connect):
+        old_key = "2025/04/20/lux_data_2025-04-20_00-00-00.csv"
+        new_key = "2025/04/20/lux_data_2025-04-20_01-00-00.csv"
+        pages = [{"Contents": [self.make_object(old_key, '"a"'), self.make_object(new_key, '"b"')]}]
+        result, _ = self.run_handler(mock_s3, mock_connect, pages, {old_key: '"a"'})
+
+        self.assertEqual(result["files_processed"], 1)
+        self.assertEqual(result["files_skipped"], 1)
+        mock_s3.get_object.assert_called_once_with(Bucket=lambda_function.S3_BUCKET, Key=new_key)
+
+    def test_date_range_from_watermark(self):
+        cursor = MagicMock()
+        watermark = datetime.datetime(2025, 4, 18, 12, tzinfo=datetime.timezone.utc)
+        cursor.fetchone.return_value = (watermark,)
+        start, end = lambda_function.resolve_date_range(cursor, {}, datetime.date(2025, 4, 20))
+        self.assertEqual(lambda_function.date_prefixes(start, end),
+                         ["2025/04/17/", "2025/04/18/", "2025/04/19/", "2025/04/20/"])
+
+    def test_date_range_from_event(self):
+        start, end = lambda_function.resolve_date_range(
+            MagicMock(), {"start_date": "2025-12-31", "end_date": "2026-01-01"}, datetime.date(2026, 1, 5))
+        self.assertEqual(lambda_function.date_prefixes(start, end), ["2025/12/31/", "2026/01/01/"])
@@ -1,6 +1,14 @@
 import unittest
 import os
-from core.data_logger import write_summary_csv, write_temp_log
+import tempfile
+from core.data_logger import (
+    write_summary_csv, write_temp_log, SessionWAL, session_log_segments, replay_session_log, replay_device_log,
+    write_binary_session, BinarySessionReader, binary_to_csv, StreamingCSVWriter,
+    parquet_available, write_parquet_session, read_parquet_session, parquet_session_info
+)
+from core.session_store import SessionStore
+from core.streams import StreamRegistry
+from core.rolling_stats import SessionSummary
 
 class TestDataLogger(unittest.TestCase):
     def setUp(self):
@@ -24,6 +32,14 @@ class TestDataLogger(unittest.TestCase):
             content = f.read()
             self.assertIn("Summary", content)
 
+    def test_write_summary_csv_uses_running_summary(self):
+        summary = SessionSummary()
+        for _, _, lux in self.test_data:
+            summary.add(lux)
+        write_summary_csv(self.test_path, self.test_data, summary)
+        with open(self.test_path) as f:
+            self.assertIn("100.00,200.00,150.00", f.read())
+
     def test_write_temp_log_success(self):
         write_temp_log(self.test_path, self.test_data)
         self.assertTrue(os.path.exists(self.test_path))
@@ -35,3 +51,193 @@ class TestDataLogger(unittest.TestCase):
             write_temp_log(bad_path, self.test_data)
         except Exception:
             self.assertTrue(True)
+
+
+class TestSessionWAL(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "temp_log.csv")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_append_and_replay(self):
+        wal = SessionWAL(self.path)
+        wal.append(0, 1745100000_000_000_000, 100.0)
+        wal.append(10, 1745100000_010_000_000, 101.5)
+        wal.close()
+        self.assertEqual(list(replay_session_log(self.path)), [
+            (0, 1745100000_000_000_000, 100.0),
+            (10, 1745100000_010_000_000, 101.5),
+        ])
+
+    def test_device_rows(self):
+        wal = SessionWAL(self.path)
+        wal.append(0, 1, 5.0)
+        wal.append(1, 2, 6.0, device="node,7")
+        wal.close()
+        self.assertEqual(list(replay_device_log(self.path)), [(None, 0, 1, 5.0), ("node_7", 1, 2, 6.0)])
+        self.assertEqual(len(list(replay_session_log(self.path))), 2)
+
+    def test_readings_from_before_the_origin_are_replayed(self):
+        # Device-clock timestamps (replayed QoS 1 messages, a buffered serial burst) can predate the timer
+        wal = SessionWAL(self.path)
+        StreamRegistry(window=10).ingest([(1745099995.0, "a", 3.0), (1745100001.0, "a", 4.0)], 1745100000, wal)
+        wal.close()
+        self.assertEqual(list(replay_device_log(self.path)), [
+            ("a", -5000, 1745099995_000_000_000, 3.0),
+            ("a", 1000, 1745100001_000_000_000, 4.0),
+        ])
+
+    def test_tick_flushes_after_interval(self):
+        wal = SessionWAL(self.path, flush_interval=0)
+        wal.append(0, 1, 5.0)
+        wal.tick()
+        self.assertEqual(len(list(replay_session_log(self.path))), 1)
+        wal.close()
+
+    def test_rotation_keeps_order(self):
+        wal = SessionWAL(self.path, max_bytes=64, backup_count=50)
+        for i in range(20):
+            wal.append(i, i, float(i))
+            wal.flush()
+        wal.close()
+        self.assertGreater(len(session_log_segments(self.path)), 1)
+        self.assertEqual([row[0] for row in replay_session_log(self.path)], list(range(20)))
+
+    def test_replay_skips_torn_line_and_reads_legacy_rows(self):
+        write_temp_log(self.path, [(0, "2025-04-20 00:00:00", 100.0)])
+        with open(self.path, "a") as f:
+            f.write("5,1745100000000000000,7.0\n6,17451")
+        rows = list(replay_session_log(self.path))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0][2], 100.0)
+        self.assertEqual(rows[1], (5, 1745100000000000000, 7.0))
+
+    def test_remove_deletes_segments(self):
+        wal = SessionWAL(self.path)
+        wal.append(0, 1, 5.0)
+        wal.close()
+        self.assertTrue(wal.remove())
+        self.assertEqual(session_log_segments(self.path), [])
+        self.assertFalse(wal.remove())
+
+
+class TestBinarySession(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.bin_path = os.path.join(self.tmp_dir.name, "session.lxb")
+        self.store = SessionStore()
+        for i in range(1000):
+            self.store.append(i * 10, 1745100000_000_000_000 + i * 10_000_000, 100.0 + i / 4)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip_with_metadata(self):
+        self.assertTrue(write_binary_session(self.bin_path, self.store, {"device": "lab-1"}))
+        reader = BinarySessionReader(self.bin_path)
+        self.assertEqual(len(reader), 1000)
+        self.assertEqual(reader.metadata, {"device": "lab-1"})
+        self.assertEqual(os.path.getsize(self.bin_path) % 4, 0)
+        self.assertEqual(list(reader.rows())[:2], list(self.store)[:2])
+
+    def test_time_slice(self):
+        write_binary_session(self.bin_path, self.store)
+        reader = BinarySessionReader(self.bin_path)
+        start = 1745100000_000_000_000 + 100 * 10_000_000
+        records = reader.time_slice(start, start + 50 * 10_000_000)
+        self.assertEqual(len(records), 50)
+        self.assertEqual(records["epoch_ns"][0], start)
+
+    def test_binary_to_csv_keeps_layout(self):
+        write_binary_session(self.bin_path, self.store)
+        csv_path = os.path.join(self.tmp_dir.name, "session.csv")
+        self.assertTrue(binary_to_csv(self.bin_path, csv_path))
+        with open(csv_path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], "Relative Timestamp (ms),GMT Timestamp,Lux")
+        self.assertEqual(lines[1], "0,2025-04-19 22:00:00,100.0")
+        self.assertEqual(lines[-1], "100.00,349.75,224.88")
+
+    def test_rejects_foreign_file(self):
+        with open(self.bin_path, "wb") as f:
+            f.write(b"not a session file at all")
+        with self.assertRaises(ValueError):
+            BinarySessionReader(self.bin_path)
+
+
+class TestStreamingCSVWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.part = os.path.join(self.tmp_dir.name, "session.csv.part")
+        self.store = SessionStore()
+        for i in range(3000):
+            self.store.append(i * 10, 1745100000_000_000_000 + i * 10_000_000, 100.0 + i / 4)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read(self, name):
+        with open(os.path.join(self.tmp_dir.name, name), newline='') as f:
+            return f.read()
+
+    def test_matches_write_summary_csv(self):
+        writer = StreamingCSVWriter(self.part)
+        rel_ms, epoch_ns, lux = self.store.columns()
+        for start in range(0, 3000, 700):
+            writer.append_many(rel_ms[start:start + 700].tolist(), epoch_ns[start:start + 700].tolist(),
+                               lux[start:start + 700].tolist())
+        self.assertTrue(writer.finalize(os.path.join(self.tmp_dir.name, "streamed.csv")))
+        write_summary_csv(os.path.join(self.tmp_dir.name, "direct.csv"), self.store)
+        self.assertEqual(self.read("streamed.csv"), self.read("direct.csv"))
+        self.assertFalse(os.path.exists(self.part))
+
+    def test_discard_removes_partial_file(self):
+        writer = StreamingCSVWriter(self.part)
+        writer.append_many([0], [1745100000_000_000_000], [1.0])
+        writer.discard()
+        self.assertEqual(os.listdir(self.tmp_dir.name), [])
+
+    def test_write_failure_is_reported(self):
+        blocker = os.path.join(self.tmp_dir.name, "file")
+        open(blocker, "w").close()
+        writer = StreamingCSVWriter(os.path.join(blocker, "session.csv.part"))
+        writer.append_many([0], [1745100000_000_000_000], [1.0])
+        self.assertFalse(writer.finalize(os.path.join(self.tmp_dir.name, "out.csv")))
+        self.assertTrue(writer.failed)
+
+
+@unittest.skipUnless(parquet_available(), "pyarrow is not installed")
+class TestParquetSession(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "session.parquet")
+        self.store = SessionStore()
+        for i in range(5000):
+            self.store.append(i * 10, 1745100000_000_000_000 + i * 10_000_000, 100.0 + i / 4)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_typed_columns_and_metadata(self):
+        import pyarrow as pa
+        self.assertTrue(write_parquet_session(self.path, self.store, "lab-1", row_group_size=1000))
+        table = read_parquet_session(self.path)
+        self.assertEqual(table.schema.field("timestamp").type, pa.timestamp("ns", tz="UTC"))
+        self.assertEqual(table.schema.field("lux").type, pa.float32())
+        self.assertEqual(table.column("device").to_pylist()[:1], ["lab-1"])
+        self.assertEqual(table.column("lux").to_pylist()[:2], [100.0, 100.25])
+        info = parquet_session_info(self.path)
+        self.assertEqual(info["device"], "lab-1")
+        self.assertEqual(int(info["start_ns"]), 1745100000_000_000_000)
+
+    def test_time_filter_reads_only_the_range(self):
+        import pyarrow.parquet as pq
+        write_parquet_session(self.path, self.store, "lab-1", row_group_size=1000)
+        self.assertEqual(pq.ParquetFile(self.path).metadata.num_row_groups, 5)
+        start = 1745100000_000_000_000 + 1200 * 10_000_000
+        table = read_parquet_session(self.path, start, start + 300 * 10_000_000, columns=["lux"])
+        self.assertEqual(table.column_names, ["lux"])
+        self.assertEqual(table.num_rows, 300)
+        self.assertEqual(table.column("lux")[0].as_py(), 400.0)
@@ -0,0 +1,30 @@
+# test/test_mqtt_codec.py
+
+import unittest
+from core.mqtt_codec import decode_mqtt_payload, encode_batch, parse_mqtt_message
+
+class TestMqttCodec(unittest.TestCase):
+    def test_single_reading_payloads_still_work(self):
+        self.assertEqual(decode_mqtt_payload("sensor/lux", b'{"lux": 42.5}'), [("sensor", 42.5, None)])
+        self.assertEqual(decode_mqtt_payload("sensor/lux", b'{"device": "n1", "timestamp": 7, "lux": 1}'),
+                         [("n1", 1.0, 7)])
+        self.assertEqual(parse_mqtt_message("sensor/n2/lux", b'{"lux": 3}'), ("n2", 3.0))
+
+    def test_json_batch(self):
+        payload = b'{"device": "n1", "timestamp": 1000, "dt": [0, 10, 25], "lux": [1.5, 2.5, 3.5]}'
+        self.assertEqual(decode_mqtt_payload("sensor/lux", payload),
+                         [("n1", 1.5, 1000), ("n1", 2.5, 1010), ("n1", 3.5, 1025)])
+        payload = b'{"timestamp": 1000, "interval": 10, "lux": [1, 2]}'
+        self.assertEqual(decode_mqtt_payload("sensor/n1/lux", payload), [("n1", 1.0, 1000), ("n1", 2.0, 1010)])
+        self.assertEqual(decode_mqtt_payload("sensor/lux", b'{"timestamp": 1, "dt": [0], "lux": [1, 2]}'), [])
+
+    def test_binary_batch(self):
+        payload = encode_batch(123456, [0, 10, 20], [12.34, 0.0, 65535.0])
+        self.assertEqual(len(payload), 8 + 3 * 6)
+        self.assertEqual(decode_mqtt_payload("sensor/bh1750-a1b2c3/lux", payload),
+                         [("bh1750-a1b2c3", 12.34, 123456), ("bh1750-a1b2c3", 0.0, 123466),
+                          ("bh1750-a1b2c3", 65535.0, 123476)])
+
+    def test_truncated_binary_batch_is_rejected(self):
+        payload = encode_batch(1, [0, 10], [1.0, 2.0])
+        self.assertEqual(decode_mqtt_payload("sensor/n1/lux", payload[:-1]), [])
@@ -0,0 +1,54 @@
+# test/test_plot_renderer.py
+
+import unittest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from ui.plot_renderer import BlitPlotRenderer
+
+class TestBlitPlotRenderer(unittest.TestCase):
+    def setUp(self):
+        figure = Figure()
+        self.canvas = FigureCanvasAgg(figure)
+        self.ax = figure.add_subplot(111)
+        self.renderer = BlitPlotRenderer(self.canvas, self.ax)
+
+    def test_line_is_reused_between_frames(self):
+        line = self.renderer.line
+        self.renderer.update([0, 100, 200], [10.0, 20.0, 15.0])
+        self.renderer.update([0, 100, 200, 300], [10.0, 20.0, 15.0, 12.0])
+        self.assertIs(self.renderer.line, line)
+        self.assertEqual(len(self.ax.lines), 1)
+
+    def test_blits_while_data_stays_in_view(self):
+        self.renderer.update([0, 1000], [10.0, 20.0])
+        full_draws = self.renderer.full_draws
+        self.renderer.update([0, 1000, 1100], [10.0, 20.0, 15.0])
+        self.assertEqual(self.renderer.full_draws, full_draws)
+        self.assertEqual(self.renderer.blits, 1)
+
+    def test_rescales_when_data_leaves_view(self):
+        self.renderer.update([0, 1000], [10.0, 20.0])
+        full_draws = self.renderer.full_draws
+        self.renderer.update([0, 1000, 5000], [10.0, 20.0, 500.0])
+        self.assertEqual(self.renderer.full_draws, full_draws + 1)
+        self.assertGreaterEqual(self.ax.get_xlim()[1], 5000)
+        self.assertGreaterEqual(self.ax.get_ylim()[1], 500.0)
+
+    def test_time_mode_switch_forces_full_draw(self):
+        self.renderer.update([0, 1000], [10.0, 20.0])
+        self.renderer.set_time_mode("GMT")
+        self.assertEqual(self.ax.get_xlabel(), "Time (GMT)")
+        full_draws = self.renderer.full_draws
+        self.renderer.update([0, 1000], [10.0, 20.0])
+        self.assertEqual(self.renderer.full_draws, full_draws + 1)
+
+    def test_overlay_draws_one_line_per_series(self):
+        self.renderer.update_overlay({"a": ([0, 100], [1.0, 2.0]), "b": ([0, 100], [5.0, 900.0])})
+        self.assertEqual(set(self.renderer.overlay_lines), {"a", "b"})
+        self.assertFalse(self.renderer.line.get_visible())
+        self.assertGreaterEqual(self.ax.get_ylim()[1], 900.0)
+        blits = self.renderer.blits
+        self.renderer.update_overlay({"a": ([0, 100, 110], [1.0, 2.0, 3.0]), "b": ([0, 100], [5.0, 6.0])})
+        self.assertEqual(self.renderer.blits, blits + 1)
+        self.renderer.update([0, 100], [1.0, 2.0])
+        self.assertTrue(self.renderer.line.get_visible())
@@ -0,0 +1,107 @@
+# test/test_port_probe.py
+
+import os
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from core.port_probe import PortProber, port_identity, probe_port
+from core.serial_codec import encode_frame
+
+def make_port(device, vid=0x10C4, pid=0xEA60, serial_number=None, location=None):
+    return SimpleNamespace(device=device, vid=vid, pid=pid, serial_number=serial_number, location=location)
+
+class TestPortIdentity(unittest.TestCase):
+    def test_identity(self):
+        self.assertEqual(port_identity(make_port("/dev/ttyUSB0", serial_number="A1")), "10c4:ea60:A1")
+        self.assertEqual(port_identity(make_port("/dev/ttyUSB0", location="1-1.2")), "10c4:ea60:1-1.2")
+        self.assertIsNone(port_identity(make_port("/dev/ttyS0", vid=None)))
+        self.assertIsNone(port_identity(make_port("/dev/ttyUSB0")))
+
+class TestProbePort(unittest.TestCase):
+    @patch("serial.Serial")
+    def test_detects_reading(self, mock_serial):
+        ser = mock_serial.return_value.__enter__.return_value
+        ser.read.side_effect = [b"0.25\n10", b"00,123.4\n"]
+        self.assertTrue(probe_port("/dev/ttyUSB0", timeout=1))
+
+    @patch("serial.Serial")
+    def test_detects_binary_frames(self, mock_serial):
+        ser = mock_serial.return_value.__enter__.return_value
+        frame = encode_frame(1000, 123.4) + encode_frame(1010, 124.0)
+        ser.read.side_effect = [frame[:5], frame[5:]]
+        self.assertTrue(probe_port("/dev/ttyUSB0", timeout=1))
+
+    @patch("serial.Serial")
+    def test_corrupt_frame_is_not_a_sensor(self, mock_serial):
+        frame = bytearray(encode_frame(1000, 123.4))
+        frame[-1] ^= 0xFF
+        mock_serial.return_value.__enter__.return_value.read.return_value = bytes(frame)
+        self.assertFalse(probe_port("/dev/ttyUSB0", timeout=0.2))
+
+    @patch("serial.Serial")
+    def test_gives_up_after_timeout(self, mock_serial):
+        mock_serial.return_value.__enter__.return_value.read.return_value = b"hello\n"
+        started = time.monotonic()
+        self.assertFalse(probe_port("/dev/ttyUSB0", timeout=0.2))
+        self.assertLess(time.monotonic() - started, 1)
+
+    @patch("serial.Serial", side_effect=OSError("busy"))
+    def test_unopenable_port(self, mock_serial):
+        self.assertFalse(probe_port("/dev/ttyUSB0"))
+
+class TestPortProber(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp_dir.name, "port_cache.json")
+        self.results = []
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_prober(self, probe):
+        return PortProber(self.cache_path, on_result=lambda *r: self.results.append(r), probe=probe)
+
+    def test_probes_ports_concurrently(self):
+        def slow_probe(device):
+            time.sleep(0.3)
+            return device == "/dev/ttyUSB5"
+
+        ports = [make_port(f"/dev/ttyUSB{i}", serial_number=str(i)) for i in range(8)]
+        prober = self.make_prober(slow_probe)
+        started = time.monotonic()
+        futures = prober.scan(ports)
+        self.assertLess(time.monotonic() - started, 0.1)  # scan itself never blocks
+        self.assertEqual([f.result(timeout=5) for f in futures].count(True), 1)
+        self.assertLess(time.monotonic() - started, 1.5)
+        self.assertIn(("/dev/ttyUSB5", True), self.results)
+        prober.shutdown()
+
+    def test_cached_port_skips_probing(self):
+        ports = [make_port("/dev/ttyUSB0", serial_number="A"), make_port("/dev/ttyUSB1", serial_number="B")]
+        first = self.make_prober(lambda device: device == "/dev/ttyUSB1")
+        for future in first.scan(ports):
+            future.result(timeout=5)
+        first.shutdown()
+
+        # A new run (and a new device name) still finds it without opening any port
+        def fail_probe(device):
+            raise AssertionError("should not probe")
+
+        second = self.make_prober(fail_probe)
+        self.results.clear()
+        moved = [make_port("/dev/ttyUSB0", serial_number="A"), make_port("/dev/ttyUSB3", serial_number="B")]
+        self.assertEqual(second.scan(moved), [])
+        self.assertEqual(self.results, [("/dev/ttyUSB3", True)])
+        self.assertEqual(len(second.scan(moved, force=True)), 2)
+        second.shutdown()
+
+    def test_busy_port_is_not_probed(self):
+        probed = []
+        prober = self.make_prober(lambda device: probed.append(device) or False)
+        ports = [make_port(f"/dev/ttyUSB{i}", serial_number=str(i)) for i in range(3)]
+        for future in prober.scan(ports, force=True, busy={"/dev/ttyUSB1"}):
+            future.result(timeout=5)
+        self.assertEqual(sorted(probed), ["/dev/ttyUSB0", "/dev/ttyUSB2"])
+        prober.shutdown()
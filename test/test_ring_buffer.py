@@ -0,0 +1,34 @@
+# test/test_ring_buffer.py
+
+import unittest
+import numpy as np
+from core.ring_buffer import SampleRingBuffer
+
+class TestSampleRingBuffer(unittest.TestCase):
+    def test_window_is_time_ordered_after_wrap(self):
+        buffer = SampleRingBuffer(capacity=4)
+        for i in range(10):
+            buffer.append(i * 1_000_000, float(i))
+        epoch_ns, lux = buffer.window()
+        self.assertEqual(len(buffer), 4)
+        self.assertEqual(list(lux), [6.0, 7.0, 8.0, 9.0])
+        self.assertEqual(list(buffer.relative_ms(0)), [6.0, 7.0, 8.0, 9.0])
+        self.assertEqual(buffer.latest, (9_000_000, 9.0))
+
+    def test_extend_matches_append(self):
+        appended = SampleRingBuffer(capacity=5)
+        extended = SampleRingBuffer(capacity=5)
+        extended.extend([0, 1], [0.0, 1.0])
+        for i in range(9):
+            appended.append(i, float(i))
+        extended.extend(np.arange(2, 9), np.arange(2, 9, dtype=float))
+        for a, b in zip(appended.window(), extended.window()):
+            self.assertEqual(list(a), list(b))
+
+    def test_clear(self):
+        buffer = SampleRingBuffer(capacity=3)
+        buffer.append(1, 1.0)
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(len(buffer.window()[1]), 0)
+        self.assertIsNone(buffer.latest)
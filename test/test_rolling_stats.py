@@ -0,0 +1,55 @@
+# test/test_rolling_stats.py
+
+import random
+import statistics
+import unittest
+from core.rolling_stats import RollingStats, SessionSummary
+
+class TestRollingStats(unittest.TestCase):
+    def test_matches_full_rescan(self):
+        stats = RollingStats(window=50)
+        values = [random.uniform(0, 1000) for _ in range(1000)]
+        for i, value in enumerate(values):
+            stats.push(value)
+            window = values[max(0, i - 49):i + 1]
+            self.assertEqual(stats.min, min(window))
+            self.assertEqual(stats.max, max(window))
+            self.assertAlmostEqual(stats.mean, sum(window) / len(window), places=6)
+        self.assertAlmostEqual(stats.variance, statistics.pvariance(values[-50:]), places=3)
+
+    def test_session_totals_span_all_samples(self):
+        stats = RollingStats(window=3)
+        for value in [5.0, 1.0, 9.0, 4.0, 4.0]:
+            stats.push(value)
+        self.assertEqual(stats.min, 4.0)
+        self.assertEqual(stats.session.count, 5)
+        self.assertEqual(stats.session.min, 1.0)
+        self.assertEqual(stats.session.max, 9.0)
+        self.assertAlmostEqual(stats.session.mean, 4.6)
+
+    def test_clear_resets_window_and_session(self):
+        stats = RollingStats(window=3)
+        stats.push(1.0)
+        stats.clear()
+        self.assertEqual(len(stats), 0)
+        self.assertIsNone(stats.min)
+        self.assertEqual(stats.session.count, 0)
+
+    def test_empty_summary(self):
+        summary = SessionSummary()
+        self.assertEqual(summary.count, 0)
+        self.assertEqual(summary.variance, 0.0)
+
+    def test_add_many_matches_add(self):
+        values = [random.uniform(0, 1000) for _ in range(500)]
+        one_by_one = SessionSummary()
+        for value in values:
+            one_by_one.add(value)
+        batched = SessionSummary()
+        batched.add_many(values[:123])
+        batched.add_many(values[123:])
+        self.assertEqual(batched.count, one_by_one.count)
+        self.assertEqual(batched.min, one_by_one.min)
+        self.assertEqual(batched.max, one_by_one.max)
+        self.assertAlmostEqual(batched.mean, one_by_one.mean, places=6)
+        self.assertAlmostEqual(batched.variance, one_by_one.variance, places=3)
@@ -1,6 +1,17 @@
 import unittest
-from unittest.mock import patch
-from core.s3_uploader import upload_to_s3
+import os
+import gzip
+import tempfile
+from unittest.mock import patch, MagicMock
+import boto3
+from core.s3_uploader import upload_to_s3, S3UploadManager, s3_key_for
+from core.data_logger import parquet_available, write_parquet_session
+from core.session_store import SessionStore
+
+try:
+    from moto import mock_aws
+except ImportError:
+    mock_aws = None
 
 class TestS3Uploader(unittest.TestCase):
 
@@ -15,3 +26,75 @@ class TestS3Uploader(unittest.TestCase):
         mock_upload.side_effect = Exception("Simulated S3 Failure")
         upload_to_s3("dummy.csv")  # Should not raise
         self.assertTrue(True)
+
+
+class TestS3UploadManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.queue_path = os.path.join(self.tmp_dir.name, "s3_queue.json")
+        self.csv_path = os.path.join(self.tmp_dir.name, "lux_data_2025-04-20_00-00-00.csv")
+        with open(self.csv_path, "w") as f:
+            f.write("Relative Timestamp (ms),GMT Timestamp,Lux\n0,2025-04-20 00:00:00,100.0\n")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @unittest.skipUnless(mock_aws, "moto is not installed")
+    def test_uploads_gzipped_file_to_bucket(self):
+        with mock_aws():
+            client = boto3.client("s3", region_name="us-east-1")
+            client.create_bucket(Bucket="lux-test")
+            progress = []
+            manager = S3UploadManager(self.queue_path, bucket="lux-test", client=client,
+                                      on_progress=lambda path, sent, total: progress.append((sent, total)))
+            self.assertTrue(manager.enqueue(self.csv_path).result(timeout=30))
+            manager.shutdown(wait=True)
+
+            key = s3_key_for(self.csv_path) + ".gz"
+            body = client.get_object(Bucket="lux-test", Key=key)["Body"].read()
+            with open(self.csv_path, "rb") as f:
+                self.assertEqual(gzip.decompress(body), f.read())
+            self.assertEqual(progress[-1][0], progress[-1][1])
+            self.assertEqual(manager.pending(), [])
+
+    @unittest.skipUnless(parquet_available(), "pyarrow is not installed")
+    def test_parquet_goes_up_uncompressed_under_hive_key(self):
+        store = SessionStore()
+        store.append(0, 1745107200_000_000_000, 1.0)  # 2025-04-20 00:00 UTC
+        path = os.path.join(self.tmp_dir.name, "lux_data_2025-04-19_20-00-00_lab 1.parquet")
+        self.assertTrue(write_parquet_session(path, store, "lab 1"))
+        self.assertEqual(s3_key_for(path),
+                         "parquet/date=2025-04-20/device=lab_1/lux_data_2025-04-19_20-00-00_lab 1.parquet")
+        client = MagicMock()
+        manager = S3UploadManager(self.queue_path, bucket="lux-test", client=client)
+        self.assertTrue(manager.enqueue(path).result(timeout=5))
+        manager.shutdown(wait=True)
+        uploaded, _, key = client.upload_file.call_args[0]
+        self.assertEqual((uploaded, key), (path, s3_key_for(path)))
+
+    def test_retries_then_succeeds(self):
+        client = MagicMock()
+        client.upload_file.side_effect = [Exception("Simulated S3 Failure"), None]
+        done = []
+        manager = S3UploadManager(self.queue_path, bucket="lux-test", client=client, base_delay=0.01,
+                                  on_done=lambda path, ok: done.append(ok))
+        self.assertTrue(manager.enqueue(self.csv_path).result(timeout=5))
+        manager.shutdown(wait=True)
+        self.assertEqual(client.upload_file.call_count, 2)
+        self.assertEqual(done, [True])
+
+    def test_failed_upload_stays_queued_for_resume(self):
+        client = MagicMock()
+        client.upload_file.side_effect = Exception("Simulated S3 Failure")
+        manager = S3UploadManager(self.queue_path, bucket="lux-test", client=client,
+                                  max_attempts=2, base_delay=0.01)
+        self.assertFalse(manager.enqueue(self.csv_path).result(timeout=5))
+        manager.shutdown(wait=True)
+        self.assertFalse(os.path.exists(self.csv_path + ".gz"))
+
+        client.upload_file.side_effect = None
+        resumed = S3UploadManager(self.queue_path, bucket="lux-test", client=client)
+        self.assertEqual(resumed.pending(), [self.csv_path])
+        self.assertEqual([f.result(timeout=5) for f in resumed.resume()], [True])
+        resumed.shutdown(wait=True)
+        self.assertEqual(resumed.pending(), [])
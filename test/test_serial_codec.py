@@ -0,0 +1,61 @@
+# test/test_serial_codec.py
+
+import unittest
+import numpy as np
+from core.serial_codec import SerialDecoder, decode_frames, encode_frame, parse_serial_lines, FRAME
+
+class TestTextLines(unittest.TestCase):
+    def test_bulk_parse(self):
+        millis, lux = parse_serial_lines(b"1000,12.5\r\n1010,13.25\r\n")
+        np.testing.assert_array_equal(millis, [1000, 1010])
+        np.testing.assert_array_equal(lux, [12.5, 13.25])
+
+    def test_skips_non_readings(self):
+        millis, lux = parse_serial_lines(b"Connecting to WiFi...\n1000,1.5\n\n1,2,3\n2000,abc\n3000,2.5\n")
+        np.testing.assert_array_equal(millis, [1000, 3000])
+        np.testing.assert_array_equal(lux, [1.5, 2.5])
+
+class TestBinaryFrames(unittest.TestCase):
+    def test_round_trip(self):
+        data = b"".join(encode_frame(1000 + i, i * 0.5) for i in range(5))
+        millis, lux, consumed, bad = decode_frames(data)
+        np.testing.assert_array_equal(millis, [1000, 1001, 1002, 1003, 1004])
+        np.testing.assert_array_equal(lux, [0, 0.5, 1, 1.5, 2])
+        self.assertEqual((consumed, bad), (len(data), 0))
+
+    def test_resyncs_after_corruption(self):
+        corrupt = bytearray(encode_frame(2, 2.0))
+        corrupt[5] ^= 0xFF
+        data = b"boot\n" + encode_frame(1, 1.0) + bytes(corrupt) + b"\x00" + encode_frame(3, 3.0)
+        millis, lux, consumed, bad = decode_frames(data)
+        np.testing.assert_array_equal(millis, [1, 3])
+        self.assertEqual(bad, 1)
+
+class TestSerialDecoder(unittest.TestCase):
+    def test_text_split_across_reads(self):
+        decoder = SerialDecoder()
+        self.assertEqual(decoder.feed(b"1000,12.5\n10")[1].tolist(), [12.5])
+        self.assertEqual(decoder.feed(b"10,13.5\n")[0].tolist(), [1010])
+        self.assertFalse(decoder.binary)
+
+    def test_switches_to_binary_frames(self):
+        decoder = SerialDecoder()
+        data = b"Connected!\n" + encode_frame(5, 42.0) + encode_frame(6, 43.0)
+        cut = len(data) - FRAME.size // 2
+        self.assertEqual(decoder.feed(data[:cut])[1].tolist(), [42.0])
+        self.assertEqual(decoder.feed(data[cut:])[1].tolist(), [43.0])
+        self.assertTrue(decoder.binary)
+        self.assertEqual(decoder.crc_errors, 0)
+
+    def test_stray_sync_bytes_keep_text_mode(self):
+        decoder = SerialDecoder()
+        self.assertEqual(decoder.feed(b"\xa5\x5a junk\r\n1000,12.5\r\n")[1].tolist(), [12.5])
+        self.assertEqual(decoder.feed(b"1010,13.0\r\n")[1].tolist(), [13.0])
+        self.assertFalse(decoder.binary)
+
+    def test_falls_back_to_text_lines(self):
+        decoder = SerialDecoder()
+        decoder.feed(encode_frame(5, 42.0))
+        self.assertTrue(decoder.binary)
+        self.assertEqual(decoder.feed(b"1000,12.5\n1010,13.0\n")[1].tolist(), [12.5, 13.0])
+        self.assertFalse(decoder.binary)
@@ -0,0 +1,48 @@
+# test/test_session_store.py
+
+import unittest
+from core.session_store import SessionStore, CHUNK_SIZE
+
+class TestSessionStore(unittest.TestCase):
+    def test_iterates_export_rows(self):
+        store = SessionStore()
+        store.append(0, 1745100000_000_000_000, 50.0)
+        store.append(250, 1745100000_250_000_000, 60.5)
+        self.assertEqual(list(store), [
+            (0, "2025-04-19 22:00:00", 50.0),
+            (250, "2025-04-19 22:00:00", 60.5),
+        ])
+
+    def test_append_row_round_trips_gmt(self):
+        store = SessionStore()
+        store.append_row(1000, "2025-04-20 00:00:01", 200.0)
+        self.assertEqual(list(store), [(1000, "2025-04-20 00:00:01", 200.0)])
+
+    def test_spans_multiple_chunks(self):
+        store = SessionStore(lux_typecode="f")
+        count = CHUNK_SIZE + 10
+        for i in range(count):
+            store.append(i, i * 1_000_000, float(i % 100))
+        self.assertEqual(len(store), count)
+        rel_ms, epoch_ns, lux = store.columns()
+        self.assertEqual(len(rel_ms), count)
+        self.assertEqual(epoch_ns[-1], (count - 1) * 1_000_000)
+        self.assertEqual(store.nbytes, count * 20)
+
+    def test_clear(self):
+        store = SessionStore()
+        store.append(0, 0, 1.0)
+        store.clear()
+        self.assertFalse(store)
+        self.assertEqual(list(store.lux_values()), [])
+
+    def test_slice_and_search_across_chunks(self):
+        store = SessionStore()
+        for i in range(CHUNK_SIZE + 100):
+            store.append(i, i * 10, float(i))
+        rel_ms, epoch_ns, lux = store.slice_columns(CHUNK_SIZE - 2, CHUNK_SIZE + 2)
+        self.assertEqual(list(rel_ms), list(range(CHUNK_SIZE - 2, CHUNK_SIZE + 2)))
+        self.assertEqual(store.search_epoch((CHUNK_SIZE + 5) * 10), CHUNK_SIZE + 5)
+        self.assertEqual(store.search_epoch(15), 2)
+        self.assertEqual(len(store.slice_columns(5, 5)[0]), 0)
+        store.append(CHUNK_SIZE + 100, 0, 1.0)  # slices must not pin the arrays
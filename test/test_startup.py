@@ -0,0 +1,61 @@
+# test/test_startup.py
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from core.lazy import LazyClient
+from core.startup_profile import StartupProfiler
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+class TestLazyClient(unittest.TestCase):
+    def test_built_once_on_first_use(self):
+        factory = MagicMock()
+        client = LazyClient(factory)
+        self.assertFalse(client.loaded)
+        client.send("feed", 1)
+        client.send("feed", 2)
+        factory.assert_called_once_with()
+        self.assertEqual(factory.return_value.send.call_count, 2)
+
+    def test_patched_attribute_shadows_client(self):
+        client = LazyClient(MagicMock)
+        with patch.object(client, "upload_file") as mock_upload:
+            client.upload_file("a.csv")
+            mock_upload.assert_called_once_with("a.csv")
+        self.assertIsNot(client.upload_file, mock_upload)
+
+class TestStartupProfiler(unittest.TestCase):
+    def test_import_breakdown(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "profiled_outer.py"), "w") as f:
+                f.write("import time\ntime.sleep(0.02)\nimport profiled_inner\n")
+            with open(os.path.join(tmp, "profiled_inner.py"), "w") as f:
+                f.write("import time\ntime.sleep(0.05)\n")
+            sys.path.insert(0, tmp)
+            profiler = StartupProfiler()
+            profiler.track_imports()
+            try:
+                import profiled_outer  # noqa: F401
+            finally:
+                profiler.stop_tracking()
+                sys.path.remove(tmp)
+                sys.modules.pop("profiled_outer", None)
+                sys.modules.pop("profiled_inner", None)
+        profiler.mark("done")
+        # The inner package's time is not charged to the outer one as well
+        self.assertGreaterEqual(profiler.imports["profiled_inner"], 0.05)
+        self.assertLess(profiler.imports["profiled_outer"], 0.05)
+        report = profiler.report()
+        self.assertIn("done", report)
+        self.assertIn("profiled_inner", report)
+
+    def test_dashboard_does_not_import_cloud_sdks(self):
+        code = ("import sys, ui.layout; "
+                "print(*[m for m in ('boto3', 'Adafruit_IO', 'requests', 'paho') if m in sys.modules])")
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                             env=dict(os.environ, PYTHONPATH=SRC, QT_QPA_PLATFORM="offscreen"))
+        self.assertEqual(out.stdout.split(), [])
@@ -0,0 +1,122 @@
+# test/test_streams.py
+
+import os
+import sys
+import subprocess
+import unittest
+import tempfile
+from core.streams import StreamRegistry, DEFAULT_DEVICE, device_from_topic, export_streams
+from core.session_store import SessionStore
+from core.data_logger import parquet_available
+
+class TestStreams(unittest.TestCase):
+    def test_device_from_topic(self):
+        self.assertEqual(device_from_topic("sensor/kitchen/lux"), "kitchen")
+        self.assertEqual(device_from_topic("sensor/lux"), DEFAULT_DEVICE)
+        self.assertEqual(device_from_topic("other/a/lux", "x"), "x")
+
+    def test_streams_are_created_once_per_device(self):
+        seen = []
+        registry = StreamRegistry(window=10, on_new_device=seen.append)
+        first = registry.get("a")
+        self.assertIs(registry.get("a"), first)
+        registry.get("b")
+        self.assertEqual(seen, ["a", "b"])
+        self.assertEqual(registry.devices(), ["a", "b"])
+
+    def test_clear_keeps_devices(self):
+        registry = StreamRegistry(window=10)
+        stream = registry.get("a")
+        stream.buffer.append(1, 2.0)
+        stream.stats.push(2.0)
+        stream.session.append(0, 1, 2.0)
+        registry.clear()
+        self.assertIn("a", registry)
+        self.assertEqual((len(stream.buffer), len(stream.stats), len(stream.session)), (0, 0, 0))
+
+    def test_session_lod_follows_replaced_session(self):
+        stream = StreamRegistry().get("a")
+        lod = stream.session_lod()
+        stream.session = type(stream.session)()
+        self.assertIsNot(stream.session_lod(), lod)
+        self.assertIs(stream.session_lod().store, stream.session)
+
+
+class TestStreamedExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.logs = self.tmp_dir.name
+        self.batch = [(1745100000 + i / 100, "a", 10.0 + i % 7) for i in range(500)]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read(self, path):
+        with open(path, newline='') as f:
+            return f.read()
+
+    def test_export_finalizes_the_streamed_file(self):
+        streamed = StreamRegistry(window=10, spool_dir=self.logs)
+        plain = StreamRegistry(window=10)
+        for start in range(0, 500, 100):
+            streamed.ingest(self.batch[start:start + 100], 1745100000)
+            plain.ingest(self.batch[start:start + 100], 1745100000)
+        self.assertIsNotNone(streamed.get("a").spool)
+        (path,), failed = export_streams(streamed, self.logs, timestamp="s")
+        (expected,), _ = export_streams(plain, self.logs, timestamp="p")
+        self.assertEqual(failed, 0)
+        self.assertEqual(self.read(path), self.read(expected))
+        self.assertEqual(sorted(os.listdir(self.logs)), ["lux_data_p.csv", "lux_data_s.csv"])
+
+    def test_replaced_session_falls_back_to_full_write(self):
+        registry = StreamRegistry(window=10, spool_dir=self.logs)
+        registry.ingest(self.batch[:10], 1745100000)
+        stream = registry.get("a")
+        stream.session = SessionStore()  # what recovery does
+        stream.session.append(0, 1745100000 * 10 ** 9, 1.0)
+        (path,), _ = export_streams(registry, self.logs, timestamp="r")
+        self.assertIn("0,2025-04-19 22:00:00,1.0", self.read(path))
+        self.assertEqual(os.listdir(self.logs), ["lux_data_r.csv"])
+
+    def test_clear_and_close_delete_partial_files(self):
+        registry = StreamRegistry(window=10, spool_dir=self.logs)
+        registry.ingest(self.batch[:10], 1745100000)
+        registry.clear()
+        self.assertEqual(os.listdir(self.logs), [])
+        registry.ingest(self.batch[10:20], 1745100000)
+        self.assertEqual(len(os.listdir(self.logs)), 1)
+        registry.close()
+        self.assertEqual(os.listdir(self.logs), [])
+
+    def spool_file(self, pid, age_s=0):
+        path = os.path.join(self.logs, f".recording_my_sensor_{pid}_0.csv.part")
+        with open(path, "w") as f:
+            f.write("Timestamp (ms),Timestamp (GMT),Lux\n")
+        if age_s:
+            os.utime(path, (os.path.getmtime(path) - age_s,) * 2)
+        return os.path.basename(path)
+
+    def test_orphaned_spools_are_swept_on_startup(self):
+        finished = subprocess.Popen([sys.executable, "-c", "pass"])
+        finished.wait()
+        self.spool_file(finished.pid)
+        self.spool_file(os.getpid(), age_s=3600)  # a crashed run that had our pid
+        own = self.spool_file(os.getpid())
+        with open(os.path.join(self.logs, "lux_data_old.csv"), "w"):
+            pass
+        StreamRegistry(window=10, spool_dir=self.logs)
+        self.assertEqual(sorted(os.listdir(self.logs)), [own, "lux_data_old.csv"])
+
+    @unittest.skipIf(os.name == "nt", "a live recorder's spool is locked by the OS there")
+    def test_spools_of_running_recorders_are_kept(self):
+        name = self.spool_file(os.getppid())
+        StreamRegistry(window=10, spool_dir=self.logs)
+        self.assertEqual(os.listdir(self.logs), [name])
+
+    @unittest.skipUnless(parquet_available(), "pyarrow is not installed")
+    def test_parquet_copy_is_exported_alongside(self):
+        registry = StreamRegistry(window=10)
+        registry.ingest(self.batch, 1745100000)
+        exported, failed = export_streams(registry, self.logs, parquet=True, timestamp="q")
+        self.assertEqual([os.path.basename(path) for path in exported], ["lux_data_q.csv", "lux_data_q.parquet"])
+        self.assertEqual(failed, 0)
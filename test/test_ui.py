@@ -3,6 +3,7 @@
 import sys
 import os
 import unittest
+import tempfile
 import time
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtTest import QTest
@@ -13,7 +14,9 @@ class TestUI(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         cls.app = QApplication(sys.argv)
-        cls.window = SensorDashboard()
+        cls.logs_dir = tempfile.TemporaryDirectory()
+        with patch("ui.layout.DEFAULT_LOG_DIR", cls.logs_dir.name):
+            cls.window = SensorDashboard()
         cls.window.show()
         QTest.qWait(500)
 
@@ -21,6 +24,7 @@ class TestUI(unittest.TestCase):
     def tearDownClass(cls):
         cls.window.close()
         cls.app.quit()
+        cls.logs_dir.cleanup()
 
     def test_toggle_time_mode(self):
         self.window.relative_radio.setChecked(True)
@@ -52,13 +56,50 @@ class TestUI(unittest.TestCase):
         self.window.stop_stream()
         self.assertTrue(self.window.warning_label.isVisible())
         
+    def test_port_detection_does_not_block(self):
+        ports = [MagicMock(device=f"/dev/ttyUSB{i}", vid=None) for i in range(2)]
+        probe = lambda device: time.sleep(0.3) or device == "/dev/ttyUSB1"
+        with patch("serial.tools.list_ports.comports", return_value=ports), \
+                patch.object(self.window.port_prober, "probe", probe), \
+                patch.object(self.window.port_prober, "cached_sensor", return_value=None):
+            started = time.monotonic()
+            self.window.refresh_com_ports()
+            self.assertLess(time.monotonic() - started, 0.2)
+            self.assertEqual(self.window.com_dropdown.count(), 2)
+            QTest.qWait(800)
+        self.assertEqual(self.window.com_dropdown.currentText(), "/dev/ttyUSB1 (Detected Sensor Port)")
+
+    def test_rescan_skips_the_streaming_port(self):
+        ports = [MagicMock(device=f"/dev/ttyUSB{i}", vid=None) for i in range(2)]
+        self.window.serial_port = "/dev/ttyUSB0"
+        try:
+            with patch("serial.tools.list_ports.comports", return_value=ports), \
+                    patch.object(self.window.port_prober, "scan") as scan:
+                self.window.refresh_com_ports(force=True)
+            scan.assert_called_once_with(ports, force=True, busy={"/dev/ttyUSB0"})
+        finally:
+            self.window.serial_port = None
+
     @patch("serial.Serial")
     def test_start_stream_com_mode(self, mock_serial):
         self.window.com_radio.setChecked(True)
         self.window.com_dropdown.addItem("COM1")
         self.window.com_dropdown.setCurrentIndex(0)
-        mock_serial.return_value.__enter__.return_value.readline.return_value = b"1000,123.4\n"
+        port = mock_serial.return_value.__enter__.return_value
+        port.in_waiting = 0
+        chunks = iter([b"1000,123.4\n"])
+
+        def read(size):
+            # One reading, then behave like an idle port whose read times out
+            data = next(chunks, b"")
+            if not data:
+                time.sleep(0.05)
+            return data
+
+        port.read.side_effect = read
         self.window.start_stream()
         QTest.qWait(200)
         self.assertTrue(self.window.running)
-        self.window.stop_stream()
\ No newline at end of file
+        self.assertIsNotNone(self.window.serial_port)
+        self.window.stop_stream()
+        self.assertIsNone(self.window.serial_port)
\ No newline at end of file